@@ -0,0 +1,234 @@
+import asyncio
+import glob
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import insert
+from starlette.concurrency import run_in_threadpool
+
+from .database import async_engine
+from .models.auditoria import Auditoria
+
+
+logger = logging.getLogger(__name__)
+
+
+class AuditWriter:
+    """Grava a auditoria fora do caminho da requisição.
+
+    Os routers enfileiram eventos já confirmados; uma task de fundo drena a fila
+    em lotes com INSERT multi-linha. Se o banco estiver indisponível (ou a fila
+    cheia), os eventos vão para um arquivo de spool JSONL, reprocessado no
+    próximo flush bem-sucedido.
+
+    Cada worker grava no próprio spool (`<spool_base>.<pid>.jsonl`, caminho
+    absoluto) e o I/O do arquivo roda no threadpool, fora do event loop. Spools
+    de workers que já não existem (reciclados, reiniciados) são reprocessados
+    pelo próximo worker que gravar com sucesso.
+    """
+
+    def __init__(self, maxsize: int = 10000, batch_size: int = 500, flush_interval: float = 0.5, spool_base: str = "audit-spool"):
+        self.maxsize = maxsize
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.spool_base = os.path.abspath(spool_base)
+        # Serializa gravação e reprocessamento do spool entre as threads do pool
+        self._spool_lock = threading.Lock()
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stats: Dict[str, Any] = {
+            "enqueued_total": 0,
+            "flushed_total": 0,
+            "batches_total": 0,
+            "spooled_total": 0,
+            "replayed_total": 0,
+            "flush_errors_total": 0,
+            "last_flush_ms": None,
+            "max_flush_ms": None,
+            "flush_ms_total": 0.0,
+        }
+
+    @classmethod
+    def from_env(cls) -> "AuditWriter":
+        return cls(
+            maxsize=int(os.getenv("AUDIT_QUEUE_MAXSIZE", "10000")),
+            batch_size=int(os.getenv("AUDIT_BATCH_SIZE", "500")),
+            flush_interval=float(os.getenv("AUDIT_FLUSH_INTERVAL", "0.5")),
+            spool_base=os.getenv("AUDIT_SPOOL_PATH", "audit-spool"),
+        )
+
+    @property
+    def spool_path(self) -> str:
+        # PID lido na hora: o objeto é criado no import, antes de o worker existir
+        return f"{self.spool_base}.{os.getpid()}.jsonl"
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.maxsize)
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if not self._task or not self._queue:
+            return
+        # Sentinela no fim da fila: a task grava o lote em andamento e encerra
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+        # Flush final: eventos que chegaram depois da sentinela
+        pending = self._drain_nowait()
+        while pending:
+            await self._flush(pending[:self.batch_size])
+            pending = pending[self.batch_size:]
+
+    async def enqueue(self, events: List[Dict[str, Any]]) -> None:
+        assert self._queue is not None
+        for i, event in enumerate(events):
+            try:
+                self._queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # Buffer limitado: excedente vai direto para o spool durável
+                await self._spool(events[i:])
+                break
+            self._stats["enqueued_total"] += 1
+
+    def metrics(self) -> Dict[str, Any]:
+        batches = self._stats["batches_total"]
+        return {
+            "running": self.running,
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "queue_maxsize": self.maxsize,
+            "avg_flush_ms": round(self._stats["flush_ms_total"] / batches, 3) if batches else None,
+            **{k: v for k, v in self._stats.items() if k != "flush_ms_total"},
+        }
+
+    async def _run(self) -> None:
+        assert self._queue is not None
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            first = await self._queue.get()
+            if first is None:
+                return
+            batch = [first]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    event = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if event is None:
+                    stopping = True
+                    break
+                batch.append(event)
+            await self._flush(batch)
+
+    def _drain_nowait(self) -> List[Dict[str, Any]]:
+        out: List[Dict[str, Any]] = []
+        while self._queue is not None and not self._queue.empty():
+            event = self._queue.get_nowait()
+            if event is not None:
+                out.append(event)
+        return out
+
+    async def _insert(self, batch: List[Dict[str, Any]]) -> None:
+        async with async_engine.begin() as conn:
+            await conn.execute(insert(Auditoria).values(batch))
+
+    async def _flush(self, batch: List[Dict[str, Any]]) -> None:
+        start = time.perf_counter()
+        try:
+            await self._insert(batch)
+        except Exception:
+            logger.exception("Falha ao gravar %d registros de auditoria; enviando ao spool", len(batch))
+            self._stats["flush_errors_total"] += 1
+            await self._spool(batch)
+            return
+        elapsed = (time.perf_counter() - start) * 1000
+        self._stats["flushed_total"] += len(batch)
+        self._stats["batches_total"] += 1
+        self._stats["last_flush_ms"] = round(elapsed, 3)
+        self._stats["max_flush_ms"] = max(self._stats["max_flush_ms"] or 0, round(elapsed, 3))
+        self._stats["flush_ms_total"] += elapsed
+        await self._replay_spool()
+
+    async def _spool(self, events: List[Dict[str, Any]]) -> None:
+        await run_in_threadpool(self._write_spool, events)
+        self._stats["spooled_total"] += len(events)
+
+    def _write_spool(self, events: List[Dict[str, Any]]) -> None:
+        lines = "".join(json.dumps(event, ensure_ascii=False, default=str) + "\n" for event in events)
+        with self._spool_lock, open(self.spool_path, "a", encoding="utf-8") as fh:
+            fh.write(lines)
+            fh.flush()
+            os.fsync(fh.fileno())
+
+    def _claim_spools(self) -> Tuple[List[str], List[Dict[str, Any]]]:
+        """Move para `.replay` e lê o spool deste worker e os de workers encerrados."""
+        claimed: List[str] = []
+        events: List[Dict[str, Any]] = []
+        base = glob.escape(self.spool_base)
+        with self._spool_lock:
+            # Spools (<base>.<pid>.jsonl) e reprocessamentos interrompidos por um worker
+            # que caiu no meio (<base>.<pid>.jsonl.<pid>.replay); vale o PID do dono atual
+            for path in glob.glob(f"{base}.*.jsonl") + glob.glob(f"{base}.*.jsonl.*.replay"):
+                if path != self.spool_path and _pid_alive(path):
+                    continue
+                # rename atômico: só um worker reprocessa cada arquivo, e novas
+                # falhas continuam gravando em um spool novo
+                replaying = f"{path.split('.jsonl', 1)[0]}.jsonl.{os.getpid()}.replay"
+                try:
+                    os.replace(path, replaying)
+                except FileNotFoundError:
+                    continue
+                claimed.append(replaying)
+                with open(replaying, encoding="utf-8") as fh:
+                    events.extend(json.loads(line) for line in fh if line.strip())
+        return claimed, events
+
+    async def _replay_spool(self) -> None:
+        claimed, events = await run_in_threadpool(self._claim_spools)
+        if not claimed:
+            return
+        for event in events:
+            if isinstance(event.get("quando"), str):
+                event["quando"] = datetime.fromisoformat(event["quando"])
+        done = 0
+        try:
+            while done < len(events):
+                chunk = events[done:done + self.batch_size]
+                await self._insert(chunk)
+                done += len(chunk)
+                self._stats["replayed_total"] += len(chunk)
+        except Exception:
+            logger.exception("Falha ao reprocessar o spool de auditoria")
+            await self._spool(events[done:])
+        finally:
+            for path in claimed:
+                await run_in_threadpool(os.remove, path)
+
+
+def _pid_alive(path: str) -> bool:
+    # <spool_base>.<pid>.jsonl ou <spool_base>.<pid>.jsonl.<pid>.replay: o último PID é o dono
+    try:
+        os.kill(int(path.rsplit(".", 2)[-2]), 0)
+    except (ValueError, ProcessLookupError):
+        return False
+    except PermissionError:
+        pass  # existe, mas é de outro usuário
+    return True
+
+
+audit_writer = AuditWriter.from_env()
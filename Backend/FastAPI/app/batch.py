@@ -0,0 +1,198 @@
+import asyncio
+import inspect
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import orjson
+from starlette.types import ASGIApp, Message, Scope
+
+from .database import SHARED_READ_SESSION, SHARED_SESSION
+from .security import SHARED_AUTH
+
+
+BATCH_MAX_REQUISICOES = int(os.getenv("BATCH_MAX_REQUISICOES", "20"))
+# Prazo do lote inteiro (s), contado do início: as consultas das sub-requisições passam
+# uma a uma pela sessão compartilhada, e as que não terminarem até lá voltam 504
+BATCH_TIMEOUT = float(os.getenv("BATCH_TIMEOUT", "30"))
+# Corpo máximo por sub-requisição; acima disso ela volta 413 sem derrubar as demais
+BATCH_MAX_BODY = int(os.getenv("BATCH_MAX_BODY", str(8 * 1024 * 1024)))
+# Streaming (SSE, exportações) não cabe numa resposta combinada; lote dentro de lote também não
+BATCH_BLOQUEADAS = ("/batch", "/eventos", "/causas-processos/export")
+
+# Autocommit: sem transação aberta durante o lote e um erro não aborta as consultas das demais
+AUTOCOMMIT = {"isolation_level": "AUTOCOMMIT"}
+
+# Descritivos do corpo do POST externo, que não valem para um GET
+_SEM_REPASSE = {b"content-length", b"content-type", b"transfer-encoding", b"expect", b"accept-encoding"}
+# A sub-requisição não troca de identidade nem de host
+_PROTEGIDOS = {"authorization", "cookie", "host"}
+# Cabeçalhos da resposta de cada sub-requisição devolvidos no lote
+_REPASSADOS = ("etag", "last-modified", "cache-control", "x-next-cursor", "location")
+
+
+class SharedSession:
+    """Session compartilhada pelas sub-requisições de um lote.
+
+    AsyncSession não aceita operações simultâneas: cada chamada awaitable
+    (execute, scalars, get...) passa pelo lock, uma de cada vez, enquanto o
+    restante das rotas (validação, serialização, cache) corre em paralelo.
+
+    Uma sub-requisição cancelada (prazo do lote) no meio de uma consulta deixa
+    a conexão em estado desconhecido: a sessão é invalidada e trocada por uma
+    nova, aberta por `abrir`, antes de o lock passar adiante.
+    """
+
+    def __init__(self, session: Any, abrir: Callable[[], Awaitable[Any]]):
+        self.session = session
+        self._abrir = abrir
+        self._lock = asyncio.Lock()
+        self.substituicoes = 0
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self.session, name)
+        if not inspect.iscoroutinefunction(attr):
+            return attr
+
+        async def serial(*args: Any, **kwargs: Any) -> Any:
+            async with self._lock:
+                # A sessão pode ter sido trocada enquanto esta chamada aguardava o lock
+                try:
+                    return await getattr(self.session, name)(*args, **kwargs)
+                except asyncio.CancelledError:
+                    await self._substituir()
+                    raise
+
+        return serial
+
+    async def _substituir(self) -> None:
+        antiga = self.session
+        self.session = await self._abrir()
+        self.substituicoes += 1
+        await antiga.invalidate()
+
+    async def close(self) -> None:
+        await self.session.close()
+
+
+class _CorpoGrande(Exception):
+    pass
+
+
+def bloqueada(path: str) -> bool:
+    return any(path == p or path.startswith(p + "/") for p in BATCH_BLOQUEADAS)
+
+
+def shared_scope(scope: Scope, db: SharedSession, read_db: SharedSession, ctx: Any) -> Scope:
+    """Scope base das sub-requisições: mesmo cliente e cabeçalhos, com sessão e auth do lote."""
+    return {
+        "type": "http",
+        "asgi": scope.get("asgi", {"version": "3.0"}),
+        "http_version": scope.get("http_version", "1.1"),
+        "scheme": scope.get("scheme", "http"),
+        "server": scope.get("server"),
+        "client": scope.get("client"),
+        "root_path": scope.get("root_path", ""),
+        "headers": [(k, v) for k, v in scope.get("headers", []) if k not in _SEM_REPASSE],
+        "state": dict(scope.get("state", {})),
+        SHARED_SESSION: db,
+        SHARED_READ_SESSION: read_db,
+        SHARED_AUTH: ctx,
+    }
+
+
+def _sub_scope(base: Scope, path: str, headers: Dict[str, str]) -> Scope:
+    partes = urlsplit(path)
+    extras = {k.lower(): v for k, v in headers.items() if k.lower() not in _PROTEGIDOS and k.lower().encode() not in _SEM_REPASSE}
+    cabecalhos = [(k, v) for k, v in base["headers"] if k.decode("latin-1") not in extras]
+    cabecalhos += [(k.encode("latin-1"), v.encode("latin-1")) for k, v in extras.items()]
+    return {
+        **base,
+        "method": "GET",
+        "path": partes.path,
+        "raw_path": partes.path.encode(),
+        "query_string": partes.query.encode(),
+        "headers": cabecalhos,
+        "state": dict(base["state"]),
+    }
+
+
+async def _chamar(app: ASGIApp, scope: Scope) -> Tuple[int, List[Tuple[bytes, bytes]], bytes]:
+    inicio: Dict[str, Any] = {}
+    corpo = bytearray()
+    fim = asyncio.Event()
+    lido = False
+
+    async def receive() -> Message:
+        nonlocal lido
+        if not lido:
+            lido = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        # Quem espera desconexão (BaseHTTPMiddleware) só a recebe depois da resposta
+        await fim.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message: Message) -> None:
+        if message["type"] == "http.response.start":
+            inicio.update(message)
+        elif message["type"] == "http.response.body":
+            corpo.extend(message.get("body", b""))
+            if len(corpo) > BATCH_MAX_BODY:
+                raise _CorpoGrande()
+            if not message.get("more_body", False):
+                fim.set()
+
+    try:
+        await app(scope, receive, send)
+    finally:
+        fim.set()
+    return inicio.get("status", 500), inicio.get("headers", []), bytes(corpo)
+
+
+def _erro(status: int, detail: str) -> Tuple[int, List[Tuple[bytes, bytes]], bytes]:
+    return status, [(b"content-type", b"application/json")], orjson.dumps({"detail": detail})
+
+
+async def executar(app: ASGIApp, base: Scope, item: Any, prazo: float) -> bytes:
+    """Executa um GET do lote pela pilha completa da aplicação e devolve o item já em JSON.
+
+    `prazo` é o instante (time.monotonic) em que o lote inteiro expira.
+    """
+    t0 = time.perf_counter()
+    if not item.path.startswith("/") or bloqueada(urlsplit(item.path).path):
+        status, headers, corpo = _erro(400, "Rota não permitida em lote")
+    else:
+        try:
+            status, headers, corpo = await asyncio.wait_for(
+                _chamar(app, _sub_scope(base, item.path, item.headers)), max(0.0, prazo - time.monotonic())
+            )
+        except asyncio.TimeoutError:
+            status, headers, corpo = _erro(504, "Tempo esgotado")
+        except _CorpoGrande:
+            status, headers, corpo = _erro(413, "Resposta grande demais para o lote")
+        except Exception:
+            status, headers, corpo = _erro(500, "Erro interno")
+    return _item(item.id, status, headers, corpo, (time.perf_counter() - t0) * 1000)
+
+
+def _item(item_id: Optional[str], status: int, headers: List[Tuple[bytes, bytes]], corpo: bytes, tempo_ms: float) -> bytes:
+    cabecalhos = {k.decode("latin-1").lower(): v.decode("latin-1") for k, v in headers}
+    meta = orjson.dumps({
+        "id": item_id,
+        "status": status,
+        "tempo_ms": round(tempo_ms, 2),
+        "headers": {k: cabecalhos[k] for k in _REPASSADOS if k in cabecalhos},
+    })
+    if not corpo:
+        dados = b"null"
+    elif cabecalhos.get("content-type", "").startswith("application/json"):
+        # Corpo JSON entra como está, sem decodificar e serializar de novo
+        dados = corpo
+    else:
+        dados = orjson.dumps(corpo.decode("utf-8", "replace"))
+    return meta[:-1] + b',"corpo":' + dados + b"}"
+
+
+def combinar(respostas: List[bytes], tempo_ms: float) -> bytes:
+    return b'{"tempo_ms":' + orjson.dumps(round(tempo_ms, 2)) + b',"respostas":[' + b",".join(respostas) + b"]}"
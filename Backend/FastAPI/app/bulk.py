@@ -0,0 +1,78 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import CTE, Select, func, insert, literal, select
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .cache import cache
+from .changefeed import notify_statement
+from .models.auditoria import Auditoria
+from .models.outbox import Outbox
+from .permissions import invalidate_permissions
+from .versions import bump_statement
+
+
+def json_object(table: Any, fields: List[Tuple[str, str]]) -> Any:
+    """jsonb_build_object com os campos da API (atributo, coluna) lidos de `table` (tabela ou alias)."""
+    args: List[Any] = []
+    for attr, col in fields:
+        args += [literal(attr), table.c[col]]
+    return func.jsonb_build_object(*args, type_=JSONB)
+
+
+def with_events(mudancas: CTE, entidade: str, quem: str = "SYSTEM") -> Select:
+    """SELECT acao, count(*) sobre `mudancas` (acao, id, antes, depois) que, no mesmo
+    comando, grava outbox e auditoria de cada linha afetada.
+
+    Operações em lote não passam pelo UnitOfWork: as alterações são calculadas em
+    SQL por diff_alteracoes (mesma regra do build_diff) e inseridas de uma vez.
+    """
+    quando = datetime.utcnow()
+    eventos = select(
+        mudancas.c.acao,
+        mudancas.c.id,
+        func.diff_alteracoes(mudancas.c.antes, mudancas.c.depois, type_=JSONB).label("alteracoes"),
+    ).cte("eventos")
+    outbox = insert(Outbox).from_select(
+        ["entidade", "entidade_id", "acao", "alteracoes", "criado_em"],
+        select(literal(entidade), eventos.c.id, eventos.c.acao, eventos.c.alteracoes, literal(quando)),
+    ).cte("outbox")
+    auditoria = insert(Auditoria).from_select(
+        ["entidade", "entidade_id", "acao", "quem", "quando", "alteracoes"],
+        select(literal(entidade), eventos.c.id, eventos.c.acao, literal(quem), literal(quando), eventos.c.alteracoes),
+    ).cte("auditoria")
+    return select(mudancas.c.acao, func.count()).group_by(mudancas.c.acao).add_cte(outbox, auditoria)
+
+
+async def execute_with_events(db: AsyncSession, mudancas: CTE, entidade: str, quem: str = "SYSTEM") -> Dict[str, int]:
+    """Executa `mudancas` com outbox/auditoria (autor `quem`) e devolve o total de linhas por ação."""
+    result = await db.execute(with_events(mudancas, entidade, quem))
+    return {acao: total for acao, total in result.all()}
+
+
+async def commit_bulk(db: AsyncSession, entidade: str, alteradas: int, escritorio_id: Optional[int] = None) -> None:
+    """Fecha a transação em lote como o UnitOfWork: versão (ETags) antes do commit, caches depois.
+
+    O feed de alterações recebe um único evento "bulk" com o total, restrito ao
+    escritório quando a operação foi limitada a ele.
+    """
+    try:
+        if alteradas:
+            await db.execute(notify_statement([{
+                "tipo": "mudanca",
+                "entidade": entidade,
+                "id": None,
+                "acao": "bulk",
+                "total": alteradas,
+                "escritorios": [escritorio_id] if escritorio_id else [],
+            }]))
+            await db.execute(bump_statement([entidade]))
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+    if alteradas:
+        invalidate_permissions(entidade)
+        # Sem id: as linhas afetadas não são conhecidas aqui, cai o namespace inteiro (listas e detalhes)
+        await cache.invalidate(entidade)
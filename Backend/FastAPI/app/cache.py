@@ -0,0 +1,249 @@
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from fastapi import Response
+from pydantic import BaseModel
+
+from .routers.pagination import NEXT_CURSOR_HEADER
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # Redis é opcional: sem o pacote fica só o cache em memória
+    aioredis = None
+
+
+logger = logging.getLogger(__name__)
+
+# Vazio desliga o nível Redis; cada worker mantém apenas o LRU local
+REDIS_URL = os.getenv("REDIS_URL", "").strip()
+CACHE_TTL = int(os.getenv("CACHE_TTL", "300"))
+# O LRU local expira antes: cobre invalidações perdidas enquanto o pub/sub estava fora
+CACHE_LOCAL_TTL = float(os.getenv("CACHE_LOCAL_TTL", "30"))
+CACHE_LOCAL_SIZE = int(os.getenv("CACHE_LOCAL_SIZE", "2000"))
+CACHE_PREFIX = "cjf:cache"
+CACHE_CHANNEL = f"{CACHE_PREFIX}:invalidate"
+
+# Entidades (nome usado na UnitOfWork) cujas leituras passam pelo cache
+CACHED_ENTIDADES = {"Especialidades", "Escritorios", "Perfil", "Permissoes", "Parametros"}
+
+Loader = Callable[[], Awaitable[Any]]
+
+
+class LocalLRU:
+    def __init__(self, maxsize: int = CACHE_LOCAL_SIZE, ttl: float = CACHE_LOCAL_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Tuple[str, str], Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple[str, str]) -> Any:
+        with self._lock:
+            hit = self._data.get(key)
+            if not hit:
+                return None
+            expires, value = hit
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def put(self, key: Tuple[str, str], value: Any) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def drop(self, namespace: str, row_id: Optional[int]) -> None:
+        """Listas e o detalhe de `row_id`; sem id (operação em lote), todo o namespace."""
+        detail = f"get:{row_id}"
+        with self._lock:
+            for key in [k for k in self._data if k[0] == namespace and (row_id is None or k[1].startswith("list:") or k[1] == detail)]:
+                del self._data[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class TwoTierCache:
+    """Cache read-through: LRU em memória na frente do Redis (opcional).
+
+    Chaves são (namespace, chave), com namespace = entidade. Listagens usam
+    chaves "list:..." e detalhes "get:<id>"; uma escrita derruba as listagens
+    da entidade e o detalhe da linha alterada no LRU de todos os workers (via
+    pub/sub) e avança a geração do namespace no Redis.
+
+    Cada entrada no Redis leva a geração lida antes da consulta ao banco e só
+    vale enquanto ela for a atual: um leitor cuja consulta cruzou o commit de
+    uma escrita pode gravar depois da invalidação, mas grava numa geração já
+    vencida, que ninguém mais aceita.
+
+    Os loaders leem do primário (get_async_db), nunca de réplica: preenchido
+    por uma réplica atrasada, o cache guardaria por até CACHE_TTL a versão de
+    antes de uma escrita que já o invalidou.
+    """
+
+    def __init__(self, url: str = REDIS_URL):
+        self.local = LocalLRU()
+        self.url = url
+        self.redis: Any = None
+        self._listener: Optional[asyncio.Task] = None
+        # Geração por namespace: resultado carregado antes de uma invalidação não é gravado
+        self._generation: Dict[str, int] = {}
+        self.hits_local = 0
+        self.hits_redis = 0
+        self.misses = 0
+        self.redis_errors = 0
+
+    async def start(self) -> None:
+        if not self.url:
+            return
+        if aioredis is None:
+            logger.warning("REDIS_URL definido, mas o pacote redis não está instalado; usando só o cache local")
+            return
+        self.redis = aioredis.from_url(self.url, decode_responses=True)
+        self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._listener:
+            self._listener.cancel()
+            self._listener = None
+        if self.redis is not None:
+            await self.redis.aclose()
+            self.redis = None
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                pubsub = self.redis.pubsub()
+                await pubsub.subscribe(CACHE_CHANNEL)
+                # Reconectado: o que mudou enquanto estávamos fora é desconhecido
+                self.local.clear()
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    data = json.loads(message["data"])
+                    self._drop_local(data["ns"], data.get("id"))
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                self.redis_errors += 1
+                logger.warning("Assinatura de invalidação do cache caiu: %s", exc)
+                await asyncio.sleep(1)
+
+    def _drop_local(self, namespace: str, row_id: Optional[int]) -> None:
+        self._generation[namespace] = self._generation.get(namespace, 0) + 1
+        self.local.drop(namespace, row_id)
+
+    def _redis_key(self, namespace: str, key: str) -> str:
+        return f"{CACHE_PREFIX}:{namespace}:{key}"
+
+    async def get_or_load(self, namespace: str, key: str, loader: Loader) -> Any:
+        value = self.local.get((namespace, key))
+        if value is not None:
+            self.hits_local += 1
+            return value
+        generation = self._generation.get(namespace, 0)
+        redis_gen: Optional[int] = None
+        rkey = self._redis_key(namespace, key)
+        if self.redis is not None:
+            try:
+                gen_raw, raw = await self.redis.mget(self._redis_key(namespace, "gen"), rkey)
+                redis_gen = int(gen_raw or 0)
+            except Exception as exc:
+                raw = None
+                self.redis_errors += 1
+                logger.warning("Leitura do cache no Redis falhou: %s", exc)
+            entry = json.loads(raw) if raw is not None else None
+            if isinstance(entry, dict) and entry.get("g") == redis_gen:
+                self.hits_redis += 1
+                if self._generation.get(namespace, 0) == generation:
+                    self.local.put((namespace, key), entry["v"])
+                return entry["v"]
+        self.misses += 1
+        value = await loader()
+        if self._generation.get(namespace, 0) != generation:
+            return value
+        self.local.put((namespace, key), value)
+        if redis_gen is not None:
+            try:
+                await self.redis.set(rkey, json.dumps({"g": redis_gen, "v": value}), ex=CACHE_TTL)
+            except Exception as exc:
+                self.redis_errors += 1
+                logger.warning("Gravação do cache no Redis falhou: %s", exc)
+        return value
+
+    async def invalidate(self, namespace: str, row_id: Optional[int] = None) -> None:
+        if namespace not in CACHED_ENTIDADES:
+            return
+        self._drop_local(namespace, row_id)
+        if self.redis is None:
+            return
+        try:
+            # Nova geração: tudo o que foi gravado antes (ou ainda vai ser, por quem leu antes) vence
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.incr(self._redis_key(namespace, "gen"))
+                pipe.publish(CACHE_CHANNEL, json.dumps({"ns": namespace, "id": row_id}))
+                await pipe.execute()
+        except Exception as exc:
+            self.redis_errors += 1
+            logger.warning("Invalidação do cache no Redis falhou: %s", exc)
+
+    async def invalidate_all(self) -> None:
+        for namespace in CACHED_ENTIDADES:
+            await self.invalidate(namespace)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "redis": self.redis is not None,
+            "local_entries": len(self.local._data),
+            "hits_local": self.hits_local,
+            "hits_redis": self.hits_redis,
+            "misses": self.misses,
+            "redis_errors": self.redis_errors,
+        }
+
+
+cache = TwoTierCache()
+
+
+def list_key(query: str, scope: Any = None) -> str:
+    """Chave de listagem a partir da query string normalizada (ordem dos parâmetros irrelevante)."""
+    parts = sorted(p for p in query.split("&") if p)
+    return f"list:{scope}:" + "&".join(parts)
+
+
+async def cached_page(
+    namespace: str,
+    key: str,
+    response: Response,
+    schema: type[BaseModel],
+    load: Callable[[], Awaitable[Sequence[Any]]],
+) -> List[Dict[str, Any]]:
+    """Página de listagem via cache; o cursor da próxima página é guardado junto."""
+    async def _load() -> Dict[str, Any]:
+        rows = await load()
+        return {
+            "items": [schema.model_validate(r).model_dump(mode="json") for r in rows],
+            "next": response.headers.get(NEXT_CURSOR_HEADER),
+        }
+
+    page = await cache.get_or_load(namespace, key, _load)
+    if page["next"]:
+        response.headers[NEXT_CURSOR_HEADER] = page["next"]
+    return page["items"]
+
+
+async def cached_get(namespace: str, row_id: int, schema: type[BaseModel], load: Callable[[], Awaitable[Any]]) -> Dict[str, Any]:
+    async def _load() -> Dict[str, Any]:
+        return schema.model_validate(await load()).model_dump(mode="json")
+
+    return await cache.get_or_load(namespace, f"get:{row_id}", _load)
@@ -0,0 +1,170 @@
+import asyncio
+import logging
+import os
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, Optional, Set
+
+import orjson
+from sqlalchemy import text
+
+from .database import async_engine
+from .permissions import invalidate_permissions, permission_cache
+from .security import auth_cache, invalidate_auth
+from .singleflight import drop_flights
+
+
+logger = logging.getLogger(__name__)
+
+# CHANGE_FEED=0 desliga o listener e os endpoints de /eventos
+CHANGE_FEED = os.getenv("CHANGE_FEED", "1").strip().lower() not in ("0", "false", "no", "off")
+# LISTEN precisa de conexão direta: com PgBouncer em modo transação, apontar para o Postgres
+CHANGE_FEED_URL = os.getenv("CHANGE_FEED_URL", "").strip()
+CHANGE_FEED_CHANNEL = "cjf_mudancas"
+# Eventos pendentes por cliente; estourou, o cliente recebe um único "resync" no lugar
+CHANGE_FEED_QUEUE = int(os.getenv("CHANGE_FEED_QUEUE", "256"))
+CHANGE_FEED_HEARTBEAT = float(os.getenv("CHANGE_FEED_HEARTBEAT", "15"))
+
+
+def change_event(entidade: str, entidade_id: Optional[int], acao: str, *dados: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Evento de alteração com os escritórios afetados (antes e depois, se a linha mudou de escritório).
+
+    Sem escritório conhecido, `escritorios` fica vazio e o evento vai para todos.
+    """
+    if entidade == "Escritorios":
+        escritorios = {entidade_id}
+    else:
+        escritorios = {d["escritorio_id"] for d in dados if d and d.get("escritorio_id") is not None}
+    return {"tipo": "mudanca", "entidade": entidade, "id": entidade_id, "acao": acao, "escritorios": sorted(escritorios)}
+
+
+def notify_statement(eventos: Iterable[Dict[str, Any]]) -> Any:
+    """NOTIFY dos eventos; executado na transação, só é entregue se ela for confirmada."""
+    payloads = [orjson.dumps(e).decode() for e in eventos]
+    return text("SELECT pg_notify(:canal, p) FROM unnest(CAST(:payloads AS text[])) AS p").bindparams(
+        canal=CHANGE_FEED_CHANNEL, payloads=payloads
+    )
+
+
+def _invalidar_caches(evento: Dict[str, Any]) -> None:
+    """Caches de auth e permissões do worker, para escritas feitas em outro worker.
+
+    Um "resync" (listener reconectado) pode ter perdido eventos: descarta tudo.
+    """
+    if evento["tipo"] == "resync":
+        auth_cache.clear()
+        permission_cache.bump()
+    elif evento["tipo"] == "mudanca":
+        invalidate_auth(evento["entidade"], evento.get("id"))
+        invalidate_permissions(evento["entidade"])
+
+
+class Subscription:
+    def __init__(self, escritorio_id: Optional[int], entidades: Optional[Set[str]]):
+        self.escritorio_id = escritorio_id
+        self.entidades = entidades
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=CHANGE_FEED_QUEUE)
+
+    def accepts(self, evento: Dict[str, Any]) -> bool:
+        escritorios = evento.get("escritorios")
+        if self.escritorio_id and escritorios and self.escritorio_id not in escritorios:
+            return False
+        return evento["tipo"] != "mudanca" or not self.entidades or evento["entidade"] in self.entidades
+
+
+class ChangeFeed:
+    """Uma conexão LISTEN por worker, repassando os NOTIFY às assinaturas SSE/WebSocket.
+
+    Cada assinatura tem fila limitada: um cliente lento não segura os demais nem
+    acumula memória; ao estourar, a fila é trocada por um "resync" (o cliente
+    recarrega o que exibe). Reconectado o listener, todos recebem "resync", já
+    que os NOTIFY do intervalo se perderam.
+    """
+
+    def __init__(self, url: str = CHANGE_FEED_URL):
+        self.url = url or async_engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+        self._subscriptions: Set[Subscription] = set()
+        self._task: Optional[asyncio.Task] = None
+        self.connected = False
+        self._stats: Dict[str, int] = {
+            "recebidos": 0,
+            "entregues": 0,
+            "resyncs": 0,
+            "descartados": 0,
+            "reconexoes": 0,
+            "erros": 0,
+        }
+
+    async def start(self) -> None:
+        if CHANGE_FEED and self._task is None:
+            self._task = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        self.connected = False
+
+    async def _listen(self) -> None:
+        import psycopg
+
+        first = True
+        while True:
+            try:
+                async with await psycopg.AsyncConnection.connect(self.url, autocommit=True) as conn:
+                    await conn.execute(f"LISTEN {CHANGE_FEED_CHANNEL}")
+                    self.connected = True
+                    if not first:
+                        self._stats["reconexoes"] += 1
+                        self.publish({"tipo": "resync", "escritorios": []})
+                    first = False
+                    while True:
+                        async for notify in conn.notifies(timeout=CHANGE_FEED_HEARTBEAT):
+                            self._stats["recebidos"] += 1
+                            self.publish(orjson.loads(notify.payload))
+                        # Sem NOTIFY no intervalo: confirma que a conexão não caiu em silêncio
+                        await conn.execute("SELECT 1")
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                self.connected = False
+                self._stats["erros"] += 1
+                logger.warning("Listener do feed de alterações caiu: %s", exc)
+                await asyncio.sleep(1)
+
+    def publish(self, evento: Dict[str, Any]) -> None:
+        # Também chega aos workers que não fizeram a escrita: GETs iniciados antes do commit não recebem novas seguidoras
+        drop_flights(evento)
+        _invalidar_caches(evento)
+        mensagem = {k: v for k, v in evento.items() if k != "escritorios"}
+        for sub in list(self._subscriptions):
+            if not sub.accepts(evento):
+                continue
+            try:
+                sub.queue.put_nowait(mensagem)
+                self._stats["entregues"] += 1
+            except asyncio.QueueFull:
+                self._stats["descartados"] += sub.queue.qsize()
+                self._stats["resyncs"] += 1
+                while not sub.queue.empty():
+                    sub.queue.get_nowait()
+                sub.queue.put_nowait({"tipo": "resync"})
+
+    @contextmanager
+    def subscribe(self, escritorio_id: Optional[int], entidades: Optional[Set[str]] = None) -> Iterator[Subscription]:
+        sub = Subscription(escritorio_id, entidades)
+        self._subscriptions.add(sub)
+        try:
+            yield sub
+        finally:
+            self._subscriptions.discard(sub)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "enabled": CHANGE_FEED,
+            "connected": self.connected,
+            "assinaturas": len(self._subscriptions),
+            **self._stats,
+        }
+
+
+change_feed = ChangeFeed()
@@ -0,0 +1,153 @@
+import os
+import zlib
+from typing import List, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .serialization import encoding_metrics
+
+try:
+    import brotli
+except ImportError:  # Sem o pacote brotli, só gzip é negociado
+    brotli = None
+
+
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+# Qualidade baixa: ganho próximo ao do gzip 9 com custo de CPU bem menor
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+
+# Conteúdo já comprimido ou que precisa chegar sem buffer (SSE)
+_SKIP_TYPES = ("image/", "video/", "audio/", "application/zip", "application/gzip", "application/vnd.openxmlformats", "text/event-stream")
+
+
+def negotiate(accept_encoding: str) -> Optional[str]:
+    """Escolhe br ou gzip pelo Accept-Encoding (com q-values); None se nenhum serve."""
+    offered: List[Tuple[float, str]] = []
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if q <= 0:
+            continue
+        if name == "br" and brotli is not None:
+            offered.append((q + 0.001, "br"))  # empate: br comprime mais
+        elif name in ("gzip", "*"):
+            offered.append((q, "gzip"))
+    return max(offered)[1] if offered else None
+
+
+class _Compressor:
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._br = brotli.Compressor(quality=COMPRESSION_BROTLI_QUALITY)
+        else:
+            self._gz = zlib.compressobj(COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def chunk(self, data: bytes) -> bytes:
+        # Flush por pedaço: respostas em streaming continuam chegando aos poucos
+        if self.encoding == "br":
+            return self._br.process(data) + self._br.flush()
+        return self._gz.compress(data) + self._gz.flush(zlib.Z_SYNC_FLUSH)
+
+    def whole(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._br.process(data) + self._br.finish()
+        return self._gz.compress(data) + self._gz.flush(zlib.Z_FINISH)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._br.finish()
+        return self._gz.flush(zlib.Z_FINISH)
+
+
+class CompressionMiddleware:
+    """Compressão gzip/brotli negociada, para corpos a partir de COMPRESSION_MIN_SIZE."""
+
+    def __init__(self, app: ASGIApp, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        await _Responder(self.app, encoding, self.minimum_size)(scope, receive, send)
+
+
+class _Responder:
+    def __init__(self, app: ASGIApp, encoding: str, minimum_size: int):
+        self.app = app
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.start: Optional[Message] = None
+        self.compressor: Optional[_Compressor] = None
+        self.passthrough = False
+        self.size_in = 0
+        self.size_out = 0
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.send = send
+        await self.app(scope, receive, self.wrapped_send)
+
+    async def wrapped_send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            content_type = headers.get("content-type", "")
+            self.passthrough = (
+                "content-encoding" in headers
+                or message["status"] in (204, 304)
+                or content_type.startswith(_SKIP_TYPES)
+            )
+            self.start = message
+            if self.passthrough:
+                await self.send(message)
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body: bytes = message.get("body", b"")
+        more = message.get("more_body", False)
+        if self.start is not None:
+            start, self.start = self.start, None
+            if not more and len(body) < self.minimum_size:
+                await self.send(start)
+                await self.send(message)
+                self.passthrough = True
+                return
+            headers = MutableHeaders(raw=start["headers"])
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            self.compressor = _Compressor(self.encoding)
+            if not more:
+                compressed = self.compressor.whole(body)
+                headers["Content-Length"] = str(len(compressed))
+                encoding_metrics.record_compression(self.encoding, len(body), len(compressed))
+                await self.send(start)
+                await self.send({"type": "http.response.body", "body": compressed})
+                return
+            del headers["Content-Length"]
+            await self.send(start)
+
+        assert self.compressor is not None
+        out = self.compressor.chunk(body) if body else b""
+        self.size_in += len(body)
+        if not more:
+            out += self.compressor.finish()
+        self.size_out += len(out)
+        if not more:
+            encoding_metrics.record_compression(self.encoding, self.size_in, self.size_out)
+        await self.send({"type": "http.response.body", "body": out, "more_body": more})
@@ -1,9 +1,15 @@
 import os
-from typing import Generator
+from typing import Any, AsyncGenerator, Generator
 
 from dotenv import load_dotenv
+from fastapi import Request
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase, sessionmaker, Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from starlette.concurrency import run_in_threadpool
+
+from .pool import instrument, pool_options
 
 
 load_dotenv()
@@ -18,8 +24,92 @@ if not DATABASE_URL:
     raise RuntimeError("DATABASE_URL não definido nas variáveis de ambiente")
 
 
-engine = create_engine(DATABASE_URL, pool_pre_ping=True)
+def _async_url(url: str) -> str:
+    # psycopg 3 atende sync e async com o mesmo dialeto; psycopg2 não tem modo async
+    for prefix in ("postgresql+psycopg2://", "postgresql://", "postgres://"):
+        if url.startswith(prefix):
+            return "postgresql+psycopg://" + url[len(prefix):]
+    return url
+
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or _async_url(DATABASE_URL)
+
+# DB_ASYNC=0 mantém os routers servidos pela Session síncrona (em threadpool) para comparação
+DB_ASYNC = os.getenv("DB_ASYNC", "1").strip().lower() not in ("0", "false", "no", "off")
+
+
+# Tamanho do pool por processo; app.server ajusta conforme o número de workers.
+# Timeout, recycle e estratégia de pre-ping ficam em app/pool.py (DB_POOL_TIMEOUT,
+# DB_POOL_RECYCLE, DB_PRE_PING), junto das métricas expostas em /health/metrics.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+
+# Chaves do scope ASGI com as sessões que as sub-requisições de /batch compartilham
+SHARED_SESSION = "cjf.shared_session"
+SHARED_READ_SESSION = "cjf.shared_read_session"
+
+
+engine = create_engine(DATABASE_URL, **pool_options("sync", QueuePool, DB_POOL_SIZE, DB_MAX_OVERFLOW))
+instrument("sync", engine)
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+ThreadedSessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, expire_on_commit=False)
+
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **pool_options("async", AsyncAdaptedQueuePool, DB_POOL_SIZE, DB_MAX_OVERFLOW))
+instrument("async", async_engine.sync_engine)
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+
+class ThreadedSession:
+    """Session síncrona com a mesma interface awaitable de AsyncSession.
+
+    Cada operação de I/O roda no threadpool, reproduzindo o caminho antigo
+    (bloqueante) atrás da mesma API usada pelos routers async.
+    """
+
+    def __init__(self, session: Session):
+        self.sync_session = session
+
+    def add(self, instance: Any) -> None:
+        self.sync_session.add(instance)
+
+    def add_all(self, instances: Any) -> None:
+        self.sync_session.add_all(instances)
+
+    async def execute(self, *args: Any, **kwargs: Any) -> Any:
+        return await run_in_threadpool(self.sync_session.execute, *args, **kwargs)
+
+    async def scalar(self, *args: Any, **kwargs: Any) -> Any:
+        return await run_in_threadpool(self.sync_session.scalar, *args, **kwargs)
+
+    async def scalars(self, *args: Any, **kwargs: Any) -> Any:
+        return await run_in_threadpool(self.sync_session.scalars, *args, **kwargs)
+
+    async def get(self, *args: Any, **kwargs: Any) -> Any:
+        return await run_in_threadpool(self.sync_session.get, *args, **kwargs)
+
+    async def delete(self, instance: Any) -> None:
+        await run_in_threadpool(self.sync_session.delete, instance)
+
+    async def flush(self, *args: Any, **kwargs: Any) -> None:
+        await run_in_threadpool(self.sync_session.flush, *args, **kwargs)
+
+    async def refresh(self, *args: Any, **kwargs: Any) -> None:
+        await run_in_threadpool(self.sync_session.refresh, *args, **kwargs)
+
+    async def connection(self, *args: Any, **kwargs: Any) -> Any:
+        return await run_in_threadpool(self.sync_session.connection, *args, **kwargs)
+
+    async def commit(self) -> None:
+        await run_in_threadpool(self.sync_session.commit)
+
+    async def rollback(self) -> None:
+        await run_in_threadpool(self.sync_session.rollback)
+
+    async def invalidate(self) -> None:
+        await run_in_threadpool(self.sync_session.invalidate)
+
+    async def close(self) -> None:
+        await run_in_threadpool(self.sync_session.close)
 
 
 def get_db() -> Generator[Session, None, None]:
@@ -27,4 +117,21 @@ def get_db() -> Generator[Session, None, None]:
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+async def get_async_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    shared = request.scope.get(SHARED_SESSION)
+    if shared is not None:
+        # Quem abriu a sessão (o lote) a fecha
+        yield shared
+        return
+    if not DB_ASYNC:
+        db = ThreadedSession(ThreadedSessionLocal())
+        try:
+            yield db  # type: ignore
+        finally:
+            await db.close()
+        return
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,137 @@
+import csv
+import io
+import re
+import zipfile
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, AsyncIterator, Dict, List, Sequence
+from xml.sax.saxutils import escape
+
+import orjson
+
+
+# Linhas buscadas por ida ao cursor do servidor; a memória fica limitada a um lote
+EXPORT_CHUNK_SIZE = 2000
+
+FORMATOS = {
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "xlsx": ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "xlsx"),
+}
+
+Batches = AsyncIterator[Sequence[Sequence[Any]]]
+
+
+def _text(v: Any) -> str:
+    if v is None:
+        return ""
+    if isinstance(v, (date, datetime)):
+        return v.isoformat()
+    return str(v)
+
+
+async def csv_chunks(columns: List[str], batches: Batches) -> AsyncIterator[bytes]:
+    # BOM: o Excel só reconhece acentos em CSV UTF-8 com ele
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(columns)
+    yield b"\xef\xbb\xbf" + buf.getvalue().encode()
+    async for rows in batches:
+        buf.seek(0)
+        buf.truncate()
+        writer.writerows([_text(v) for v in row] for row in rows)
+        yield buf.getvalue().encode()
+
+
+def _json_value(v: Any) -> Any:
+    return float(v) if isinstance(v, Decimal) else v
+
+
+async def ndjson_chunks(columns: List[str], batches: Batches) -> AsyncIterator[bytes]:
+    async for rows in batches:
+        yield b"".join(orjson.dumps({c: _json_value(v) for c, v in zip(columns, row)}) + b"\n" for row in rows)
+
+
+# Caracteres de controle não são válidos em XML (planilha corrompida no Excel)
+_XML_INVALID = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+_XLSX_PARTS: Dict[str, str] = {
+    "[Content_Types].xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    "_rels/.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    "xl/workbook.xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Dados" sheetId="1" r:id="rId1"/></sheets></workbook>'
+    ),
+    "xl/_rels/workbook.xml.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    ),
+}
+
+
+def _cell(v: Any) -> str:
+    if v is None:
+        return "<c/>"
+    if isinstance(v, (int, float, Decimal)) and not isinstance(v, bool):
+        return f"<c><v>{v}</v></c>"
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{escape(_XML_INVALID.sub("", _text(v)))}</t></is></c>'
+
+
+class _Sink(io.RawIOBase):
+    """Destino não-seekable do ZipFile: acumula os bytes até o próximo yield."""
+
+    def __init__(self) -> None:
+        self._chunks: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: Any) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def take(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+async def xlsx_chunks(columns: List[str], batches: Batches) -> AsyncIterator[bytes]:
+    """XLSX mínimo (uma planilha, strings inline) gerado em streaming: o zip é
+    escrito com data descriptors, sem precisar voltar no arquivo."""
+    sink = _Sink()
+    with zipfile.ZipFile(sink, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, content in _XLSX_PARTS.items():
+            zf.writestr(name, content)
+        with zf.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as sheet:
+            sheet.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+            )
+            sheet.write(("<row>" + "".join(_cell(c) for c in columns) + "</row>").encode())
+            yield sink.take()
+            async for rows in batches:
+                sheet.write("".join("<row>" + "".join(_cell(v) for v in row) + "</row>" for row in rows).encode())
+                yield sink.take()
+            sheet.write(b"</sheetData></worksheet>")
+    yield sink.take()
+
+
+WRITERS = {"csv": csv_chunks, "ndjson": ndjson_chunks, "xlsx": xlsx_chunks}
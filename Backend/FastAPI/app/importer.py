@@ -0,0 +1,303 @@
+import csv
+import io
+import os
+import tempfile
+from dataclasses import dataclass, field
+from datetime import date
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Type
+
+import orjson
+from fastapi import HTTPException, Request
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import CTE, Column, Integer, MetaData, String, Table, case, insert, literal, null, or_, select, text, tuple_, union_all, update
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.schema import CreateTable
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from .database import AsyncSessionLocal
+from .bulk import commit_bulk, execute_with_events, json_object
+from .routers.utils import upper_except_email
+from .security import AuthContext
+
+
+# Linhas validadas e enviadas ao COPY por vez
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", "5000"))
+IMPORT_MAX_BYTES = int(os.getenv("IMPORT_MAX_BYTES", str(200 * 1024 * 1024)))
+# Erros detalhados no relatório; os demais só entram na contagem
+IMPORT_MAX_ERRORS = int(os.getenv("IMPORT_MAX_ERRORS", "1000"))
+# Acima disso o corpo recebido vai para disco em vez de memória
+_SPOOL_MEMORY = 8 * 1024 * 1024
+
+Prepare = Callable[[Dict[str, Any], Optional[AuthContext]], List[str]]
+
+
+@dataclass
+class ImportSpec:
+    """Entidade importável: schema de validação e colunas que identificam um registro existente."""
+
+    entidade: str
+    model: Any
+    schema: Type[BaseModel]
+    key: Tuple[str, ...]
+    prepare: Optional[Prepare] = None
+    columns: List[Tuple[str, Column]] = field(init=False)
+
+    def __post_init__(self) -> None:
+        mapper = self.model.__mapper__
+        self.columns = [(attr, mapper.attrs[attr].columns[0]) for attr in self.schema.model_fields]
+
+
+class ImportReport:
+    def __init__(self) -> None:
+        self.linhas = 0
+        self.validas = 0
+        self.com_erro = 0
+        self.erros: List[Dict[str, Any]] = []
+
+    def error(self, linha: int, erros: List[str]) -> None:
+        self.com_erro += 1
+        if len(self.erros) < IMPORT_MAX_ERRORS:
+            self.erros.append({"linha": linha, "erros": erros})
+
+
+async def spool_body(request: Request) -> Any:
+    """Recebe o corpo em streaming num arquivo temporário (memória até 8 MB, depois disco)."""
+    fh = tempfile.SpooledTemporaryFile(max_size=_SPOOL_MEMORY)
+    size = 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > IMPORT_MAX_BYTES:
+            fh.close()
+            raise HTTPException(status_code=413, detail=f"Arquivo acima do limite de {IMPORT_MAX_BYTES} bytes")
+        fh.write(chunk)
+    fh.seek(0)
+    return fh
+
+
+def _records(fh: Any, formato: str) -> Iterator[Tuple[int, Any]]:
+    # utf-8-sig: aceita o BOM que o Excel (e o nosso export) coloca no CSV
+    stream = io.TextIOWrapper(fh, encoding="utf-8-sig", newline="")
+    if formato == "csv":
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+        return
+    for linha, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            yield linha, orjson.loads(line)
+        except orjson.JSONDecodeError:
+            yield linha, None
+
+
+def _coerce(value: Any, column: Column) -> Any:
+    """Converte para o tipo da coluna e rejeita o que o COPY recusaria (e abortaria o lote inteiro)."""
+    if value is None:
+        return None
+    kind = column.type
+    if isinstance(value, str) and "\x00" in value:
+        raise ValueError("caractere nulo não permitido")
+    python_type = kind.python_type
+    if python_type is date and not isinstance(value, date):
+        try:
+            return date.fromisoformat(str(value))
+        except ValueError:
+            raise ValueError("data inválida (use AAAA-MM-DD)")
+    if python_type is Decimal:
+        try:
+            value = Decimal(str(value))
+        except InvalidOperation:
+            raise ValueError("número inválido")
+        if kind.precision is not None and abs(value) >= Decimal(10) ** (kind.precision - (kind.scale or 0)):
+            raise ValueError("valor fora do limite")
+        return value
+    if isinstance(kind, Integer) and not -2**31 <= value < 2**31:
+        raise ValueError("inteiro fora do limite")
+    if isinstance(kind, String) and kind.length and len(value) > kind.length:
+        raise ValueError(f"máximo de {kind.length} caracteres")
+    return value
+
+
+def _message(err: Dict[str, Any]) -> str:
+    loc = ".".join(str(p) for p in err["loc"])
+    return f"{loc}: {err['msg']}" if loc else err["msg"]
+
+
+def validate_chunk(
+    spec: ImportSpec,
+    records: Iterator[Tuple[int, Any]],
+    ctx: Optional[AuthContext],
+    seen: Dict[Tuple[Any, ...], int],
+    report: ImportReport,
+) -> Optional[List[Tuple[Any, ...]]]:
+    """Lê e valida até IMPORT_CHUNK_SIZE registros; devolve as linhas prontas para o
+    COPY, ou None quando o arquivo acabou."""
+    batch = list(islice(records, IMPORT_CHUNK_SIZE))
+    if not batch:
+        return None
+    fields = spec.schema.model_fields
+    rows: List[Tuple[Any, ...]] = []
+    for linha, raw in batch:
+        report.linhas += 1
+        if not isinstance(raw, dict):
+            report.error(linha, ["registro inválido: esperado um objeto JSON por linha"])
+        else:
+            # CSV: célula vazia é ausência de valor, não string vazia
+            data = {k: (None if v == "" else v) for k, v in raw.items() if k in fields}
+            try:
+                values = upper_except_email(spec.schema.model_validate(data).model_dump())
+            except ValidationError as exc:
+                report.error(linha, [_message(e) for e in exc.errors()])
+            else:
+                problems = spec.prepare(values, ctx) if spec.prepare else []
+                for attr, column in spec.columns:
+                    try:
+                        values[attr] = _coerce(values[attr], column)
+                    except ValueError as exc:
+                        problems.append(f"{attr}: {exc}")
+                key = tuple(values[k] for k in spec.key)
+                if not problems and None not in key:
+                    first = seen.setdefault(key, linha)
+                    if first != linha:
+                        problems.append(f"registro repetido no arquivo (linha {first})")
+                if problems:
+                    report.error(linha, problems)
+                else:
+                    # Bit por coluna enviada: só elas são sobrescritas em registros existentes
+                    presentes = sum(1 << i for i, (attr, _) in enumerate(spec.columns) if attr in data or attr in spec.key)
+                    rows.append((linha, presentes, *(values[attr] for attr, _ in spec.columns)))
+    report.validas += len(rows)
+    return rows
+
+
+def _staging_table(spec: ImportSpec) -> Table:
+    return Table(
+        f"_import_{str(spec.model.__table__.name).lower()}",
+        MetaData(),
+        Column("linha", Integer),
+        Column("presentes", Integer),
+        *(Column(column.name, column.type) for _, column in spec.columns),
+        prefixes=["TEMPORARY"],
+        postgresql_on_commit="DROP",
+    )
+
+
+def _merge_changes(spec: ImportSpec, staging: Table) -> CTE:
+    """Atualiza os registros já existentes (pela chave) que mudaram e insere o resto;
+    devolve as linhas afetadas no formato de app.bulk.with_events.
+
+    Linhas com chave incompleta são sempre inseridas. Na atualização, colunas ausentes
+    do arquivo (bit desligado em `presentes`) mantêm o valor atual. O self-join em
+    `prev` fornece os valores anteriores para a auditoria.
+    """
+    t = spec.model.__table__
+    s = staging
+    prev = t.alias("prev")
+    fields = [(attr, column.name) for attr, column in spec.columns]
+    cols = [name for _, name in fields]
+    keys = [spec.model.__mapper__.attrs[k].columns[0].name for k in spec.key]
+    novo = {c: case((s.c.presentes.op("&")(1 << i) != 0, s.c[c]), else_=t.c[c]) for i, c in enumerate(cols)}
+
+    upd = (
+        update(t)
+        .values(novo)
+        .where(*(t.c[k] == s.c[k] for k in keys), prev.c.id == t.c.id)
+        .where(tuple_(*(t.c[c] for c in cols)).is_distinct_from(tuple_(*novo.values())))
+        .returning(literal("update").label("acao"), t.c.id, json_object(prev, fields).label("antes"), json_object(t, fields).label("depois"))
+        .cte("upd")
+    )
+    existing = t.alias("existente")
+    novos = (
+        select(*(s.c[c] for c in cols))
+        .where(or_(
+            or_(*(s.c[k].is_(None) for k in keys)),
+            ~select(existing.c.id).where(*(existing.c[k] == s.c[k] for k in keys)).exists(),
+        ))
+        .order_by(s.c.linha)
+    )
+    ins = (
+        insert(t)
+        .from_select(cols, novos)
+        .returning(literal("create").label("acao"), t.c.id, null().cast(JSONB).label("antes"), json_object(t, fields).label("depois"))
+        .cte("ins")
+    )
+    return union_all(select(upd), select(ins)).cte("mudancas")
+
+
+async def run_import(
+    db: AsyncSession,
+    spec: ImportSpec,
+    fh: Any,
+    formato: str,
+    ctx: Optional[AuthContext],
+    atomico: bool = False,
+) -> Dict[str, Any]:
+    """Valida o arquivo em lotes, carrega as linhas válidas por COPY numa tabela
+    temporária e faz o merge na tabela da entidade com um único comando.
+
+    Com `atomico`, qualquer linha inválida cancela a importação inteira.
+    """
+    report = ImportReport()
+    seen: Dict[Tuple[Any, ...], int] = {}
+    records = _records(fh, formato)
+    staging = _staging_table(spec)
+    cols = ", ".join(f'"{c.name}"' for c in staging.columns)
+
+    conn = await db.connection()
+    await conn.execute(CreateTable(staging))
+    raw = await conn.get_raw_connection()
+    try:
+        async with raw.driver_connection.cursor() as cur:
+            async with cur.copy(f"COPY {staging.name} ({cols}) FROM STDIN") as copy:
+                while True:
+                    rows = await run_in_threadpool(validate_chunk, spec, records, ctx, seen, report)
+                    if rows is None:
+                        break
+                    for row in rows:
+                        await copy.write_row(row)
+    except UnicodeDecodeError:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="Arquivo não está em UTF-8")
+
+    resumo: Dict[str, Any] = {
+        "linhas": report.linhas,
+        "validas": report.validas,
+        "com_erro": report.com_erro,
+        "criadas": 0,
+        "atualizadas": 0,
+        "inalteradas": 0,
+        "erros": report.erros,
+    }
+    if atomico and report.com_erro:
+        await db.rollback()
+        raise HTTPException(status_code=422, detail={"mensagem": "Importação cancelada: há linhas com erro", **resumo})
+
+    # Tabela temporária não passa pelo autovacuum: sem estatísticas o plano do merge erra o tamanho
+    await conn.execute(text(f"ANALYZE {staging.name}"))
+    totais = await execute_with_events(db, _merge_changes(spec, staging), spec.entidade, ctx.username if ctx else "SYSTEM")
+    resumo["criadas"] = totais.get("create", 0)
+    resumo["atualizadas"] = totais.get("update", 0)
+    await commit_bulk(db, spec.entidade, resumo["criadas"] + resumo["atualizadas"], ctx.escritorio_id if ctx else None)
+    resumo["inalteradas"] = report.validas - resumo["criadas"] - resumo["atualizadas"]
+    return resumo
+
+
+async def import_request(
+    request: Request,
+    spec: ImportSpec,
+    formato: str,
+    ctx: Optional[AuthContext],
+    atomico: bool = False,
+) -> Dict[str, Any]:
+    """Importa o corpo da requisição (CSV com cabeçalho ou NDJSON) para a entidade de `spec`."""
+    fh = await spool_body(request)
+    try:
+        # Session async própria: o COPY usa a conexão do psycopg, mesmo com DB_ASYNC=0
+        async with AsyncSessionLocal() as db:
+            return await run_import(db, spec, fh, formato, ctx, atomico)
+    finally:
+        fh.close()
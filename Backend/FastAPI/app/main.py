@@ -2,11 +2,20 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import os
 from .routers import health, items
-from .routers import advogados, clientes, causas_processos, especialidades, parametros, usuarios, perfil, permissoes, auditoria, auth, escritorios, seeds
-from .database import Base, engine
-from sqlalchemy import text
-from sqlalchemy.exc import OperationalError
-import time
+from .routers import advogados, clientes, causas_processos, especialidades, parametros, usuarios, perfil, permissoes, auditoria, auth, escritorios, seeds, eventos, sync, batch
+from .database import engine
+from .audit import audit_writer
+from .cache import cache
+from .changefeed import change_feed
+from .compression import CompressionMiddleware
+from .singleflight import SingleFlightMiddleware
+from .serialization import ORJSONResponse
+from .migrations import verify_schema
+from .partitions import maintain_partitions
+from .replicas import replicas, read_your_writes, monitor_replicas, dispose_replicas
+from .routers.pagination import NEXT_CURSOR_HEADER
+from typing import Optional
+import asyncio
 
 tags_metadata = [
     {
@@ -29,6 +38,9 @@ tags_metadata = [
     {"name": "auditoria", "description": "Registros de auditoria"},
     {"name": "auth", "description": "Autenticação e usuário atual"},
     {"name": "seeds", "description": "Criação de dados de demonstração"},
+    {"name": "eventos", "description": "Feed de alterações em tempo real (SSE/WebSocket)"},
+    {"name": "sync", "description": "Sincronização incremental de cópias locais"},
+    {"name": "batch", "description": "Vários GETs numa única requisição"},
 ]
 
 app = FastAPI(
@@ -39,8 +51,13 @@ app = FastAPI(
     ),
     version="0.1.0",
     openapi_tags=tags_metadata,
+    default_response_class=ORJSONResponse,
 )
 
+# Primeiro middleware adicionado = o mais interno: o single-flight compartilha a resposta
+# ainda sem compressão e sem CORS, que continuam aplicados por requisição
+app.add_middleware(SingleFlightMiddleware)
+
 # CORS (permitir frontend local e via NGINX)
 _origins_env = os.getenv("CORS_ORIGINS")
 allowed_origins = [o.strip() for o in _origins_env.split(",") if o.strip()] if _origins_env else None
@@ -51,6 +68,7 @@ if allowed_origins:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[NEXT_CURSOR_HEADER, "ETag", "Last-Modified"],
     )
 else:
     app.add_middleware(
@@ -59,9 +77,17 @@ else:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[NEXT_CURSOR_HEADER, "ETag", "Last-Modified"],
     )
 
 
+# gzip/brotli negociado pelo Accept-Encoding, só acima de COMPRESSION_MIN_SIZE
+app.add_middleware(CompressionMiddleware)
+
+# Fixa leituras no primário logo após uma escrita do mesmo cliente (só com réplicas)
+app.middleware("http")(read_your_writes)
+
+
 @app.get("/", summary="Status da API")
 def read_root():
     return {"message": "API em execução"}
@@ -82,56 +108,43 @@ app.include_router(perfil.router, prefix="/perfil", tags=["perfil"])
 app.include_router(permissoes.router, prefix="/permissoes", tags=["permissoes"])
 app.include_router(auditoria.router, prefix="/auditoria", tags=["auditoria"])
 app.include_router(seeds.router, prefix="/seeds", tags=["seeds"])
+app.include_router(eventos.router, prefix="/eventos", tags=["eventos"])
+app.include_router(sync.router, prefix="/sync", tags=["sync"])
+app.include_router(batch.router, prefix="/batch", tags=["batch"])
 
 
 @app.on_event("startup")
 def on_startup():
-    # Aguardar banco ficar pronto e criar tabelas
-    for _ in range(30):  # até ~30s
-        try:
-            Base.metadata.create_all(bind=engine)
-            break
-        except OperationalError:
-            time.sleep(1)
-
-    # Garantir coluna 'valor' em CausasProcessos
-    with engine.begin() as conn:
-        exists = conn.execute(text(
-            """
-            SELECT 1 FROM information_schema.columns
-            WHERE table_schema = 'public'
-              AND table_name = 'CausasProcessos'
-              AND column_name = 'valor'
-            """
-        )).scalar() is not None
-        if not exists:
-            conn.execute(text("ALTER TABLE \"CausasProcessos\" ADD COLUMN valor numeric(14,2) DEFAULT 0 NOT NULL"))
-
-    # Garantir coluna 'dataDistribuicao' (DATE) em CausasProcessos
-    with engine.begin() as conn:
-        exists = conn.execute(text(
-            """
-            SELECT 1 FROM information_schema.columns
-            WHERE table_schema = 'public'
-              AND table_name = 'CausasProcessos'
-              AND column_name = 'datadistribuicao'
-            """
-        )).scalar() is not None
-        if not exists:
-            conn.execute(text("ALTER TABLE \"CausasProcessos\" ADD COLUMN dataDistribuicao date NULL"))
-
-    # Garantir coluna 'advogado_id' em Usuarios
-    with engine.begin() as conn:
-        exists = conn.execute(text(
-            """
-            SELECT 1 FROM information_schema.columns
-            WHERE table_schema = 'public'
-              AND table_name = 'Usuarios'
-              AND column_name = 'advogado_id'
-            """
-        )).scalar() is not None
-        if not exists:
-            conn.execute(text("ALTER TABLE \"Usuarios\" ADD COLUMN advogado_id integer NULL"))
+    # Uma consulta à versão do schema; se estiver atrás, o primeiro worker migra sob advisory lock
+    verify_schema(engine)
+
+
+_partition_task: Optional[asyncio.Task] = None
+_replica_task: Optional[asyncio.Task] = None
+
+
+@app.on_event("startup")
+async def start_background_tasks():
+    # AUDIT_BACKGROUND=0 mantém a auditoria gravada na mesma transação da requisição
+    if os.getenv("AUDIT_BACKGROUND", "1").strip().lower() not in ("0", "false", "no", "off"):
+        audit_writer.start()
+    await cache.start()
+    await change_feed.start()
+    global _partition_task, _replica_task
+    _partition_task = asyncio.create_task(maintain_partitions())
+    if replicas:
+        _replica_task = asyncio.create_task(monitor_replicas())
+
+
+@app.on_event("shutdown")
+async def stop_background_tasks():
+    for task in (_partition_task, _replica_task):
+        if task:
+            task.cancel()
+    await audit_writer.stop()
+    await dispose_replicas()
+    await cache.stop()
+    await change_feed.stop()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,109 @@
+"""Migrações versionadas do schema.
+
+Cada script `mNNNN_<nome>.py` expõe `upgrade(conn)` e roda em transação
+própria; a versão aplicada fica em "SchemaVersion". A execução é serializada
+por advisory lock, então vários workers (ou o CLI `python -m app.migrations`)
+podem disputar sem aplicar a mesma migração duas vezes.
+"""
+import importlib
+import logging
+import os
+import pkgutil
+import re
+import time
+from dataclasses import dataclass
+from typing import Callable, List
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import OperationalError, ProgrammingError
+
+
+logger = logging.getLogger(__name__)
+
+# Com 0, o startup só verifica a versão e falha se o banco estiver desatualizado
+MIGRATE_ON_STARTUP = os.getenv("MIGRATE_ON_STARTUP", "1").strip().lower() not in ("0", "false", "no", "off")
+
+_LOCK_SQL = "SELECT pg_advisory_lock(hashtext('cjf_migrations'))"
+_UNLOCK_SQL = "SELECT pg_advisory_unlock(hashtext('cjf_migrations'))"
+
+
+@dataclass
+class Migration:
+    version: int
+    name: str
+    upgrade: Callable[[Connection], None]
+
+
+def load_migrations() -> List[Migration]:
+    found: List[Migration] = []
+    for info in pkgutil.iter_modules(__path__):
+        m = re.fullmatch(r"m(\d{4})_(\w+)", info.name)
+        if not m:
+            continue
+        module = importlib.import_module(f"{__name__}.{info.name}")
+        found.append(Migration(int(m.group(1)), m.group(2), module.upgrade))
+    found.sort(key=lambda mg: mg.version)
+    return found
+
+
+MIGRATIONS = load_migrations()
+LATEST = MIGRATIONS[-1].version if MIGRATIONS else 0
+
+
+def current_version(conn: Connection) -> int:
+    try:
+        return conn.execute(text('SELECT max(version) FROM "SchemaVersion"')).scalar() or 0
+    except ProgrammingError:
+        conn.rollback()
+        return 0
+
+
+def migrate(engine: Engine) -> int:
+    """Aplica as migrações pendentes; retorna a versão final."""
+    with engine.connect() as conn:
+        conn.execute(text(_LOCK_SQL))
+        conn.commit()
+        try:
+            conn.execute(text(
+                """
+                CREATE TABLE IF NOT EXISTS "SchemaVersion" (
+                    version integer PRIMARY KEY,
+                    nome varchar(128) NOT NULL,
+                    aplicado_em timestamp NOT NULL DEFAULT now()
+                )
+                """
+            ))
+            conn.commit()
+            version = current_version(conn)
+            conn.commit()
+            for mg in MIGRATIONS:
+                if mg.version <= version:
+                    continue
+                logger.info("Aplicando migração %04d_%s", mg.version, mg.name)
+                with conn.begin():
+                    mg.upgrade(conn)
+                    conn.execute(text('INSERT INTO "SchemaVersion" (version, nome) VALUES (:v, :n)'), {"v": mg.version, "n": mg.name})
+                version = mg.version
+            return version
+        finally:
+            conn.execute(text(_UNLOCK_SQL))
+            conn.commit()
+
+
+def verify_schema(engine: Engine, wait: int = 30) -> None:
+    """Checagem do startup: uma consulta à versão; migra (sob lock) só se estiver atrás."""
+    for attempt in range(wait):
+        try:
+            with engine.connect() as conn:
+                version = current_version(conn)
+            break
+        except OperationalError:
+            if attempt == wait - 1:
+                raise
+            time.sleep(1)
+    if version == LATEST:
+        return
+    if not MIGRATE_ON_STARTUP:
+        raise RuntimeError(f"Schema na versão {version}, esperado {LATEST}: execute python -m app.migrations")
+    migrate(engine)
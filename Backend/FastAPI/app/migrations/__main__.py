@@ -0,0 +1,10 @@
+import logging
+
+from ..database import engine
+from . import LATEST, migrate
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    version = migrate(engine)
+    print(f"Schema na versão {version} (última: {LATEST})")
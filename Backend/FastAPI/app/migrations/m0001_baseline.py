@@ -0,0 +1,210 @@
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+
+
+# Schema congelado como estava quando as migrações foram introduzidas: os modelos
+# mudam depois (versao/atualizado_em, CausasResumo, SyncRemocoes...), e essas
+# mudanças entram pelas migrações seguintes, não por aqui.
+# Como o create_all de então: tabela que já existe (banco anterior às migrações)
+# fica como está, sem os índices; as migrações 0002+ completam o que faltar.
+TABELAS = (
+    ("Advogados", (
+        """
+        CREATE TABLE "Advogados" (
+            nome VARCHAR(255) NOT NULL,
+            oab VARCHAR(64),
+            email VARCHAR(255),
+            telefone VARCHAR(64),
+            especialidade_id INTEGER,
+            id SERIAL NOT NULL,
+            PRIMARY KEY (id)
+        )
+        """,
+        'CREATE INDEX "ix_Advogados_id" ON "Advogados" (id)',
+    )),
+    ("Auditoria", (
+        """
+        CREATE TABLE "Auditoria" (
+            id BIGSERIAL NOT NULL,
+            entidade VARCHAR(128) NOT NULL,
+            entidade_id INTEGER NOT NULL,
+            acao VARCHAR(32) NOT NULL,
+            quem VARCHAR(128) NOT NULL,
+            quando TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            alteracoes JSONB,
+            diff TEXT,
+            PRIMARY KEY (id, quando)
+        ) PARTITION BY RANGE (quando)
+        """,
+        'CREATE INDEX "ix_Auditoria_alteracoes" ON "Auditoria" USING gin (alteracoes)',
+        'CREATE INDEX "ix_Auditoria_entidade_entidade_id" ON "Auditoria" (entidade, entidade_id, id)',
+        'CREATE INDEX "ix_Auditoria_quando" ON "Auditoria" (quando)',
+    )),
+    ("CausasProcessos", (
+        """
+        CREATE TABLE "CausasProcessos" (
+            numero VARCHAR(128) NOT NULL,
+            descricao TEXT,
+            status VARCHAR(64),
+            cliente_id INTEGER,
+            advogado_id INTEGER,
+            escritorio_id INTEGER,
+            especialidade_id INTEGER,
+            datadistribuicao DATE,
+            valor NUMERIC(14, 2),
+            id SERIAL NOT NULL,
+            PRIMARY KEY (id)
+        )
+        """,
+        'CREATE INDEX "ix_CausasProcessos_id" ON "CausasProcessos" (id)',
+    )),
+    ("Clientes", (
+        """
+        CREATE TABLE "Clientes" (
+            nome VARCHAR(255) NOT NULL,
+            cpf_cnpj VARCHAR(32),
+            email VARCHAR(255),
+            telefone VARCHAR(64),
+            id SERIAL NOT NULL,
+            PRIMARY KEY (id)
+        )
+        """,
+        'CREATE INDEX "ix_Clientes_id" ON "Clientes" (id)',
+    )),
+    ("Escritorios", (
+        """
+        CREATE TABLE "Escritorios" (
+            nome VARCHAR(255) NOT NULL,
+            cnpj VARCHAR(32),
+            email VARCHAR(255),
+            telefone VARCHAR(64),
+            id SERIAL NOT NULL,
+            PRIMARY KEY (id)
+        )
+        """,
+        'CREATE INDEX "ix_Escritorios_id" ON "Escritorios" (id)',
+    )),
+    ("Especialidades", (
+        """
+        CREATE TABLE "Especialidades" (
+            nome VARCHAR(255) NOT NULL,
+            descricao TEXT,
+            id SERIAL NOT NULL,
+            PRIMARY KEY (id)
+        )
+        """,
+        'CREATE INDEX "ix_Especialidades_id" ON "Especialidades" (id)',
+    )),
+    ("Outbox", (
+        """
+        CREATE TABLE "Outbox" (
+            id BIGSERIAL NOT NULL,
+            entidade VARCHAR(128) NOT NULL,
+            entidade_id INTEGER NOT NULL,
+            acao VARCHAR(32) NOT NULL,
+            alteracoes JSONB NOT NULL,
+            criado_em TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            PRIMARY KEY (id)
+        )
+        """,
+    )),
+    ("Parametros", (
+        """
+        CREATE TABLE "Parametros" (
+            chave VARCHAR(128) NOT NULL,
+            valor TEXT,
+            id SERIAL NOT NULL,
+            PRIMARY KEY (id),
+            UNIQUE (chave)
+        )
+        """,
+        'CREATE INDEX "ix_Parametros_id" ON "Parametros" (id)',
+    )),
+    ("Perfil", (
+        """
+        CREATE TABLE "Perfil" (
+            nome VARCHAR(128) NOT NULL,
+            descricao TEXT,
+            permissoes TEXT,
+            id SERIAL NOT NULL,
+            PRIMARY KEY (id)
+        )
+        """,
+        'CREATE INDEX "ix_Perfil_id" ON "Perfil" (id)',
+    )),
+    ("Permissoes", (
+        """
+        CREATE TABLE "Permissoes" (
+            nome VARCHAR(128) NOT NULL,
+            descricao TEXT,
+            id SERIAL NOT NULL,
+            PRIMARY KEY (id)
+        )
+        """,
+        'CREATE INDEX "ix_Permissoes_id" ON "Permissoes" (id)',
+    )),
+    ("items", (
+        """
+        CREATE TABLE items (
+            id SERIAL NOT NULL,
+            name VARCHAR(255) NOT NULL,
+            description TEXT,
+            price FLOAT NOT NULL,
+            PRIMARY KEY (id)
+        )
+        """,
+        "CREATE INDEX ix_items_id ON items (id)",
+    )),
+    ("AdvogadoEscritorios", (
+        """
+        CREATE TABLE "AdvogadoEscritorios" (
+            advogado_id INTEGER NOT NULL,
+            escritorio_id INTEGER NOT NULL,
+            PRIMARY KEY (advogado_id, escritorio_id),
+            CONSTRAINT fk_advogadoescritorios_advogado FOREIGN KEY(advogado_id) REFERENCES "Advogados" (id) ON DELETE CASCADE,
+            CONSTRAINT fk_advogadoescritorios_escritorio FOREIGN KEY(escritorio_id) REFERENCES "Escritorios" (id) ON DELETE CASCADE
+        )
+        """,
+        'CREATE INDEX "ix_AdvogadoEscritorios_escritorio_id" ON "AdvogadoEscritorios" (escritorio_id)',
+    )),
+    ("Usuarios", (
+        """
+        CREATE TABLE "Usuarios" (
+            username VARCHAR(64) NOT NULL,
+            nome VARCHAR(255) NOT NULL,
+            email VARCHAR(255),
+            role VARCHAR(64),
+            senha_hash TEXT,
+            permissoes TEXT,
+            advogado_id INTEGER,
+            id SERIAL NOT NULL,
+            PRIMARY KEY (id),
+            UNIQUE (username),
+            CONSTRAINT fk_usuarios_advogado FOREIGN KEY(advogado_id) REFERENCES "Advogados" (id) ON DELETE SET NULL
+        )
+        """,
+        'CREATE INDEX "ix_Usuarios_advogado_id" ON "Usuarios" (advogado_id)',
+        'CREATE INDEX "ix_Usuarios_id" ON "Usuarios" (id)',
+    )),
+    ("UsuarioEscritorios", (
+        """
+        CREATE TABLE "UsuarioEscritorios" (
+            usuario_id INTEGER NOT NULL,
+            escritorio_id INTEGER NOT NULL,
+            PRIMARY KEY (usuario_id, escritorio_id),
+            CONSTRAINT fk_usuarioescritorios_usuario FOREIGN KEY(usuario_id) REFERENCES "Usuarios" (id) ON DELETE CASCADE,
+            CONSTRAINT fk_usuarioescritorios_escritorio FOREIGN KEY(escritorio_id) REFERENCES "Escritorios" (id) ON DELETE CASCADE
+        )
+        """,
+        'CREATE INDEX "ix_UsuarioEscritorios_escritorio_id" ON "UsuarioEscritorios" (escritorio_id)',
+    )),
+)
+
+
+def upgrade(conn: Connection) -> None:
+    existentes = set(inspect(conn).get_table_names())
+    for tabela, ddl in TABELAS:
+        if tabela in existentes:
+            continue
+        for sql in ddl:
+            conn.execute(text(sql))
@@ -0,0 +1,10 @@
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+
+def upgrade(conn: Connection) -> None:
+    # Colunas adicionadas depois da criação das tabelas em bancos antigos
+    conn.execute(text("ALTER TABLE \"CausasProcessos\" ADD COLUMN IF NOT EXISTS valor numeric(14,2) DEFAULT 0 NOT NULL"))
+    conn.execute(text("ALTER TABLE \"CausasProcessos\" ADD COLUMN IF NOT EXISTS dataDistribuicao date NULL"))
+    conn.execute(text("ALTER TABLE \"Usuarios\" ADD COLUMN IF NOT EXISTS advogado_id integer NULL"))
+    conn.execute(text("ALTER TABLE \"Perfil\" ADD COLUMN IF NOT EXISTS permissoes text NULL"))
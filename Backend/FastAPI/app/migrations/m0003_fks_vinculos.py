@@ -0,0 +1,28 @@
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+
+FOREIGN_KEYS = [
+    ("AdvogadoEscritorios", "fk_advogadoescritorios_advogado", "advogado_id", "Advogados", "CASCADE"),
+    ("AdvogadoEscritorios", "fk_advogadoescritorios_escritorio", "escritorio_id", "Escritorios", "CASCADE"),
+    ("UsuarioEscritorios", "fk_usuarioescritorios_usuario", "usuario_id", "Usuarios", "CASCADE"),
+    ("UsuarioEscritorios", "fk_usuarioescritorios_escritorio", "escritorio_id", "Escritorios", "CASCADE"),
+    ("Usuarios", "fk_usuarios_advogado", "advogado_id", "Advogados", "SET NULL"),
+]
+
+
+def upgrade(conn: Connection) -> None:
+    # FKs e índices dos vínculos em bancos criados antes dos relacionamentos.
+    # NOT VALID: vale para novas linhas sem falhar por órfãos já existentes.
+    for table, name, column, ref_table, on_delete in FOREIGN_KEYS:
+        exists = conn.execute(text(
+            "SELECT 1 FROM pg_constraint WHERE conname = :name"
+        ), {"name": name}).scalar() is not None
+        if not exists:
+            conn.execute(text(
+                f"ALTER TABLE \"{table}\" ADD CONSTRAINT {name} FOREIGN KEY ({column}) "
+                f"REFERENCES \"{ref_table}\" (id) ON DELETE {on_delete} NOT VALID"
+            ))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS \"ix_AdvogadoEscritorios_escritorio_id\" ON \"AdvogadoEscritorios\" (escritorio_id)"))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS \"ix_UsuarioEscritorios_escritorio_id\" ON \"UsuarioEscritorios\" (escritorio_id)"))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS \"ix_Usuarios_advogado_id\" ON \"Usuarios\" (advogado_id)"))
@@ -0,0 +1,12 @@
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from ..partitions import convert_legacy_auditoria, ensure_auditoria_partitions
+
+
+def upgrade(conn: Connection) -> None:
+    # Auditoria particionada por mês, com alterações campo a campo em JSONB
+    convert_legacy_auditoria(conn)
+    ensure_auditoria_partitions(conn)
+    conn.execute(text("ALTER TABLE \"Auditoria\" ADD COLUMN IF NOT EXISTS alteracoes jsonb NULL"))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS \"ix_Auditoria_alteracoes\" ON \"Auditoria\" USING gin (alteracoes)"))
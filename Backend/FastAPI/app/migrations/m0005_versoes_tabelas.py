@@ -0,0 +1,8 @@
+from sqlalchemy.engine import Connection
+
+from ..models.tabela_versao import TabelaVersao
+
+
+def upgrade(conn: Connection) -> None:
+    # Contadores de versão por entidade usados nos ETags (bancos anteriores ao baseline atual)
+    TabelaVersao.__table__.create(bind=conn, checkfirst=True)
@@ -0,0 +1,24 @@
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+
+# Mesma regra de app.routers.utils.build_diff, para auditoria gerada em SQL nas operações em lote
+DIFF_ALTERACOES = """
+CREATE OR REPLACE FUNCTION diff_alteracoes(antes jsonb, depois jsonb) RETURNS jsonb
+LANGUAGE sql IMMUTABLE AS $$
+    SELECT COALESCE(jsonb_object_agg(k, jsonb_build_object('antes', antes -> k, 'depois', depois -> k)), '{}'::jsonb)
+    FROM jsonb_object_keys(COALESCE(depois, antes)) AS k
+    WHERE CASE
+        WHEN antes IS NULL THEN depois -> k <> 'null'::jsonb
+        WHEN depois IS NULL THEN antes -> k <> 'null'::jsonb
+        ELSE antes -> k IS DISTINCT FROM depois -> k
+    END
+$$
+"""
+
+
+def upgrade(conn: Connection) -> None:
+    # Chaves usadas pelo merge da importação em lote (clientes por CPF/CNPJ, causas por número + escritório)
+    conn.execute(text("CREATE INDEX IF NOT EXISTS \"ix_Clientes_cpf_cnpj\" ON \"Clientes\" (cpf_cnpj)"))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS \"ix_CausasProcessos_numero_escritorio_id\" ON \"CausasProcessos\" (numero, escritorio_id)"))
+    conn.execute(text(DIFF_ALTERACOES))
@@ -0,0 +1,68 @@
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from ..models.causas_resumo import CausaResumo
+
+
+GRUPO = "escritorio_id, status, especialidade_id, advogado_id, mes"
+
+
+def _linhas(tabela: str, sinal: int) -> str:
+    return (
+        f"SELECT escritorio_id, status, especialidade_id, advogado_id, "
+        f"date_trunc('month', datadistribuicao)::date AS mes, {sinal} AS quantidade, "
+        f"{sinal} * COALESCE(valor, 0) AS valor_total FROM {tabela}"
+    )
+
+
+def _aplicar(*fontes: str) -> str:
+    # Deltas agregados por grupo; ORDER BY fixa a ordem de travamento entre transações concorrentes
+    return f"""
+        INSERT INTO "CausasResumo" AS r ({GRUPO}, quantidade, valor_total)
+        SELECT {GRUPO}, sum(quantidade), sum(valor_total)
+        FROM ({" UNION ALL ".join(fontes)}) AS delta
+        GROUP BY {GRUPO}
+        HAVING sum(quantidade) <> 0 OR sum(valor_total) <> 0
+        ORDER BY {GRUPO}
+        ON CONFLICT ON CONSTRAINT "uq_CausasResumo_grupo" DO UPDATE
+        SET quantidade = r.quantidade + EXCLUDED.quantidade, valor_total = r.valor_total + EXCLUDED.valor_total;
+    """
+
+
+# Trigger por comando com tabelas de transição: um UPDATE/DELETE em lote vira um único upsert agregado
+FUNCAO = f"""
+CREATE OR REPLACE FUNCTION causas_resumo_aplicar() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        {_aplicar(_linhas("novas", 1))}
+    ELSIF TG_OP = 'DELETE' THEN
+        {_aplicar(_linhas("antigas", -1))}
+    ELSE
+        {_aplicar(_linhas("novas", 1), _linhas("antigas", -1))}
+    END IF;
+    DELETE FROM "CausasResumo" WHERE quantidade = 0;
+    RETURN NULL;
+END
+$$
+"""
+
+TRIGGERS = [
+    ("trg_causas_resumo_insert", "INSERT", "NEW TABLE AS novas"),
+    ("trg_causas_resumo_update", "UPDATE", "OLD TABLE AS antigas NEW TABLE AS novas"),
+    ("trg_causas_resumo_delete", "DELETE", "OLD TABLE AS antigas"),
+]
+
+
+def upgrade(conn: Connection) -> None:
+    CausaResumo.__table__.create(bind=conn, checkfirst=True)
+    # Bloqueia escritas até os triggers existirem, para a carga inicial não perder alterações
+    conn.execute(text('LOCK TABLE "CausasProcessos" IN SHARE ROW EXCLUSIVE MODE'))
+    conn.execute(text(FUNCAO))
+    for nome, evento, referencia in TRIGGERS:
+        conn.execute(text(f'DROP TRIGGER IF EXISTS {nome} ON "CausasProcessos"'))
+        conn.execute(text(
+            f'CREATE TRIGGER {nome} AFTER {evento} ON "CausasProcessos" '
+            f"REFERENCING {referencia} FOR EACH STATEMENT EXECUTE FUNCTION causas_resumo_aplicar()"
+        ))
+    conn.execute(text('DELETE FROM "CausasResumo"'))
+    conn.execute(text(_aplicar(_linhas('"CausasProcessos"', 1))))
@@ -0,0 +1,110 @@
+from typing import List
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from ..models.sync_remocao import SyncRemocao
+
+
+TABELAS = ["Clientes", "Advogados", "CausasProcessos"]
+
+XID = "pg_current_xact_id()::text::bigint"
+AGORA = "timezone('utc', now())"
+
+# Linha alterada passa a ter a versão da transação atual (o INSERT usa o default da coluna)
+SYNC_MARCAR = f"""
+CREATE OR REPLACE FUNCTION sync_marcar() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    NEW.versao := {XID};
+    NEW.atualizado_em := {AGORA};
+    RETURN NEW;
+END
+$$
+"""
+
+# Tombstones por comando; o escritório (quando a tabela tem) restringe quem recebe a remoção
+SYNC_REMOCOES = """
+CREATE OR REPLACE FUNCTION sync_remocoes() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO "SyncRemocoes" (entidade, entidade_id, escritorio_id)
+    SELECT TG_TABLE_NAME, a.id, (to_jsonb(a) ->> 'escritorio_id')::int FROM antigas a;
+    RETURN NULL;
+END
+$$
+"""
+
+# Causa que mudou de escritório some da cópia local do escritório anterior
+SYNC_SAIU_DO_ESCRITORIO = """
+CREATE OR REPLACE FUNCTION sync_saiu_do_escritorio() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO "SyncRemocoes" (entidade, entidade_id, escritorio_id)
+    SELECT TG_TABLE_NAME, a.id, a.escritorio_id
+    FROM antigas a JOIN novas n ON n.id = a.id
+    WHERE a.escritorio_id IS NOT NULL AND a.escritorio_id IS DISTINCT FROM n.escritorio_id;
+    RETURN NULL;
+END
+$$
+"""
+
+# Vínculos com escritórios fazem parte do advogado sincronizado (escritorios_ids)
+SYNC_VINCULOS_ADVOGADO = f"""
+CREATE OR REPLACE FUNCTION sync_vinculos_advogado() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        UPDATE "Advogados" SET versao = {XID}, atualizado_em = {AGORA} WHERE id IN (SELECT advogado_id FROM novas);
+    ELSE
+        UPDATE "Advogados" SET versao = {XID}, atualizado_em = {AGORA} WHERE id IN (SELECT advogado_id FROM antigas);
+    END IF;
+    RETURN NULL;
+END
+$$
+"""
+
+# Visibilidade da versão no snapshot tirado na primeira página de uma sincronização
+SYNC_VISIVEL = """
+CREATE OR REPLACE FUNCTION sync_visivel(versao bigint, snapshot text) RETURNS boolean
+LANGUAGE sql IMMUTABLE AS $$
+    SELECT pg_visible_in_snapshot(versao::text::xid8, snapshot::pg_snapshot)
+$$
+"""
+
+
+def _trigger(nome: str, tabela: str, quando: str, funcao: str) -> List[str]:
+    return [
+        f'DROP TRIGGER IF EXISTS {nome} ON "{tabela}"',
+        f'CREATE TRIGGER {nome} {quando} ON "{tabela}" {funcao}',
+    ]
+
+
+def upgrade(conn: Connection) -> None:
+    SyncRemocao.__table__.create(bind=conn, checkfirst=True)
+    for sql in (SYNC_MARCAR, SYNC_REMOCOES, SYNC_SAIU_DO_ESCRITORIO, SYNC_VINCULOS_ADVOGADO, SYNC_VISIVEL):
+        conn.execute(text(sql))
+
+    comandos = []
+    for tabela in TABELAS:
+        # Linhas existentes ficam com a versão desta transação: a primeira sincronização as baixa inteiras
+        comandos += [
+            f'ALTER TABLE "{tabela}" ADD COLUMN IF NOT EXISTS versao bigint NOT NULL DEFAULT {XID}',
+            f'ALTER TABLE "{tabela}" ADD COLUMN IF NOT EXISTS atualizado_em timestamp NOT NULL DEFAULT {AGORA}',
+            f'CREATE INDEX IF NOT EXISTS "ix_{tabela}_versao" ON "{tabela}" (versao)',
+        ]
+        comandos += _trigger("trg_sync_marcar", tabela, "BEFORE UPDATE", "FOR EACH ROW EXECUTE FUNCTION sync_marcar()")
+        comandos += _trigger(
+            "trg_sync_remocoes", tabela, "AFTER DELETE",
+            "REFERENCING OLD TABLE AS antigas FOR EACH STATEMENT EXECUTE FUNCTION sync_remocoes()",
+        )
+    comandos += _trigger(
+        "trg_sync_saiu_do_escritorio", "CausasProcessos", "AFTER UPDATE",
+        "REFERENCING OLD TABLE AS antigas NEW TABLE AS novas FOR EACH STATEMENT EXECUTE FUNCTION sync_saiu_do_escritorio()",
+    )
+    for nome, evento, referencia in [
+        ("trg_sync_vinculos_insert", "INSERT", "NEW TABLE AS novas"),
+        ("trg_sync_vinculos_delete", "DELETE", "OLD TABLE AS antigas"),
+    ]:
+        comandos += _trigger(
+            nome, "AdvogadoEscritorios", f"AFTER {evento}",
+            f"REFERENCING {referencia} FOR EACH STATEMENT EXECUTE FUNCTION sync_vinculos_advogado()",
+        )
+    for sql in comandos:
+        conn.execute(text(sql))
@@ -0,0 +1,38 @@
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+
+XID = "pg_current_xact_id()::text::bigint"
+AGORA = "timezone('utc', now())"
+
+# STABLE: o resultado depende de quais transações já terminaram; IMMUTABLE (0008)
+# deixaria o planejador pré-calcular a chamada ou reaproveitar o resultado
+SYNC_VISIVEL = """
+CREATE OR REPLACE FUNCTION sync_visivel(versao bigint, snapshot text) RETURNS boolean
+LANGUAGE sql STABLE AS $$
+    SELECT pg_visible_in_snapshot(versao::text::xid8, snapshot::pg_snapshot)
+$$
+"""
+
+# Advogado desvinculado some da cópia local do escritório (sincronização por escritório)
+SYNC_VINCULOS_ADVOGADO = f"""
+CREATE OR REPLACE FUNCTION sync_vinculos_advogado() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        UPDATE "Advogados" SET versao = {XID}, atualizado_em = {AGORA} WHERE id IN (SELECT advogado_id FROM novas);
+    ELSE
+        UPDATE "Advogados" SET versao = {XID}, atualizado_em = {AGORA} WHERE id IN (SELECT advogado_id FROM antigas);
+        INSERT INTO "SyncRemocoes" (entidade, entidade_id, escritorio_id)
+        SELECT 'Advogados', advogado_id, escritorio_id FROM antigas;
+    END IF;
+    RETURN NULL;
+END
+$$
+"""
+
+
+def upgrade(conn: Connection) -> None:
+    for sql in (SYNC_VISIVEL, SYNC_VINCULOS_ADVOGADO):
+        conn.execute(text(sql))
+    # Retenção dos tombstones (partitions.prune_sync_remocoes) filtra por data
+    conn.execute(text('CREATE INDEX IF NOT EXISTS "ix_SyncRemocoes_removido_em" ON "SyncRemocoes" (removido_em)'))
@@ -1,15 +1,22 @@
-from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy import String, Integer
 from sqlalchemy.sql import quoted_name
+from typing import List
 from ..database import Base
-from .common import BaseModelMixin
+from .common import BaseModelMixin, SyncMixin
+from .escritorio import Escritorio
+from .advogado_escritorio import AdvogadoEscritorio
 
 
-class Advogado(Base, BaseModelMixin):
+class Advogado(Base, BaseModelMixin, SyncMixin):
     __tablename__ = quoted_name("Advogados", True)
 
     nome: Mapped[str] = mapped_column(String(255), nullable=False)
     oab: Mapped[str | None] = mapped_column(String(64), nullable=True)
     email: Mapped[str | None] = mapped_column(String(255), nullable=True)
     telefone: Mapped[str | None] = mapped_column(String(64), nullable=True)
-    especialidade_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
\ No newline at end of file
+    especialidade_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+
+    # Vínculos gravados via escritorio_links; escritorios é só leitura (carregar com selectinload)
+    escritorio_links: Mapped[List[AdvogadoEscritorio]] = relationship(cascade="all, delete-orphan", passive_deletes=True)
+    escritorios: Mapped[List[Escritorio]] = relationship(secondary=AdvogadoEscritorio.__table__, viewonly=True, order_by=Escritorio.id)
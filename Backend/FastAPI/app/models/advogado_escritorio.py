@@ -1,11 +1,14 @@
-from sqlalchemy.orm import Mapped, mapped_column
-from sqlalchemy import Integer
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import Integer, ForeignKey
 from sqlalchemy.sql import quoted_name
 from ..database import Base
+from .escritorio import Escritorio
 
 
 class AdvogadoEscritorio(Base):
     __tablename__ = quoted_name("AdvogadoEscritorios", True)
 
-    advogado_id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    escritorio_id: Mapped[int] = mapped_column(Integer, primary_key=True)
\ No newline at end of file
+    advogado_id: Mapped[int] = mapped_column(Integer, ForeignKey("Advogados.id", name="fk_advogadoescritorios_advogado", ondelete="CASCADE"), primary_key=True)
+    escritorio_id: Mapped[int] = mapped_column(Integer, ForeignKey("Escritorios.id", name="fk_advogadoescritorios_escritorio", ondelete="CASCADE"), primary_key=True, index=True)
+
+    escritorio: Mapped[Escritorio] = relationship()
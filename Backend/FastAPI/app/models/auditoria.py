@@ -1,17 +1,28 @@
 from sqlalchemy.orm import Mapped, mapped_column
-from sqlalchemy import String, Text, Integer, DateTime
+from sqlalchemy import String, Text, Integer, BigInteger, DateTime, Index
+from sqlalchemy.dialects.postgresql import JSONB
+from typing import Any, Dict
 from sqlalchemy.sql import quoted_name
 from datetime import datetime
 from ..database import Base
-from .common import BaseModelMixin
 
 
-class Auditoria(Base, BaseModelMixin):
+class Auditoria(Base):
     __tablename__ = quoted_name("Auditoria", True)
+    # Particionada por mês em `quando` (partições criadas em app.partitions);
+    # a chave de partição precisa fazer parte da PK.
+    __table_args__ = (
+        Index("ix_Auditoria_entidade_entidade_id", "entidade", "entidade_id", "id"),
+        Index("ix_Auditoria_quando", "quando"),
+        Index("ix_Auditoria_alteracoes", "alteracoes", postgresql_using="gin"),
+        {"postgresql_partition_by": "RANGE (quando)"},
+    )
 
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
     entidade: Mapped[str] = mapped_column(String(128), nullable=False)
     entidade_id: Mapped[int] = mapped_column(Integer, nullable=False)
     acao: Mapped[str] = mapped_column(String(32), nullable=False)  # create|update|delete
     quem: Mapped[str] = mapped_column(String(128), nullable=False)
-    quando: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
-    diff: Mapped[str | None] = mapped_column(Text, nullable=True)  # JSON antes/depois
\ No newline at end of file
+    quando: Mapped[datetime] = mapped_column(DateTime, primary_key=True, default=datetime.utcnow, nullable=False)
+    alteracoes: Mapped[Dict[str, Any] | None] = mapped_column(JSONB, nullable=True)  # {campo: {antes, depois}}
+    diff: Mapped[str | None] = mapped_column(Text, nullable=True)  # legado: JSON antes/depois completo
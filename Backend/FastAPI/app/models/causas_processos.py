@@ -1,13 +1,15 @@
 from sqlalchemy.orm import Mapped, mapped_column
-from sqlalchemy import String, Integer, Text, Numeric, Date
+from sqlalchemy import String, Integer, Text, Numeric, Date, Index
 from datetime import date
 from sqlalchemy.sql import quoted_name
 from ..database import Base
-from .common import BaseModelMixin
+from .common import BaseModelMixin, SyncMixin
 
 
-class CausaProcesso(Base, BaseModelMixin):
+class CausaProcesso(Base, BaseModelMixin, SyncMixin):
     __tablename__ = quoted_name("CausasProcessos", True)
+    # Chave de casamento da importação em lote
+    __table_args__ = (Index("ix_CausasProcessos_numero_escritorio_id", "numero", "escritorio_id"),)
 
     numero: Mapped[str] = mapped_column(String(128), nullable=False)
     descricao: Mapped[str | None] = mapped_column(Text, nullable=True)
@@ -0,0 +1,29 @@
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import String, Integer, BigInteger, Numeric, Date, UniqueConstraint
+from sqlalchemy.sql import quoted_name
+from datetime import date
+from decimal import Decimal
+from ..database import Base
+
+
+class CausaResumo(Base):
+    """Contagem e soma de valores das causas por grupo, mantidas por triggers em
+    "CausasProcessos" na mesma transação de cada escrita (migração 0007)."""
+
+    __tablename__ = quoted_name("CausasResumo", True)
+    __table_args__ = (
+        UniqueConstraint(
+            "escritorio_id", "status", "especialidade_id", "advogado_id", "mes",
+            name="uq_CausasResumo_grupo",
+            postgresql_nulls_not_distinct=True,
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    escritorio_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    status: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    especialidade_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    advogado_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    mes: Mapped[date | None] = mapped_column(Date, nullable=True)  # mês da distribuição
+    quantidade: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    valor_total: Mapped[Decimal] = mapped_column(Numeric(18, 2), nullable=False, default=0)
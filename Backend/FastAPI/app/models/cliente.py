@@ -1,12 +1,14 @@
 from sqlalchemy.orm import Mapped, mapped_column
-from sqlalchemy import String
+from sqlalchemy import String, Index
 from sqlalchemy.sql import quoted_name
 from ..database import Base
-from .common import BaseModelMixin
+from .common import BaseModelMixin, SyncMixin
 
 
-class Cliente(Base, BaseModelMixin):
+class Cliente(Base, BaseModelMixin, SyncMixin):
     __tablename__ = quoted_name("Clientes", True)
+    # Chave de casamento da importação em lote
+    __table_args__ = (Index("ix_Clientes_cpf_cnpj", "cpf_cnpj"),)
 
     nome: Mapped[str] = mapped_column(String(255), nullable=False)
     cpf_cnpj: Mapped[str | None] = mapped_column(String(32), nullable=True)
@@ -1,6 +1,17 @@
 from sqlalchemy.orm import Mapped, mapped_column
-from sqlalchemy import Integer
+from sqlalchemy import BigInteger, DateTime, Integer, text
+from datetime import datetime
 
 
 class BaseModelMixin:
-    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
\ No newline at end of file
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+
+
+class SyncMixin:
+    """Colunas da sincronização incremental (GET /sync), mantidas pelo banco: o
+    default cobre o INSERT e o trigger sync_marcar o UPDATE (migração 0008).
+
+    `versao` é o id da transação (xid8) que gravou a linha por último."""
+
+    versao: Mapped[int] = mapped_column(BigInteger, nullable=False, index=True, server_default=text("pg_current_xact_id()::text::bigint"))
+    atualizado_em: Mapped[datetime] = mapped_column(DateTime, nullable=False, server_default=text("timezone('utc', now())"))
\ No newline at end of file
@@ -0,0 +1,21 @@
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import String, Integer, BigInteger, DateTime
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import quoted_name
+from datetime import datetime
+from typing import Any, Dict
+from ..database import Base
+
+
+class Outbox(Base):
+    """Eventos de alteração gravados na mesma transação da entidade; o relay
+    (app.outbox) publica no RabbitMQ e remove as linhas confirmadas."""
+
+    __tablename__ = quoted_name("Outbox", True)
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    entidade: Mapped[str] = mapped_column(String(128), nullable=False)
+    entidade_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    acao: Mapped[str] = mapped_column(String(32), nullable=False)  # create|update|delete
+    alteracoes: Mapped[Dict[str, Any]] = mapped_column(JSONB, nullable=False, default=dict)
+    criado_em: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
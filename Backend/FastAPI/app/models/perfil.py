@@ -9,4 +9,5 @@ class Perfil(Base, BaseModelMixin):
     __tablename__ = quoted_name("Perfil", True)
 
     nome: Mapped[str] = mapped_column(String(128), nullable=False)
-    descricao: Mapped[str | None] = mapped_column(Text, nullable=True)
\ No newline at end of file
+    descricao: Mapped[str | None] = mapped_column(Text, nullable=True)
+    permissoes: Mapped[str | None] = mapped_column(Text, nullable=True)  # herdadas pelos usuários com role = nome
\ No newline at end of file
@@ -0,0 +1,19 @@
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import String, Integer, BigInteger, DateTime, text
+from sqlalchemy.sql import quoted_name
+from datetime import datetime
+from ..database import Base
+
+
+class SyncRemocao(Base):
+    """Tombstones da sincronização incremental: linha removida (ou causa que saiu do
+    escritório), gravada por trigger na mesma transação (migração 0008)."""
+
+    __tablename__ = quoted_name("SyncRemocoes", True)
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    entidade: Mapped[str] = mapped_column(String(128), nullable=False)
+    entidade_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    escritorio_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    versao: Mapped[int] = mapped_column(BigInteger, nullable=False, index=True, server_default=text("pg_current_xact_id()::text::bigint"))
+    removido_em: Mapped[datetime] = mapped_column(DateTime, nullable=False, index=True, server_default=text("timezone('utc', now())"))
\ No newline at end of file
@@ -0,0 +1,16 @@
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import String, BigInteger, DateTime
+from sqlalchemy.sql import quoted_name
+from datetime import datetime
+from ..database import Base
+
+
+class TabelaVersao(Base):
+    """Versão monotônica por entidade, incrementada na transação de cada escrita;
+    base dos ETags das rotas de leitura (app.versions)."""
+
+    __tablename__ = quoted_name("TabelaVersao", True)
+
+    tabela: Mapped[str] = mapped_column(String(128), primary_key=True)
+    versao: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    atualizado_em: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
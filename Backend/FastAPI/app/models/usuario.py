@@ -1,8 +1,11 @@
-from sqlalchemy.orm import Mapped, mapped_column
-from sqlalchemy import String, Text, Integer
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import String, Text, Integer, ForeignKey
 from sqlalchemy.sql import quoted_name
+from typing import List
 from ..database import Base
 from .common import BaseModelMixin
+from .advogado import Advogado
+from .usuario_escritorio import UsuarioEscritorio
 
 
 class Usuario(Base, BaseModelMixin):
@@ -14,4 +17,7 @@ class Usuario(Base, BaseModelMixin):
     role: Mapped[str | None] = mapped_column(String(64), nullable=True)
     senha_hash: Mapped[str | None] = mapped_column(Text, nullable=True)
     permissoes: Mapped[str | None] = mapped_column(Text, nullable=True)  # JSON serializado
-    advogado_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
\ No newline at end of file
+    advogado_id: Mapped[int | None] = mapped_column(Integer, ForeignKey("Advogados.id", name="fk_usuarios_advogado", ondelete="SET NULL"), nullable=True, index=True)
+
+    advogado: Mapped[Advogado | None] = relationship()
+    escritorio_links: Mapped[List[UsuarioEscritorio]] = relationship(cascade="all, delete-orphan", passive_deletes=True)
@@ -1,11 +1,14 @@
-from sqlalchemy.orm import Mapped, mapped_column
-from sqlalchemy import Integer
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import Integer, ForeignKey
 from sqlalchemy.sql import quoted_name
 from ..database import Base
+from .escritorio import Escritorio
 
 
 class UsuarioEscritorio(Base):
     __tablename__ = quoted_name("UsuarioEscritorios", True)
 
-    usuario_id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    escritorio_id: Mapped[int] = mapped_column(Integer, primary_key=True)
\ No newline at end of file
+    usuario_id: Mapped[int] = mapped_column(Integer, ForeignKey("Usuarios.id", name="fk_usuarioescritorios_usuario", ondelete="CASCADE"), primary_key=True)
+    escritorio_id: Mapped[int] = mapped_column(Integer, ForeignKey("Escritorios.id", name="fk_usuarioescritorios_escritorio", ondelete="CASCADE"), primary_key=True, index=True)
+
+    escritorio: Mapped[Escritorio] = relationship()
@@ -0,0 +1,134 @@
+import asyncio
+import logging
+import os
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from .database import async_engine
+from .models.auditoria import Auditoria
+
+
+logger = logging.getLogger(__name__)
+
+# Meses à frente com partição pronta; linhas fora do intervalo caem na partição default
+AUDIT_PARTITION_MONTHS_AHEAD = int(os.getenv("AUDIT_PARTITION_MONTHS_AHEAD", "3"))
+AUDIT_PARTITION_CHECK_INTERVAL = float(os.getenv("AUDIT_PARTITION_CHECK_INTERVAL", str(24 * 3600)))
+# Tombstones de sincronização mais velhos que isso são apagados; cursores mais antigos
+# que a retenção são recusados por GET /sync (o cliente baixa tudo de novo)
+SYNC_RETENTION_DAYS = int(os.getenv("SYNC_RETENTION_DAYS", "30"))
+
+DEFAULT_PARTITION = "Auditoria_default"
+
+
+def _month_start(d: datetime) -> datetime:
+    return datetime(d.year, d.month, 1)
+
+
+def _add_months(d: datetime, n: int) -> datetime:
+    m = d.month - 1 + n
+    return datetime(d.year + m // 12, m % 12 + 1, 1)
+
+
+def partition_name(start: datetime) -> str:
+    return f"Auditoria_{start:%Y_%m}"
+
+
+def _exists(conn: Connection, name: str) -> bool:
+    return conn.execute(text("SELECT to_regclass(:name)"), {"name": f'public."{name}"'}).scalar() is not None
+
+
+def create_month_partition(conn: Connection, start: datetime) -> None:
+    name = partition_name(start)
+    if _exists(conn, name):
+        return
+    lo, hi = start, _add_months(start, 1)
+    params = {"lo": lo, "hi": hi}
+    bounds = f"FOR VALUES FROM ('{lo:%Y-%m-%d}') TO ('{hi:%Y-%m-%d}')"
+    stray = conn.execute(text(
+        f'SELECT 1 FROM "{DEFAULT_PARTITION}" WHERE quando >= :lo AND quando < :hi LIMIT 1'
+    ), params).scalar() is not None
+    if not stray:
+        conn.execute(text(f'CREATE TABLE "{name}" PARTITION OF "Auditoria" {bounds}'))
+        return
+    # Linhas do mês já gravadas na default: move para a nova tabela antes de anexá-la
+    conn.execute(text(f'CREATE TABLE "{name}" (LIKE "Auditoria" INCLUDING DEFAULTS INCLUDING CONSTRAINTS)'))
+    conn.execute(text(
+        f'WITH moved AS (DELETE FROM "{DEFAULT_PARTITION}" WHERE quando >= :lo AND quando < :hi RETURNING *) '
+        f'INSERT INTO "{name}" SELECT * FROM moved'
+    ), params)
+    conn.execute(text(f'ALTER TABLE "Auditoria" ATTACH PARTITION "{name}" {bounds}'))
+
+
+def ensure_auditoria_partitions(conn: Connection, since: Optional[datetime] = None) -> None:
+    """Garante a partição default e as partições mensais de `since` (padrão: mês
+    anterior) até AUDIT_PARTITION_MONTHS_AHEAD meses à frente."""
+    conn.execute(text("SELECT pg_advisory_xact_lock(hashtext('Auditoria_partitions'))"))
+    conn.execute(text(f'CREATE TABLE IF NOT EXISTS "{DEFAULT_PARTITION}" PARTITION OF "Auditoria" DEFAULT'))
+    now = _month_start(datetime.utcnow())
+    month = _month_start(since) if since else _add_months(now, -1)
+    last = _add_months(now, AUDIT_PARTITION_MONTHS_AHEAD)
+    while month <= last:
+        create_month_partition(conn, month)
+        month = _add_months(month, 1)
+
+
+def convert_legacy_auditoria(conn: Connection) -> None:
+    """Converte a tabela Auditoria não particionada (bancos anteriores) em
+    particionada, copiando as linhas e preservando ids e a sequência."""
+    relkind = conn.execute(text(
+        """
+        SELECT c.relkind FROM pg_class c
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = 'public' AND c.relname = 'Auditoria'
+        """
+    )).scalar()
+    if relkind != "r":
+        return
+    conn.execute(text('ALTER TABLE "Auditoria" RENAME TO "Auditoria_legacy"'))
+    conn.execute(text('ALTER TABLE "Auditoria_legacy" RENAME CONSTRAINT "Auditoria_pkey" TO "Auditoria_legacy_pkey"'))
+    conn.execute(text('ALTER INDEX IF EXISTS "ix_Auditoria_id" RENAME TO "ix_Auditoria_legacy_id"'))
+    conn.execute(text('ALTER SEQUENCE IF EXISTS "Auditoria_id_seq" RENAME TO "Auditoria_legacy_id_seq"'))
+    Auditoria.__table__.create(conn)
+
+    oldest = conn.execute(text('SELECT min(quando) FROM "Auditoria_legacy"')).scalar()
+    ensure_auditoria_partitions(conn, since=oldest)
+    conn.execute(text(
+        """
+        INSERT INTO "Auditoria" (id, entidade, entidade_id, acao, quem, quando, diff)
+        SELECT id, entidade, entidade_id, acao, quem, COALESCE(quando, now()), diff FROM "Auditoria_legacy"
+        """
+    ))
+    conn.execute(text(
+        "SELECT setval(pg_get_serial_sequence('\"Auditoria\"', 'id'), COALESCE(max(id), 0) + 1, false) FROM \"Auditoria\""
+    ))
+    conn.execute(text('DROP TABLE "Auditoria_legacy"'))
+
+
+def prune_sync_remocoes(conn: Connection) -> int:
+    """Apaga os tombstones (SyncRemocoes) fora da retenção; retorna quantos."""
+    result = conn.execute(
+        text("""DELETE FROM "SyncRemocoes" WHERE removido_em < timezone('utc', now()) - make_interval(days => :dias)"""),
+        {"dias": SYNC_RETENTION_DAYS},
+    )
+    return result.rowcount
+
+
+async def maintain_partitions(interval: float = AUDIT_PARTITION_CHECK_INTERVAL) -> None:
+    """Task de fundo: mantém as partições dos próximos meses criadas e aplica a retenção de SyncRemocoes."""
+    while True:
+        try:
+            async with async_engine.begin() as conn:
+                await conn.run_sync(ensure_auditoria_partitions)
+        except Exception:
+            logger.exception("Falha ao criar partições de Auditoria")
+        try:
+            async with async_engine.begin() as conn:
+                removidos = await conn.run_sync(prune_sync_remocoes)
+            if removidos:
+                logger.info("Retenção de SyncRemocoes: %s tombstones apagados", removidos)
+        except Exception:
+            logger.exception("Falha ao aplicar a retenção de SyncRemocoes")
+        await asyncio.sleep(interval)
@@ -0,0 +1,154 @@
+import json
+import os
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional, Set, Tuple
+
+from fastapi import Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .database import get_async_db
+from .models.perfil import Perfil
+from .models.permissao import Permissao
+from .routers.auth import auth_context
+from .security import AuthContext
+
+
+# Papéis com acesso total, sem consulta às permissões
+SUPER_ROLES = {r.strip().upper() for r in os.getenv("PERMISSIONS_SUPER_ROLES", "ADMIN,DEV").split(",") if r.strip()}
+# Catálogo (Permissoes) e perfis são recarregados após este intervalo mesmo sem invalidação local
+PERMISSIONS_CACHE_TTL = float(os.getenv("PERMISSIONS_CACHE_TTL", "60"))
+
+ALL = -1  # todos os bits ligados
+
+# Permissões exigidas pelas rotas (require); entram no catálogo mesmo sem linha em Permissoes
+_required: Set[str] = set()
+
+
+class PermissionRegistry:
+    """Atribui um bit fixo (no processo) a cada nome de permissão."""
+
+    def __init__(self) -> None:
+        self._bits: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def bit(self, name: str) -> int:
+        name = name.strip().upper()
+        found = self._bits.get(name)
+        if found is None:
+            with self._lock:
+                found = self._bits.setdefault(name, 1 << len(self._bits))
+        return found
+
+    def mask(self, names: Iterable[str]) -> int:
+        out = 0
+        for n in names:
+            out |= self.bit(n)
+        return out
+
+
+registry = PermissionRegistry()
+
+
+def parse_permissoes(raw: Optional[str]) -> Set[str]:
+    """Aceita lista separada por vírgula/espaço, JSON (lista ou {nome: bool}) ou '*'/'ALL'."""
+    if not raw or not raw.strip():
+        return set()
+    text = raw.strip()
+    names: Iterable[Any]
+    if text[0] in "[{":
+        # Perfis salvos antes de `permissoes` sair da caixa alta: {"X": TRUE}
+        text = re.sub(r"\b(TRUE|FALSE|NULL)\b", lambda m: m.group(1).lower(), text)
+    try:
+        parsed = json.loads(text)
+    except ValueError:
+        parsed = None
+    if isinstance(parsed, list):
+        names = parsed
+    elif isinstance(parsed, dict):
+        names = [k for k, v in parsed.items() if v]
+    else:
+        names = text.replace(";", ",").replace(" ", ",").split(",")
+    return {str(n).strip().upper() for n in names if str(n).strip()}
+
+
+class PermissionCache:
+    """Máscaras por usuário, invalidadas por versão.
+
+    A chave inclui o digest das permissões e o papel do usuário (mudam com o
+    token/contexto); alterações em Perfil/Permissoes sobem a versão do catálogo
+    e descartam todas as máscaras calculadas com a versão anterior.
+    """
+
+    def __init__(self) -> None:
+        self.version = 0
+        self._loaded_at = 0.0
+        self._loaded_version = -1
+        self._catalog: Optional[int] = None
+        self._perfis: Dict[str, Set[str]] = {}
+        self._masks: Dict[Tuple[int, str, Optional[str]], Tuple[int, int]] = {}
+        self._lock = threading.Lock()
+
+    def bump(self) -> None:
+        with self._lock:
+            self.version += 1
+            self._masks.clear()
+
+    async def _catalog_for(self, db: AsyncSession) -> Tuple[int, Dict[str, Set[str]]]:
+        stale = time.monotonic() - self._loaded_at > PERMISSIONS_CACHE_TTL
+        if self._catalog is None or self._loaded_version != self.version or stale:
+            version = self.version
+            nomes = (await db.scalars(select(Permissao.nome))).all()
+            perfis = (await db.execute(select(Perfil.nome, Perfil.permissoes))).all()
+            with self._lock:
+                self._catalog = registry.mask(nomes) | registry.mask(_required)
+                self._perfis = {(n or "").upper(): parse_permissoes(p) for n, p in perfis}
+                self._loaded_at = time.monotonic()
+                self._loaded_version = version
+                if stale:
+                    self._masks.clear()
+        return self._catalog, self._perfis  # type: ignore[return-value]
+
+    async def mask_for(self, ctx: AuthContext, db: AsyncSession) -> int:
+        role = (ctx.role or "").upper()
+        if role in SUPER_ROLES:
+            return ALL
+        key = (ctx.user_id, ctx.perms_digest, role)
+        hit = self._masks.get(key)
+        if hit and hit[0] == self.version and time.monotonic() - self._loaded_at <= PERMISSIONS_CACHE_TTL:
+            return hit[1]
+        version = self.version
+        catalog, perfis = await self._catalog_for(db)
+        names = parse_permissoes(ctx.permissoes) | perfis.get(role, set())
+        mask = ALL if {"*", "ALL"} & names else registry.mask(names) & catalog
+        self._masks[key] = (version, mask)
+        return mask
+
+
+permission_cache = PermissionCache()
+
+
+def invalidate_permissions(entidade: str) -> None:
+    if entidade in ("Perfil", "Permissoes"):
+        permission_cache.bump()
+
+
+def require(perm: str) -> Callable[..., Any]:
+    """Dependência que exige `perm` do usuário autenticado (403 se ausente)."""
+    name = perm.strip().upper()
+    _required.add(name)
+    bit = registry.bit(name)
+
+    async def dependency(
+        ctx: Optional[AuthContext] = Depends(auth_context),
+        db: AsyncSession = Depends(get_async_db),
+    ) -> AuthContext:
+        if not ctx:
+            raise HTTPException(status_code=401, detail="Não autenticado")
+        if not (await permission_cache.mask_for(ctx, db)) & bit:
+            raise HTTPException(status_code=403, detail=f"Permissão necessária: {name}")
+        return ctx
+
+    return dependency
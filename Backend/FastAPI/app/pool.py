@@ -0,0 +1,138 @@
+import os
+import threading
+import time
+from typing import Any, Dict, Type
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+
+
+# Estratégia de pre-ping: always (toda checkout), idle (só conexões ociosas há
+# mais de DB_PRE_PING_IDLE s) ou never (conta com pool_recycle e a invalidação
+# automática em erro de desconexão)
+DB_PRE_PING = os.getenv("DB_PRE_PING", "idle").strip().lower()
+DB_PRE_PING_IDLE = float(os.getenv("DB_PRE_PING_IDLE", "30"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+
+SLOW_WAIT = 0.1  # espera acima de 100 ms conta como checkout lento
+
+
+class PoolMetrics:
+    def __init__(self) -> None:
+        self.pool: Any = None
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.slow_waits = 0
+        self.timeouts = 0
+        self.connects = 0
+        self.connect_errors = 0
+        self.disconnects = 0
+        self.invalidations = 0
+        self.pings = 0
+
+    def record_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            if seconds > SLOW_WAIT:
+                self.slow_waits += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        pool = self.pool
+        return {
+            "size": pool.size() if pool else None,
+            "checked_out": pool.checkedout() if pool else None,
+            "checked_in": pool.checkedin() if pool else None,
+            "overflow": pool.overflow() if pool else None,
+            "max_overflow": getattr(pool, "_max_overflow", None),
+            "checkouts": self.checkouts,
+            "wait_avg_ms": round(self.wait_total / self.checkouts * 1000, 3) if self.checkouts else None,
+            "wait_max_ms": round(self.wait_max * 1000, 3),
+            "slow_waits": self.slow_waits,
+            "timeouts": self.timeouts,
+            "connects": self.connects,
+            "connect_errors": self.connect_errors,
+            "disconnects": self.disconnects,
+            "invalidations": self.invalidations,
+            "pre_pings": self.pings,
+        }
+
+
+pool_metrics: Dict[str, PoolMetrics] = {}
+
+
+def timed_pool_class(base: Type[QueuePool], metrics: PoolMetrics) -> Type[QueuePool]:
+    """Subclasse do pool que mede quanto cada checkout esperou por uma conexão.
+
+    Definida por engine (atributo de classe) para sobreviver a pool.recreate().
+    """
+
+    def _do_get(self: QueuePool) -> Any:
+        metrics.pool = self
+        start = time.perf_counter()
+        try:
+            entry = base._do_get(self)
+        except exc.TimeoutError:
+            metrics.timeouts += 1
+            raise
+        except Exception:
+            metrics.connect_errors += 1
+            raise
+        metrics.record_wait(time.perf_counter() - start)
+        return entry
+
+    return type(f"Timed{base.__name__}", (base,), {"_do_get": _do_get})
+
+
+def pool_options(name: str, base: Type[QueuePool], pool_size: int, max_overflow: int) -> Dict[str, Any]:
+    metrics = pool_metrics.setdefault(name, PoolMetrics())
+    return {
+        "poolclass": timed_pool_class(base, metrics),
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_PRE_PING == "always",
+    }
+
+
+def instrument(name: str, engine: Engine) -> None:
+    metrics = pool_metrics[name]
+    metrics.pool = engine.pool
+
+    @event.listens_for(engine, "connect")
+    def _connect(dbapi_connection: Any, record: Any) -> None:
+        metrics.connects += 1
+
+    @event.listens_for(engine, "checkin")
+    def _checkin(dbapi_connection: Any, record: Any) -> None:
+        record.info["checkin_at"] = time.monotonic()
+
+    @event.listens_for(engine, "invalidate")
+    def _invalidate(dbapi_connection: Any, record: Any, exception: Any) -> None:
+        metrics.invalidations += 1
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(context: Any) -> None:
+        if context.is_disconnect:
+            metrics.disconnects += 1
+
+    if DB_PRE_PING == "idle":
+        @event.listens_for(engine, "checkout")
+        def _ping_idle(dbapi_connection: Any, record: Any, proxy: Any) -> None:
+            # Só pinga conexões paradas há mais tempo que o limite; falha vira nova conexão
+            idle_since = record.info.get("checkin_at")
+            if idle_since is None or time.monotonic() - idle_since < DB_PRE_PING_IDLE:
+                return
+            metrics.pings += 1
+            try:
+                alive = engine.dialect.do_ping(dbapi_connection)
+            except Exception:
+                alive = False
+            if not alive:
+                raise exc.DisconnectionError("Conexão ociosa não respondeu ao ping")
@@ -0,0 +1,204 @@
+import asyncio
+import hashlib
+import itertools
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import AsyncGenerator, List, Optional
+
+from fastapi import Request
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from .database import (
+    DB_ASYNC, DB_MAX_OVERFLOW, DB_POOL_SIZE, SHARED_READ_SESSION, AsyncSessionLocal, _async_url, get_async_db,
+)
+from .pool import instrument, pool_options
+
+
+logger = logging.getLogger(__name__)
+
+# Lista separada por vírgula; vazia mantém todas as leituras no primário
+DATABASE_REPLICA_URLS = [u.strip() for u in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if u.strip()]
+# Réplica com atraso acima disso (s) ou que falhou sai do rodízio até a próxima verificação
+DB_REPLICA_MAX_LAG = float(os.getenv("DB_REPLICA_MAX_LAG", "5"))
+DB_REPLICA_CHECK_INTERVAL = float(os.getenv("DB_REPLICA_CHECK_INTERVAL", "5"))
+# Após uma escrita, leituras do mesmo token/cliente vão ao primário por N s
+READ_YOUR_WRITES_WINDOW = float(os.getenv("READ_YOUR_WRITES_WINDOW", "5"))
+READ_YOUR_WRITES_COOKIE = "cjf-primary"
+
+_READ_METHODS = ("GET", "HEAD", "OPTIONS")
+# POSTs que não gravam nada (lote de GETs, ticket do feed, login): não fixam o cliente no primário
+READ_ONLY_ROUTES = ("/batch", "/eventos/ticket", "/auth")
+
+
+class Replica:
+    def __init__(self, name: str, url: str):
+        self.name = name
+        self.engine: AsyncEngine = create_async_engine(
+            _async_url(url), **pool_options(name, AsyncAdaptedQueuePool, DB_POOL_SIZE, DB_MAX_OVERFLOW)
+        )
+        instrument(name, self.engine.sync_engine)
+        self.sessions = async_sessionmaker(bind=self.engine, autoflush=False, expire_on_commit=False)
+        self.healthy = True
+        self.lag: Optional[float] = None
+
+    def mark_down(self, reason: str) -> None:
+        if self.healthy:
+            logger.warning("Réplica %s fora do rodízio: %s", self.name, reason)
+        self.healthy = False
+
+    async def check(self) -> None:
+        try:
+            async with self.engine.connect() as conn:
+                lag = await conn.scalar(text(
+                    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+                    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+                ))
+        except (DBAPIError, OSError) as exc:
+            self.mark_down(str(exc).splitlines()[0])
+            return
+        # Fora de recuperação as funções de LSN retornam NULL e a comparação também
+        self.lag = float(lag) if lag is not None else 0.0
+        if self.lag > DB_REPLICA_MAX_LAG:
+            self.mark_down(f"atraso de {self.lag:.1f}s")
+        else:
+            if not self.healthy:
+                logger.info("Réplica %s de volta ao rodízio", self.name)
+            self.healthy = True
+
+
+replicas: List[Replica] = [Replica(f"replica{i}", url) for i, url in enumerate(DATABASE_REPLICA_URLS, 1)]
+_rotation = itertools.count()
+
+
+def pick_replica() -> Optional[Replica]:
+    """Próxima réplica saudável em round-robin, ou None para usar o primário."""
+    for _ in range(len(replicas)):
+        replica = replicas[next(_rotation) % len(replicas)]
+        if replica.healthy:
+            return replica
+    return None
+
+
+class WritePins:
+    """Marca, por token/cliente, até quando as leituras devem ir ao primário."""
+
+    def __init__(self, maxsize: int = 10000):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def pin(self, key: str) -> None:
+        with self._lock:
+            self._data[key] = time.monotonic() + READ_YOUR_WRITES_WINDOW
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pinned(self, key: str) -> bool:
+        with self._lock:
+            until = self._data.get(key)
+            if until is None:
+                return False
+            if until < time.monotonic():
+                del self._data[key]
+                return False
+            return True
+
+
+write_pins = WritePins()
+
+
+def _client_key(request: Request) -> str:
+    auth = request.headers.get("authorization")
+    if auth:
+        return hashlib.sha256(auth.encode()).hexdigest()[:24]
+    return request.client.host if request.client else "-"
+
+
+def _pinned(request: Request) -> bool:
+    # O cookie cobre escritas atendidas por outro worker; o mapa local cobre clientes sem cookie
+    try:
+        if float(request.cookies.get(READ_YOUR_WRITES_COOKIE, "0")) > time.time():
+            return True
+    except ValueError:
+        pass
+    return write_pins.pinned(_client_key(request))
+
+
+def is_write(method: str, path: str) -> bool:
+    if method in _READ_METHODS:
+        return False
+    return not any(path == r or path.startswith(r + "/") for r in READ_ONLY_ROUTES)
+
+
+async def read_your_writes(request: Request, call_next):
+    response = await call_next(request)
+    if replicas and is_write(request.method, request.url.path) and response.status_code < 400:
+        write_pins.pin(_client_key(request))
+        response.set_cookie(
+            READ_YOUR_WRITES_COOKIE,
+            f"{time.time() + READ_YOUR_WRITES_WINDOW:.3f}",
+            max_age=max(1, int(READ_YOUR_WRITES_WINDOW)),
+            httponly=True,
+            samesite="lax",
+        )
+    return response
+
+
+async def open_read_session(request: Request, execution_options: Optional[dict] = None) -> AsyncSession:
+    """AsyncSession de leitura (réplica saudável em rodízio, senão o primário); quem chama fecha.
+
+    Usada direto por respostas em streaming, que vivem além das dependências da rota.
+    """
+    replica = pick_replica() if not _pinned(request) else None
+    if replica is not None:
+        session = replica.sessions()
+        try:
+            # Abre a conexão já aqui para cair no primário se a réplica estiver fora
+            await session.connection(execution_options=execution_options)
+            return session
+        except (DBAPIError, OSError) as exc:
+            replica.mark_down(str(exc).splitlines()[0])
+            await session.close()
+    session = AsyncSessionLocal()
+    if execution_options:
+        await session.connection(execution_options=execution_options)
+    return session
+
+
+async def get_read_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """Session para rotas só de leitura: réplica saudável em rodízio, senão o primário."""
+    shared = request.scope.get(SHARED_READ_SESSION)
+    if shared is not None:
+        yield shared
+        return
+    if DB_ASYNC:
+        session = await open_read_session(request)
+        try:
+            yield session
+        finally:
+            await session.close()
+        return
+    async for db in get_async_db(request):
+        yield db
+
+
+async def monitor_replicas(interval: float = DB_REPLICA_CHECK_INTERVAL) -> None:
+    while True:
+        await asyncio.gather(*(replica.check() for replica in replicas))
+        await asyncio.sleep(interval)
+
+
+async def dispose_replicas() -> None:
+    for replica in replicas:
+        await replica.engine.dispose()
+
+
+def replica_status() -> List[dict]:
+    return [{"nome": r.name, "saudavel": r.healthy, "atraso_s": r.lag} for r in replicas]
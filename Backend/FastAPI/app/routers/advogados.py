@@ -1,134 +1,108 @@
-from fastapi import APIRouter, HTTPException, Depends
-from typing import List, Dict
-from sqlalchemy.orm import Session
-from ..database import get_db
+from fastapi import APIRouter, HTTPException, Depends, Response
+from typing import Annotated, List, Dict, Any
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from ..database import get_async_db
+from ..replicas import get_read_db
+from ..serialization import json_response
+from ..versions import conditional
 from ..models.advogado import Advogado
 from ..models.advogado_escritorio import AdvogadoEscritorio
-from ..models.escritorio import Escritorio
 from ..schemas.escritorio import EscritorioRead
-from ..schemas.advogado import AdvogadoCreate, AdvogadoRead, AdvogadoUpdate
-from ..models.auditoria import Auditoria
-from .utils import upper_except_email, build_diff
+from ..schemas.advogado import AdvogadoCreate, AdvogadoUpdate, AdvogadoFiltro
+from .utils import upper_except_email
+from .uow import UnitOfWork
+from ..permissions import require
+from .pagination import PageParams, page_params, query_filters, paginate, apply_filters, eq, contains
 
 
 router = APIRouter()
 
+ADVOGADO_FILTERS = {
+    "nome": contains(Advogado.nome),
+    "oab": eq(Advogado.oab),
+    "especialidade_id": eq(Advogado.especialidade_id),
+    "escritorio_id": lambda v: Advogado.escritorio_links.any(AdvogadoEscritorio.escritorio_id == v),
+}
+ADVOGADO_SORTS = {"nome": Advogado.nome, "oab": Advogado.oab}
 
-@router.get("/", response_model=None, summary="Listar Advogados")
-def list_advogados(db: Session = Depends(get_db)):
-    rows = db.query(Advogado).all()
-    out: List[AdvogadoRead] = []  # type: ignore
-    for r in rows:
-        links = db.query(AdvogadoEscritorio).filter(AdvogadoEscritorio.advogado_id == r.id).all()
-        ids = [lk.escritorio_id for lk in links]
-        escrs = db.query(Escritorio).filter(Escritorio.id.in_(ids)).all() if ids else []
-        escrs_json = [{"id": e.id, "nome": e.nome} for e in escrs]
-        out.append({
-            "id": r.id,
-            "nome": r.nome,
-            "oab": r.oab,
-            "email": r.email,
-            "telefone": r.telefone,
-            "especialidade_id": r.especialidade_id,
-            "escritorios_ids": ids,
-            "escritorios": escrs_json,
-        })  # type: ignore
-    return out
 
-
-@router.post("/", response_model=None, summary="Criar Advogado")
-def create_advogado(payload: AdvogadoCreate, db: Session = Depends(get_db)):
-    data = upper_except_email(payload.model_dump())
-    row = Advogado(**data)
-    db.add(row)
-    db.commit()
-    db.refresh(row)
-    esc_ids = (payload.escritorios_ids or [])
-    for eid in esc_ids:
-        if not db.query(AdvogadoEscritorio).filter(AdvogadoEscritorio.advogado_id == row.id, AdvogadoEscritorio.escritorio_id == eid).first():
-            db.add(AdvogadoEscritorio(advogado_id=row.id, escritorio_id=eid))
-            db.commit()
-    db.add(Auditoria(entidade="Advogados", entidade_id=row.id, acao="create", quem="SYSTEM", diff=build_diff(None, data)))
-    db.commit()
-    links = db.query(AdvogadoEscritorio).filter(AdvogadoEscritorio.advogado_id == row.id).all()
-    ids = [lk.escritorio_id for lk in links]
-    escrs = db.query(Escritorio).filter(Escritorio.id.in_(ids)).all() if ids else []
-    escrs_json = [{"id": e.id, "nome": e.nome} for e in escrs]
-    return {  # type: ignore
+def _advogado_out(row: Advogado) -> Dict[str, Any]:
+    # Requer Advogado.escritorios já carregado (selectinload/refresh)
+    return {
         "id": row.id,
         "nome": row.nome,
         "oab": row.oab,
         "email": row.email,
         "telefone": row.telefone,
         "especialidade_id": row.especialidade_id,
-        "escritorios_ids": ids,
-        "escritorios": escrs_json,
+        "escritorios_ids": [e.id for e in row.escritorios],
+        "escritorios": [{"id": e.id, "nome": e.nome} for e in row.escritorios],
     }
 
 
-@router.put("/{row_id}", response_model=None, summary="Atualizar Advogado")
-def update_advogado(row_id: int, payload: AdvogadoUpdate, db: Session = Depends(get_db)):
-    row = db.get(Advogado, row_id)
+@router.get("/", response_model=None, summary="Listar Advogados", dependencies=[Depends(conditional("Advogados", "Escritorios"))])
+async def list_advogados(
+    response: Response,
+    filtros: Annotated[AdvogadoFiltro, Depends(query_filters(AdvogadoFiltro))],
+    page: PageParams = Depends(page_params),
+    db: AsyncSession = Depends(get_read_db),
+):
+    stmt = apply_filters(select(Advogado).options(selectinload(Advogado.escritorios)), ADVOGADO_FILTERS, filtros.model_dump())
+    rows = await paginate(db, stmt, Advogado.id, page, response, ADVOGADO_SORTS)
+    return json_response([_advogado_out(r) for r in rows], response)
+
+
+@router.post("/", response_model=None, summary="Criar Advogado", dependencies=[Depends(require("ADVOGADOS_WRITE"))])
+async def create_advogado(payload: AdvogadoCreate, db: AsyncSession = Depends(get_async_db)):
+    data = upper_except_email(payload.model_dump())
+    row = Advogado(**{k: v for k, v in data.items() if k != "escritorios_ids"})
+    row.escritorio_links = [AdvogadoEscritorio(escritorio_id=eid) for eid in dict.fromkeys(payload.escritorios_ids or [])]
+    uow = UnitOfWork(db, "Advogados")
+    await uow.create(row, data)
+    await db.refresh(row, ["escritorios"])
+    await uow.commit()
+    return _advogado_out(row)
+
+
+@router.put("/{row_id}", response_model=None, summary="Atualizar Advogado", dependencies=[Depends(require("ADVOGADOS_WRITE"))])
+async def update_advogado(row_id: int, payload: AdvogadoUpdate, db: AsyncSession = Depends(get_async_db)):
+    row = await db.scalar(select(Advogado).where(Advogado.id == row_id).options(selectinload(Advogado.escritorio_links)))
     if not row:
         raise HTTPException(status_code=404, detail="Advogado não encontrado")
     before = {"nome": row.nome, "oab": row.oab, "email": row.email, "telefone": row.telefone, "especialidade_id": row.especialidade_id}
     data = upper_except_email(payload.model_dump(exclude_unset=True))
     for k, v in data.items():
-        setattr(row, k, v)
-    db.commit()
-    db.refresh(row)
+        if k != "escritorios_ids":
+            setattr(row, k, v)
     if payload.escritorios_ids is not None:
-        new_ids = set(payload.escritorios_ids)
-        curr_links = db.query(AdvogadoEscritorio).filter(AdvogadoEscritorio.advogado_id == row.id).all()
-        curr_ids = set(lk.escritorio_id for lk in curr_links)
-        # Remover os que não estão mais
-        for lk in curr_links:
-            if lk.escritorio_id not in new_ids:
-                db.delete(lk)
-        db.commit()
-        # Adicionar novos
-        for eid in new_ids:
-            if eid not in curr_ids:
-                db.add(AdvogadoEscritorio(advogado_id=row.id, escritorio_id=eid))
-        db.commit()
-    db.add(Auditoria(entidade="Advogados", entidade_id=row.id, acao="update", quem="SYSTEM", diff=build_diff(before, data)))
-    db.commit()
-    links = db.query(AdvogadoEscritorio).filter(AdvogadoEscritorio.advogado_id == row.id).all()
-    ids = [lk.escritorio_id for lk in links]
-    escrs = db.query(Escritorio).filter(Escritorio.id.in_(ids)).all() if ids else []
-    escrs_json = [{"id": e.id, "nome": e.nome} for e in escrs]
-    return {  # type: ignore
-        "id": row.id,
-        "nome": row.nome,
-        "oab": row.oab,
-        "email": row.email,
-        "telefone": row.telefone,
-        "especialidade_id": row.especialidade_id,
-        "escritorios_ids": ids,
-        "escritorios": escrs_json,
-    }
+        # Vínculos removidos da lista são apagados pelo delete-orphan
+        curr = {lk.escritorio_id: lk for lk in row.escritorio_links}
+        row.escritorio_links = [curr.get(eid) or AdvogadoEscritorio(escritorio_id=eid) for eid in dict.fromkeys(payload.escritorios_ids)]
+    uow = UnitOfWork(db, "Advogados")
+    uow.update(row, before, data)
+    await db.flush()
+    await db.refresh(row, ["escritorios"])
+    await uow.commit()
+    return _advogado_out(row)
 
 
-@router.delete("/{row_id}", summary="Remover Advogado")
-def delete_advogado(row_id: int, db: Session = Depends(get_db)) -> Dict[str, str]:
-    row = db.get(Advogado, row_id)
+@router.delete("/{row_id}", summary="Remover Advogado", dependencies=[Depends(require("ADVOGADOS_WRITE"))])
+async def delete_advogado(row_id: int, db: AsyncSession = Depends(get_async_db)) -> Dict[str, str]:
+    row = await db.get(Advogado, row_id)
     if not row:
         raise HTTPException(status_code=404, detail="Advogado não encontrado")
     before = {"nome": row.nome, "oab": row.oab, "email": row.email, "telefone": row.telefone, "especialidade_id": row.especialidade_id}
-    db.delete(row)
-    db.commit()
-    db.add(Auditoria(entidade="Advogados", entidade_id=row_id, acao="delete", quem="SYSTEM", diff=build_diff(before, None)))
-    db.commit()
+    uow = UnitOfWork(db, "Advogados")
+    await uow.delete(row, before)
+    await uow.commit()
     return {"status": "deleted"}
 
 
-@router.get("/{row_id}/escritorios", response_model=None, summary="Listar Escritórios do Advogado")
-def list_escritorios_do_advogado(row_id: int, db: Session = Depends(get_db)):
-    adv = db.get(Advogado, row_id)
+@router.get("/{row_id}/escritorios", response_model=List[EscritorioRead], summary="Listar Escritórios do Advogado", dependencies=[Depends(conditional("Advogados", "Escritorios"))])
+async def list_escritorios_do_advogado(row_id: int, db: AsyncSession = Depends(get_read_db)) -> List[EscritorioRead]:
+    adv = await db.scalar(select(Advogado).where(Advogado.id == row_id).options(selectinload(Advogado.escritorios)))
     if not adv:
         raise HTTPException(status_code=404, detail="Advogado não encontrado")
-    links = db.query(AdvogadoEscritorio).filter(AdvogadoEscritorio.advogado_id == row_id).all()
-    ids = [lk.escritorio_id for lk in links]
-    if not ids:
-        return []
-    return db.query(Escritorio).filter(Escritorio.id.in_(ids)).all()
\ No newline at end of file
+    return adv.escritorios  # type: ignore
@@ -1,14 +1,37 @@
-from fastapi import APIRouter, Depends
-from typing import List
-from sqlalchemy.orm import Session
-from ..database import get_db
+from fastapi import APIRouter, Depends, Response
+from typing import Annotated, List
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..replicas import get_read_db
+from ..serialization import json_list
 from ..models.auditoria import Auditoria
-from ..schemas.auditoria import AuditoriaRead
+from ..schemas.auditoria import AuditoriaRead, AuditoriaFiltro
+from .pagination import PageParams, page_params, query_filters, paginate, apply_filters, eq, gte, lte
 
 
 router = APIRouter()
 
+# Filtros em `quando` restringem as partições varridas; entidade + entidade_id usa o índice composto
+AUDITORIA_FILTERS = {
+    "entidade": eq(Auditoria.entidade),
+    "entidade_id": eq(Auditoria.entidade_id),
+    "acao": eq(Auditoria.acao),
+    "quem": eq(Auditoria.quem),
+    # Registros que alteraram o campo (operador ? no JSONB, atendido pelo índice GIN)
+    "campo": lambda v: Auditoria.alteracoes.has_key(v),
+    "quando_de": gte(Auditoria.quando),
+    "quando_ate": lte(Auditoria.quando),
+}
+AUDITORIA_SORTS = {"quando": Auditoria.quando}
+
 
 @router.get("/", response_model=List[AuditoriaRead], summary="Listar Auditoria")
-def list_auditoria(db: Session = Depends(get_db)) -> List[AuditoriaRead]:
-    return db.query(Auditoria).order_by(Auditoria.id.desc()).limit(200).all()
\ No newline at end of file
+async def list_auditoria(
+    response: Response,
+    filtros: Annotated[AuditoriaFiltro, Depends(query_filters(AuditoriaFiltro))],
+    page: PageParams = Depends(page_params),
+    db: AsyncSession = Depends(get_read_db),
+) -> List[AuditoriaRead]:
+    stmt = apply_filters(select(Auditoria), AUDITORIA_FILTERS, filtros.model_dump())
+    rows = await paginate(db, stmt, Auditoria.id, page, response, AUDITORIA_SORTS, default_sort="-id")
+    return json_list(AuditoriaRead, rows, response)  # type: ignore
@@ -1,19 +1,20 @@
-from fastapi import APIRouter, HTTPException, Depends, Header
-from sqlalchemy.orm import Session
-from typing import Optional, Dict, Any
-from ..database import get_db
+from fastapi import APIRouter, HTTPException, Depends, Header, Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload
+from typing import Optional, Dict, Any, Tuple
+from ..database import get_async_db
+from ..security import AUTH_DEV_TOKENS, DEV_CONTEXT, SHARED_AUTH, AuthContext, auth_cache, issue_token, perms_digest, verify_token
 from ..models.usuario import Usuario
-from ..models.usuario_escritorio import UsuarioEscritorio
 from ..models.escritorio import Escritorio
 from ..models.advogado import Advogado
-from ..models.advogado_escritorio import AdvogadoEscritorio
 
 
 router = APIRouter()
 
 
 @router.post("/login", summary="Login simples")
-def login(payload: Dict[str, str], db: Session = Depends(get_db)) -> Dict[str, Any]:
+async def login(payload: Dict[str, str], db: AsyncSession = Depends(get_async_db)) -> Dict[str, Any]:
     username = (payload.get("username") or "").strip()
     password = (payload.get("password") or "").strip()
     escritorio_id_raw = payload.get("escritorio_id")
@@ -21,23 +22,25 @@ def login(payload: Dict[str, str], db: Session = Depends(get_db)) -> Dict[str, A
     if not username or not password:
         raise HTTPException(status_code=400, detail="Username e password são obrigatórios")
 
-    user = db.query(Usuario).filter(Usuario.username == username).first()
+    user = await db.scalar(
+        select(Usuario)
+        .where(Usuario.username == username)
+        .options(
+            selectinload(Usuario.escritorio_links),
+            joinedload(Usuario.advogado).selectinload(Advogado.escritorio_links),
+        )
+    )
     if not user or (user.senha_hash or "") != password:
         raise HTTPException(status_code=401, detail="Credenciais inválidas")
 
     if escritorio_id is None:
         raise HTTPException(status_code=400, detail="Escritório é obrigatório")
-    office = db.get(Escritorio, escritorio_id)
-    assoc = db.query(UsuarioEscritorio).filter(UsuarioEscritorio.usuario_id == user.id, UsuarioEscritorio.escritorio_id == escritorio_id).first()
-    adv = db.get(Advogado, user.advogado_id) if user.advogado_id else None
-    if adv:
-        advAssoc = db.query(AdvogadoEscritorio).filter(AdvogadoEscritorio.advogado_id == adv.id, AdvogadoEscritorio.escritorio_id == escritorio_id).first()
-        if not advAssoc:
-            raise HTTPException(status_code=403, detail=f"Usuário {user.nome} não está associado ao escritório {office.nome if office else ''}")
-    elif not assoc:
+    office = await db.get(Escritorio, escritorio_id)
+    adv = user.advogado
+    if not _associated(user, escritorio_id):
         raise HTTPException(status_code=403, detail=f"Usuário {user.nome} não está associado ao escritório {office.nome if office else ''}")
-    token = f"dev-{user.id}@{escritorio_id}"
-    adv = db.get(Advogado, user.advogado_id) if user.advogado_id else None
+    token = issue_token(user.id, escritorio_id, user.role, user.permissoes)
+    auth_cache.put((user.id, escritorio_id), _context(user, escritorio_id, office))
     return {
         "access_token": token,
         "token_type": "bearer",
@@ -55,46 +58,101 @@ def login(payload: Dict[str, str], db: Session = Depends(get_db)) -> Dict[str, A
     }
 
 
-def _resolve_token(authorization: Optional[str], db: Session) -> Optional[Dict[str, Any]]:
+def _associated(user: Usuario, escritorio_id: int) -> bool:
+    # Usuário com advogado vinculado herda os escritórios do advogado
+    links = user.advogado.escritorio_links if user.advogado else user.escritorio_links
+    return any(lk.escritorio_id == escritorio_id for lk in links)
+
+
+def _context(user: Usuario, escritorio_id: Optional[int], office: Optional[Escritorio]) -> AuthContext:
+    adv = user.advogado
+    return AuthContext(
+        user_id=user.id,
+        escritorio_id=escritorio_id,
+        role=user.role,
+        username=user.username,
+        nome=user.nome,
+        email=user.email,
+        permissoes=user.permissoes,
+        perms_digest=perms_digest(user.permissoes),
+        escritorio_nome=office.nome if office else None,
+        advogado_nome=adv.nome if adv else None,
+        advogado_oab=adv.oab if adv else None,
+    )
+
+
+async def _load_context(db: AsyncSession, user_id: int, escritorio_id: Optional[int]) -> Optional[AuthContext]:
+    user = await db.scalar(
+        select(Usuario)
+        .where(Usuario.id == user_id)
+        .options(
+            selectinload(Usuario.escritorio_links),
+            joinedload(Usuario.advogado).selectinload(Advogado.escritorio_links),
+        )
+    )
+    if not user or (escritorio_id is not None and not _associated(user, escritorio_id)):
+        return None
+    office = await db.get(Escritorio, escritorio_id) if escritorio_id is not None else None
+    return _context(user, escritorio_id, office)
+
+
+def _dev_token(token: str) -> Optional[Tuple[int, Optional[int]]]:
+    parts = token.removeprefix("dev-").split("@")
+    try:
+        return int(parts[0]), int(parts[1]) if len(parts) > 1 else None
+    except ValueError:
+        return None
+
+
+async def _resolve_token(authorization: Optional[str], db: AsyncSession, uso: Optional[str] = None) -> Optional[AuthContext]:
+    """Resolve o Bearer token (ou um ticket de `uso`) em AuthContext; acertos no cache não tocam o banco."""
     if not authorization or not authorization.lower().startswith("bearer "):
         return None
     token = authorization.split(" ", 1)[1].strip()
-    if token == "dev-token":
-        return {"user": Usuario(id=0, username="dev", nome="DESENVOLVIMENTO", email=None, role="DEV", senha_hash=None, permissoes=None), "escritorio_id": None}  # type: ignore
-    if token.startswith("dev-"):
-        ctx = token.removeprefix("dev-")
-        parts = ctx.split("@")
-        try:
-            uid = int(parts[0])
-        except ValueError:
+    digest: Optional[str] = None
+    if AUTH_DEV_TOKENS and uso is None and token == "dev-token":
+        return DEV_CONTEXT
+    if AUTH_DEV_TOKENS and uso is None and token.startswith("dev-"):
+        key = _dev_token(token)
+    else:
+        payload = verify_token(token, uso)
+        if not payload:
+            return None
+        key = (int(payload["u"]), payload.get("e"))
+        digest = payload.get("p")
+    if key is None:
+        return None
+    ctx = auth_cache.get(key)
+    if ctx is None:
+        ctx = await _load_context(db, *key)
+        if ctx is None:
             return None
-        esc_id = None
-        if len(parts) > 1:
-            try:
-                esc_id = int(parts[1])
-            except ValueError:
-                esc_id = None
-        return {"user": db.get(Usuario, uid), "escritorio_id": esc_id}
-    return None
+        auth_cache.put(key, ctx)
+    # Permissões alteradas depois da emissão invalidam o token
+    if digest is not None and digest != ctx.perms_digest:
+        return None
+    return ctx
+
+
+async def auth_context(request: Request, authorization: Optional[str] = Header(default=None), db: AsyncSession = Depends(get_async_db)) -> Optional[AuthContext]:
+    # Sub-requisição de /batch: o token já foi resolvido uma vez para o lote
+    if SHARED_AUTH in request.scope:
+        return request.scope[SHARED_AUTH]
+    return await _resolve_token(authorization, db)
 
 
 @router.get("/me", summary="Usuário atual")
-def me(authorization: Optional[str] = Header(default=None), db: Session = Depends(get_db)) -> Dict[str, Any]:
-    ctx = _resolve_token(authorization, db)
-    if not ctx or not ctx.get("user"):
+async def me(ctx: Optional[AuthContext] = Depends(auth_context)) -> Dict[str, Any]:
+    if not ctx:
         raise HTTPException(status_code=401, detail="Não autenticado")
-    user: Usuario = ctx["user"]
-    esc_id = ctx.get("escritorio_id")
-    office = db.get(Escritorio, esc_id) if esc_id else None
-    adv = db.get(Advogado, user.advogado_id) if user.advogado_id else None
     return {
-        "id": user.id,
-        "username": user.username,
-        "nome": user.nome,
-        "email": user.email,
-        "role": user.role,
-        "permissoes": user.permissoes,
-        "escritorioNome": office and office.nome,
-        "advogadoNome": adv and adv.nome,
-        "advogadoOab": adv and adv.oab,
-    }
\ No newline at end of file
+        "id": ctx.user_id,
+        "username": ctx.username,
+        "nome": ctx.nome,
+        "email": ctx.email,
+        "role": ctx.role,
+        "permissoes": ctx.permissoes,
+        "escritorioNome": ctx.escritorio_nome,
+        "advogadoNome": ctx.advogado_nome,
+        "advogadoOab": ctx.advogado_oab,
+    }
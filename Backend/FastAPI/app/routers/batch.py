@@ -0,0 +1,57 @@
+import asyncio
+import time
+from typing import Any, Optional
+
+from fastapi import APIRouter, Header, Request, Response
+
+from ..batch import AUTOCOMMIT, BATCH_TIMEOUT, SharedSession, combinar, executar, shared_scope
+from ..database import DB_ASYNC, AsyncSessionLocal, ThreadedSession, ThreadedSessionLocal
+from ..replicas import open_read_session, replicas
+from ..schemas.batch import BatchRequest
+from .auth import _resolve_token
+
+
+router = APIRouter()
+
+
+async def _sessao_primaria() -> Any:
+    db: Any = AsyncSessionLocal() if DB_ASYNC else ThreadedSession(ThreadedSessionLocal())
+    await db.connection(execution_options=AUTOCOMMIT)
+    return db
+
+
+@router.post("/", response_model=None, summary="Executar vários GETs numa única requisição")
+async def batch(
+    payload: BatchRequest,
+    request: Request,
+    authorization: Optional[str] = Header(default=None),
+) -> Response:
+    """Executa os GETs de `requisicoes` (ex.: `/clientes/?limit=50`) como se viessem do cliente.
+
+    O token é resolvido uma vez e as sub-requisições correm em paralelo sobre
+    a mesma sessão (uma de leitura à parte só quando há réplicas), com as
+    consultas serializadas entre si. Cada item volta com `status`, `tempo_ms`,
+    os cabeçalhos de cache/paginação e o `corpo` da rota; a falha de um item
+    não afeta os demais. `headers` por item aceita, por exemplo, If-None-Match.
+    BATCH_TIMEOUT vale para o lote inteiro: o que não terminar a tempo volta 504.
+    """
+    t0 = time.perf_counter()
+    prazo = time.monotonic() + BATCH_TIMEOUT
+    db = SharedSession(await _sessao_primaria(), _sessao_primaria)
+    sessoes = [db]
+    try:
+        read_db = db
+        if replicas and DB_ASYNC:
+            read_db = SharedSession(await open_read_session(request, AUTOCOMMIT), lambda: open_read_session(request, AUTOCOMMIT))
+            sessoes.append(read_db)
+        ctx = await _resolve_token(authorization, db)
+        base = shared_scope(request.scope, db, read_db, ctx)
+        respostas = await asyncio.gather(*(executar(request.app, base, item, prazo) for item in payload.requisicoes))
+    finally:
+        for sessao in sessoes:
+            await sessao.close()
+    return Response(
+        content=combinar(respostas, (time.perf_counter() - t0) * 1000),
+        media_type="application/json",
+        headers={"Cache-Control": "no-store"},
+    )
@@ -1,28 +1,119 @@
-from fastapi import APIRouter, HTTPException, Depends, Header
-from typing import List, Dict
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from ..database import get_db
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from datetime import datetime
+from typing import Annotated, Any, List, Dict, Literal, Optional
+from sqlalchemy import delete, func, literal, null, or_, select, update
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..database import get_async_db
+from ..replicas import get_read_db, open_read_session
+from ..export import EXPORT_CHUNK_SIZE, FORMATOS, WRITERS
+from ..importer import ImportSpec, import_request
+from ..bulk import commit_bulk, execute_with_events, json_object
+from ..serialization import json_list, json_response
+from ..versions import conditional
 from ..models.causas_processos import CausaProcesso
-from ..schemas.causas_processos import CausaProcessoCreate, CausaProcessoRead, CausaProcessoUpdate
-from ..models.auditoria import Auditoria
-from .utils import upper_except_email, build_diff
-from .auth import _resolve_token
+from ..models.causas_resumo import CausaResumo
+from ..schemas.causas_processos import (
+    CausaProcessoCreate, CausaProcessoRead, CausaProcessoUpdate, CausaProcessoFiltro,
+    CausaProcessoLoteFiltro, CausaProcessoLoteUpdate, CausaProcessoLoteDelete, CausaResumoFiltro,
+)
+from .utils import upper_except_email
+from .uow import UnitOfWork
+from ..permissions import require
+from .auth import auth_context
+from ..security import AuthContext
+from .pagination import PageParams, page_params, query_filters, paginate, apply_filters, eq, gte, lte
 
 
 router = APIRouter()
 
+CAUSA_FILTERS = {
+    "status": eq(CausaProcesso.status),
+    "cliente_id": eq(CausaProcesso.cliente_id),
+    "advogado_id": eq(CausaProcesso.advogado_id),
+    "escritorio_id": eq(CausaProcesso.escritorio_id),
+    "especialidade_id": eq(CausaProcesso.especialidade_id),
+    "dataDistribuicao_de": gte(CausaProcesso.dataDistribuicao),
+    "dataDistribuicao_ate": lte(CausaProcesso.dataDistribuicao),
+}
+CAUSA_SORTS = {
+    "numero": CausaProcesso.numero,
+    "status": CausaProcesso.status,
+    "dataDistribuicao": CausaProcesso.dataDistribuicao,
+    "valor": CausaProcesso.valor,
+}
 
-@router.get("/", response_model=List[CausaProcessoRead], summary="Listar Causas e Processos")
-def list_causas(authorization: str | None = Header(default=None), db: Session = Depends(get_db)) -> List[CausaProcessoRead]:
-    ctx = _resolve_token(authorization, db)
-    if ctx and ctx.get("escritorio_id"):
-        return db.query(CausaProcesso).filter(CausaProcesso.escritorio_id == ctx["escritorio_id"]).all()  # type: ignore
-    return db.query(CausaProcesso).all()
 
+@router.get("/", response_model=List[CausaProcessoRead], summary="Listar Causas e Processos", dependencies=[Depends(conditional("CausasProcessos"))])
+async def list_causas(
+    response: Response,
+    filtros: Annotated[CausaProcessoFiltro, Depends(query_filters(CausaProcessoFiltro))],
+    page: PageParams = Depends(page_params),
+    ctx: Optional[AuthContext] = Depends(auth_context),
+    db: AsyncSession = Depends(get_read_db),
+) -> List[CausaProcessoRead]:
+    stmt = apply_filters(select(CausaProcesso), CAUSA_FILTERS, filtros.model_dump())
+    if ctx and ctx.escritorio_id:
+        stmt = stmt.where(CausaProcesso.escritorio_id == ctx.escritorio_id)
+    return json_list(CausaProcessoRead, await paginate(db, stmt, CausaProcesso.id, page, response, CAUSA_SORTS), response)  # type: ignore
 
-@router.post("/", response_model=CausaProcessoRead, summary="Criar Causa/Processo")
-def create_causa(payload: CausaProcessoCreate, db: Session = Depends(get_db)) -> CausaProcessoRead:
+
+EXPORT_COLUMNS = [
+    CausaProcesso.id,
+    CausaProcesso.numero,
+    CausaProcesso.descricao,
+    CausaProcesso.status,
+    CausaProcesso.cliente_id,
+    CausaProcesso.advogado_id,
+    CausaProcesso.escritorio_id,
+    CausaProcesso.especialidade_id,
+    CausaProcesso.dataDistribuicao,
+    CausaProcesso.valor,
+]
+
+
+def export_format(formato: Literal["csv", "ndjson", "xlsx"] = Query("csv", description="Formato do arquivo")) -> str:
+    return formato
+
+
+@router.get("/export", summary="Exportar Causas e Processos (CSV, NDJSON ou XLSX)")
+async def export_causas(
+    request: Request,
+    filtros: Annotated[CausaProcessoFiltro, Depends(query_filters(CausaProcessoFiltro))],
+    formato: str = Depends(export_format),
+    ctx: AuthContext = Depends(require("CAUSAS_READ")),
+) -> StreamingResponse:
+    # Autenticação obrigatória (401 sem token): a exportação traz valores de todo o escopo
+    stmt = apply_filters(select(*EXPORT_COLUMNS), CAUSA_FILTERS, filtros.model_dump())
+    if ctx.escritorio_id:
+        stmt = stmt.where(CausaProcesso.escritorio_id == ctx.escritorio_id)
+    stmt = stmt.order_by(CausaProcesso.id).execution_options(yield_per=EXPORT_CHUNK_SIZE)
+    # Session própria: o streaming continua depois que as dependências da rota já saíram
+    db = await open_read_session(request)
+
+    columns = [c.key for c in EXPORT_COLUMNS]
+
+    async def body():
+        try:
+            # Cursor no servidor: só um lote de linhas em memória por vez
+            result = await db.stream(stmt)
+            async for chunk in WRITERS[formato](columns, result.partitions()):
+                yield chunk
+        finally:
+            await db.close()
+
+    media_type, ext = FORMATOS[formato]
+    filename = f"causas-processos-{datetime.now():%Y%m%d-%H%M%S}.{ext}"
+    return StreamingResponse(
+        body(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.post("/", response_model=CausaProcessoRead, summary="Criar Causa/Processo", dependencies=[Depends(require("CAUSAS_WRITE"))])
+async def create_causa(payload: CausaProcessoCreate, db: AsyncSession = Depends(get_async_db)) -> CausaProcessoRead:
     from datetime import date
     data = upper_except_email(payload.model_dump())
     if isinstance(data.get("dataDistribuicao"), str):
@@ -30,18 +121,115 @@ def create_causa(payload: CausaProcessoCreate, db: Session = Depends(get_db)) ->
             data["dataDistribuicao"] = date.fromisoformat(data["dataDistribuicao"])  # type: ignore
         except Exception:
             pass
-    row = CausaProcesso(**data)
-    db.add(row)
-    db.commit()
-    db.refresh(row)
-    db.add(Auditoria(entidade="CausasProcessos", entidade_id=row.id, acao="create", quem="SYSTEM", diff=build_diff(None, data)))
-    db.commit()
+    uow = UnitOfWork(db, "CausasProcessos")
+    row = await uow.create(CausaProcesso(**data), data)
+    await uow.commit()
     return row
 
 
-@router.put("/{row_id}", response_model=CausaProcessoRead, summary="Atualizar Causa/Processo")
-def update_causa(row_id: int, payload: CausaProcessoUpdate, db: Session = Depends(get_db)) -> CausaProcessoRead:
-    row = db.get(CausaProcesso, row_id)
+def _escopo_importacao(values: Dict[str, Any], ctx: Optional[AuthContext]) -> List[str]:
+    if ctx and ctx.escritorio_id:
+        if values["escritorio_id"] is None:
+            values["escritorio_id"] = ctx.escritorio_id
+        elif values["escritorio_id"] != ctx.escritorio_id:
+            return ["escritorio_id: fora do escritório do usuário"]
+    return []
+
+
+CAUSA_IMPORT = ImportSpec("CausasProcessos", CausaProcesso, CausaProcessoCreate, key=("numero", "escritorio_id"), prepare=_escopo_importacao)
+
+
+@router.post("/import", summary="Importar Causas e Processos (CSV ou NDJSON)", dependencies=[Depends(require("CAUSAS_WRITE"))])
+async def import_causas(
+    request: Request,
+    formato: Literal["csv", "ndjson"] = Query("csv", description="Formato do corpo enviado"),
+    atomico: bool = Query(False, description="Cancela a importação se alguma linha tiver erro"),
+    ctx: Optional[AuthContext] = Depends(auth_context),
+) -> Dict[str, Any]:
+    # Mesmo número no mesmo escritório atualiza a causa existente
+    return await import_request(request, CAUSA_IMPORT, formato, ctx, atomico)
+
+
+# (atributo da API, coluna) usados na auditoria das operações em lote
+CAUSA_CAMPOS = [(attr, CausaProcesso.__mapper__.attrs[attr].columns[0].name) for attr in CausaProcessoCreate.model_fields]
+
+
+def _lote(stmt, filtro: CausaProcessoLoteFiltro, ctx: Optional[AuthContext]):
+    values = filtro.model_dump(exclude={"ids"})
+    # Sem filtro a operação pegaria a tabela inteira
+    if filtro.ids is None and all(v is None for v in values.values()):
+        raise HTTPException(status_code=400, detail="Informe ao menos um filtro para a operação em lote")
+    stmt = apply_filters(stmt, CAUSA_FILTERS, values)
+    if filtro.ids is not None:
+        stmt = stmt.where(CausaProcesso.id.in_(filtro.ids))
+    if ctx and ctx.escritorio_id:
+        stmt = stmt.where(CausaProcesso.escritorio_id == ctx.escritorio_id)
+    return stmt
+
+
+@router.post("/bulk-update", summary="Atualizar Causas/Processos em lote por filtro", dependencies=[Depends(require("CAUSAS_WRITE"))])
+async def bulk_update_causas(
+    payload: CausaProcessoLoteUpdate,
+    ctx: Optional[AuthContext] = Depends(auth_context),
+    db: AsyncSession = Depends(get_async_db),
+) -> Dict[str, Any]:
+    from datetime import date
+    data = upper_except_email(payload.patch.model_dump(exclude_unset=True))
+    if not data:
+        raise HTTPException(status_code=400, detail="Nenhum campo para alterar")
+    if isinstance(data.get("dataDistribuicao"), str):
+        try:
+            data["dataDistribuicao"] = date.fromisoformat(data["dataDistribuicao"])  # type: ignore
+        except ValueError:
+            raise HTTPException(status_code=400, detail="dataDistribuicao inválida (use AAAA-MM-DD)")
+    if ctx and ctx.escritorio_id and "escritorio_id" in data and data["escritorio_id"] != ctx.escritorio_id:
+        raise HTTPException(status_code=403, detail="Escritório fora do escopo do usuário")
+
+    t = CausaProcesso.__table__
+    valores = {CausaProcesso.__mapper__.attrs[k].columns[0].name: v for k, v in data.items()}
+    # Só as linhas que de fato mudam: evita versões, auditoria e eventos vazios
+    muda = or_(*(t.c[c].is_distinct_from(v) for c, v in valores.items()))
+    if payload.dry_run:
+        total = await db.scalar(_lote(select(func.count()).select_from(t), payload.filtro, ctx).where(muda))
+        return {"dry_run": True, "afetadas": total or 0}
+
+    prev = t.alias("prev")
+    mudancas = (
+        _lote(update(t), payload.filtro, ctx)
+        .where(muda, prev.c.id == t.c.id)
+        .values(valores)
+        .returning(literal("update").label("acao"), t.c.id, json_object(prev, CAUSA_CAMPOS).label("antes"), json_object(t, CAUSA_CAMPOS).label("depois"))
+        .cte("mudancas")
+    )
+    afetadas = (await execute_with_events(db, mudancas, "CausasProcessos", ctx.username if ctx else "SYSTEM")).get("update", 0)
+    await commit_bulk(db, "CausasProcessos", afetadas, ctx.escritorio_id if ctx else None)
+    return {"dry_run": False, "afetadas": afetadas}
+
+
+@router.post("/bulk-delete", summary="Remover Causas/Processos em lote por filtro", dependencies=[Depends(require("CAUSAS_WRITE"))])
+async def bulk_delete_causas(
+    payload: CausaProcessoLoteDelete,
+    ctx: Optional[AuthContext] = Depends(auth_context),
+    db: AsyncSession = Depends(get_async_db),
+) -> Dict[str, Any]:
+    t = CausaProcesso.__table__
+    if payload.dry_run:
+        total = await db.scalar(_lote(select(func.count()).select_from(t), payload.filtro, ctx))
+        return {"dry_run": True, "afetadas": total or 0}
+
+    mudancas = (
+        _lote(delete(t), payload.filtro, ctx)
+        .returning(literal("delete").label("acao"), t.c.id, json_object(t, CAUSA_CAMPOS).label("antes"), null().cast(JSONB).label("depois"))
+        .cte("mudancas")
+    )
+    afetadas = (await execute_with_events(db, mudancas, "CausasProcessos", ctx.username if ctx else "SYSTEM")).get("delete", 0)
+    await commit_bulk(db, "CausasProcessos", afetadas, ctx.escritorio_id if ctx else None)
+    return {"dry_run": False, "afetadas": afetadas}
+
+
+@router.put("/{row_id}", response_model=CausaProcessoRead, summary="Atualizar Causa/Processo", dependencies=[Depends(require("CAUSAS_WRITE"))])
+async def update_causa(row_id: int, payload: CausaProcessoUpdate, db: AsyncSession = Depends(get_async_db)) -> CausaProcessoRead:
+    row = await db.get(CausaProcesso, row_id)
     if not row:
         raise HTTPException(status_code=404, detail="Registro não encontrado")
     before = {
@@ -64,16 +252,15 @@ def update_causa(row_id: int, payload: CausaProcessoUpdate, db: Session = Depend
             pass
     for k, v in data.items():
         setattr(row, k, v)
-    db.commit()
-    db.refresh(row)
-    db.add(Auditoria(entidade="CausasProcessos", entidade_id=row.id, acao="update", quem="SYSTEM", diff=build_diff(before, data)))
-    db.commit()
+    uow = UnitOfWork(db, "CausasProcessos")
+    uow.update(row, before, data)
+    await uow.commit()
     return row
 
 
-@router.delete("/{row_id}", summary="Remover Causa/Processo")
-def delete_causa(row_id: int, db: Session = Depends(get_db)) -> Dict[str, str]:
-    row = db.get(CausaProcesso, row_id)
+@router.delete("/{row_id}", summary="Remover Causa/Processo", dependencies=[Depends(require("CAUSAS_WRITE"))])
+async def delete_causa(row_id: int, db: AsyncSession = Depends(get_async_db)) -> Dict[str, str]:
+    row = await db.get(CausaProcesso, row_id)
     if not row:
         raise HTTPException(status_code=404, detail="Registro não encontrado")
     before = {
@@ -86,18 +273,75 @@ def delete_causa(row_id: int, db: Session = Depends(get_db)) -> Dict[str, str]:
         "especialidade_id": row.especialidade_id,
         "valor": float(row.valor) if row.valor is not None else None,
     }
-    db.delete(row)
-    db.commit()
-    db.add(Auditoria(entidade="CausasProcessos", entidade_id=row_id, acao="delete", quem="SYSTEM", diff=build_diff(before, None)))
-    db.commit()
+    uow = UnitOfWork(db, "CausasProcessos")
+    await uow.delete(row, before)
+    await uow.commit()
     return {"status": "deleted"}
 
 
-@router.get("/sum", summary="Somar valores de causas")
-def sum_valores_causas(db: Session = Depends(get_db)) -> Dict[str, float]:
-    total = db.query(func.coalesce(func.sum(CausaProcesso.valor), 0)).scalar() or 0
+@router.get("/sum", summary="Somar valores de causas", dependencies=[Depends(conditional("CausasProcessos"))])
+async def sum_valores_causas(
+    ctx: Optional[AuthContext] = Depends(auth_context),
+    db: AsyncSession = Depends(get_read_db),
+) -> Dict[str, float]:
+    # Lido do resumo: O(grupos), e restrito ao escritório do usuário
+    stmt = select(func.coalesce(func.sum(CausaResumo.valor_total), 0))
+    if ctx and ctx.escritorio_id:
+        stmt = stmt.where(CausaResumo.escritorio_id == ctx.escritorio_id)
+    total = await db.scalar(stmt) or 0
     try:
         total_num = float(total)
     except Exception:
         total_num = 0.0
-    return {"total": total_num}
\ No newline at end of file
+    return {"total": total_num}
+
+
+RESUMO_DIMENSOES = {
+    "escritorio_id": CausaResumo.escritorio_id,
+    "status": CausaResumo.status,
+    "especialidade_id": CausaResumo.especialidade_id,
+    "advogado_id": CausaResumo.advogado_id,
+    "mes": CausaResumo.mes,
+}
+RESUMO_FILTERS = {
+    "escritorio_id": eq(CausaResumo.escritorio_id),
+    "status": eq(CausaResumo.status),
+    "especialidade_id": eq(CausaResumo.especialidade_id),
+    "advogado_id": eq(CausaResumo.advogado_id),
+    "mes_de": gte(CausaResumo.mes),
+    "mes_ate": lte(CausaResumo.mes),
+}
+
+
+@router.get("/resumo", summary="Quantidade e valor das causas por grupo", dependencies=[Depends(conditional("CausasProcessos"))])
+async def resumo_causas(
+    response: Response,
+    filtros: Annotated[CausaResumoFiltro, Query()],
+    ctx: Optional[AuthContext] = Depends(auth_context),
+    db: AsyncSession = Depends(get_read_db),
+) -> Dict[str, Any]:
+    valores = filtros.model_dump(exclude={"agrupar"})
+    # O resumo guarda o primeiro dia do mês de distribuição
+    for k in ("mes_de", "mes_ate"):
+        if valores[k] is not None:
+            valores[k] = valores[k].replace(day=1)
+    nomes = list(dict.fromkeys(filtros.agrupar))
+    dims = [RESUMO_DIMENSOES[n] for n in nomes]
+    stmt = apply_filters(
+        select(*dims, func.sum(CausaResumo.quantidade), func.sum(CausaResumo.valor_total)),
+        RESUMO_FILTERS,
+        valores,
+    )
+    if ctx and ctx.escritorio_id:
+        stmt = stmt.where(CausaResumo.escritorio_id == ctx.escritorio_id)
+    if dims:
+        stmt = stmt.group_by(*dims).order_by(*dims)
+    grupos = []
+    quantidade, valor_total = 0, 0.0
+    for *chave, qtd, valor in (await db.execute(stmt)).all():
+        if qtd is None:  # sem linhas e sem agrupamento: SUM devolve NULL
+            continue
+        grupos.append({**dict(zip(nomes, chave)), "quantidade": int(qtd), "valor_total": float(valor)})
+        quantidade += int(qtd)
+        valor_total += float(valor)
+    return json_response({"total": {"quantidade": quantidade, "valor_total": valor_total}, "grupos": grupos}, response)
@@ -1,57 +1,85 @@
-from fastapi import APIRouter, HTTPException, Depends
-from typing import List, Dict
-from sqlalchemy.orm import Session
-from ..database import get_db
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
+from typing import Annotated, Any, List, Dict, Literal
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..database import get_async_db
+from ..replicas import get_read_db
+from ..serialization import json_list
+from ..importer import ImportSpec, import_request
+from ..versions import conditional
 from ..models.cliente import Cliente
-from ..schemas.cliente import ClienteCreate, ClienteRead, ClienteUpdate
-from ..models.auditoria import Auditoria
-from .utils import upper_except_email, build_diff
+from ..schemas.cliente import ClienteCreate, ClienteRead, ClienteUpdate, ClienteFiltro
+from .utils import upper_except_email
+from .uow import UnitOfWork
+from ..permissions import require
+from .pagination import PageParams, page_params, query_filters, paginate, apply_filters, eq, contains
 
 
 router = APIRouter()
 
+CLIENTE_FILTERS = {
+    "nome": contains(Cliente.nome),
+    "cpf_cnpj": eq(Cliente.cpf_cnpj),
+    "email": eq(Cliente.email),
+}
+CLIENTE_SORTS = {"nome": Cliente.nome, "cpf_cnpj": Cliente.cpf_cnpj}
 
-@router.get("/", response_model=List[ClienteRead], summary="Listar Clientes")
-def list_clientes(db: Session = Depends(get_db)) -> List[ClienteRead]:
-    return db.query(Cliente).all()
 
+@router.get("/", response_model=List[ClienteRead], summary="Listar Clientes", dependencies=[Depends(conditional("Clientes"))])
+async def list_clientes(
+    response: Response,
+    filtros: Annotated[ClienteFiltro, Depends(query_filters(ClienteFiltro))],
+    page: PageParams = Depends(page_params),
+    db: AsyncSession = Depends(get_read_db),
+) -> List[ClienteRead]:
+    stmt = apply_filters(select(Cliente), CLIENTE_FILTERS, filtros.model_dump())
+    return json_list(ClienteRead, await paginate(db, stmt, Cliente.id, page, response, CLIENTE_SORTS), response)  # type: ignore
 
-@router.post("/", response_model=ClienteRead, summary="Criar Cliente")
-def create_cliente(payload: ClienteCreate, db: Session = Depends(get_db)) -> ClienteRead:
+
+@router.post("/", response_model=ClienteRead, summary="Criar Cliente", dependencies=[Depends(require("CLIENTES_WRITE"))])
+async def create_cliente(payload: ClienteCreate, db: AsyncSession = Depends(get_async_db)) -> ClienteRead:
     data = upper_except_email(payload.model_dump())
-    row = Cliente(**data)
-    db.add(row)
-    db.commit()
-    db.refresh(row)
-    db.add(Auditoria(entidade="Clientes", entidade_id=row.id, acao="create", quem="SYSTEM", diff=build_diff(None, data)))
-    db.commit()
+    uow = UnitOfWork(db, "Clientes")
+    row = await uow.create(Cliente(**data), data)
+    await uow.commit()
     return row
 
 
-@router.put("/{row_id}", response_model=ClienteRead, summary="Atualizar Cliente")
-def update_cliente(row_id: int, payload: ClienteUpdate, db: Session = Depends(get_db)) -> ClienteRead:
-    row = db.get(Cliente, row_id)
+CLIENTE_IMPORT = ImportSpec("Clientes", Cliente, ClienteCreate, key=("cpf_cnpj",))
+
+
+@router.post("/import", summary="Importar Clientes (CSV ou NDJSON)", dependencies=[Depends(require("CLIENTES_WRITE"))])
+async def import_clientes(
+    request: Request,
+    formato: Literal["csv", "ndjson"] = Query("csv", description="Formato do corpo enviado"),
+    atomico: bool = Query(False, description="Cancela a importação se alguma linha tiver erro"),
+) -> Dict[str, Any]:
+    # Clientes já cadastrados (mesmo CPF/CNPJ) são atualizados; os demais, inseridos
+    return await import_request(request, CLIENTE_IMPORT, formato, None, atomico)
+
+
+@router.put("/{row_id}", response_model=ClienteRead, summary="Atualizar Cliente", dependencies=[Depends(require("CLIENTES_WRITE"))])
+async def update_cliente(row_id: int, payload: ClienteUpdate, db: AsyncSession = Depends(get_async_db)) -> ClienteRead:
+    row = await db.get(Cliente, row_id)
     if not row:
         raise HTTPException(status_code=404, detail="Cliente não encontrado")
     before = {"nome": row.nome, "cpf_cnpj": row.cpf_cnpj, "email": row.email, "telefone": row.telefone}
     data = upper_except_email(payload.model_dump(exclude_unset=True))
     for k, v in data.items():
         setattr(row, k, v)
-    db.commit()
-    db.refresh(row)
-    db.add(Auditoria(entidade="Clientes", entidade_id=row.id, acao="update", quem="SYSTEM", diff=build_diff(before, data)))
-    db.commit()
+    uow = UnitOfWork(db, "Clientes")
+    uow.update(row, before, data)
+    await uow.commit()
     return row
 
 
-@router.delete("/{row_id}", summary="Remover Cliente")
-def delete_cliente(row_id: int, db: Session = Depends(get_db)) -> Dict[str, str]:
-    row = db.get(Cliente, row_id)
+@router.delete("/{row_id}", summary="Remover Cliente", dependencies=[Depends(require("CLIENTES_WRITE"))])
+async def delete_cliente(row_id: int, db: AsyncSession = Depends(get_async_db)) -> Dict[str, str]:
+    row = await db.get(Cliente, row_id)
     if not row:
         raise HTTPException(status_code=404, detail="Cliente não encontrado")
     before = {"nome": row.nome, "cpf_cnpj": row.cpf_cnpj, "email": row.email, "telefone": row.telefone}
-    db.delete(row)
-    db.commit()
-    db.add(Auditoria(entidade="Clientes", entidade_id=row_id, acao="delete", quem="SYSTEM", diff=build_diff(before, None)))
-    db.commit()
-    return {"status": "deleted"}
\ No newline at end of file
+    uow = UnitOfWork(db, "Clientes")
+    await uow.delete(row, before)
+    await uow.commit()
+    return {"status": "deleted"}
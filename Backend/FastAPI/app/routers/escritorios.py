@@ -1,62 +1,101 @@
-from fastapi import APIRouter, HTTPException, Depends, Header
-from typing import List, Dict
-from sqlalchemy.orm import Session
-from ..database import get_db
+from fastapi import APIRouter, HTTPException, Depends, Request, Response
+from typing import Annotated, List, Dict, Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..database import get_async_db
+from ..versions import conditional
+from ..cache import cached_get, cached_page, list_key
+from ..serialization import json_list
 from ..models.escritorio import Escritorio
-from ..schemas.escritorio import EscritorioCreate, EscritorioRead, EscritorioUpdate
-from ..models.auditoria import Auditoria
-from .utils import upper_except_email, build_diff
-from .auth import _resolve_token
+from ..schemas.escritorio import EscritorioCreate, EscritorioRead, EscritorioUpdate, EscritorioFiltro
+from .utils import upper_except_email
+from .uow import UnitOfWork
+from ..permissions import require
+from .auth import auth_context
+from ..security import AuthContext
+from .pagination import PageParams, page_params, query_filters, paginate, apply_filters, eq, contains
 
 
 router = APIRouter()
 
+ESCRITORIO_FILTERS = {
+    "nome": contains(Escritorio.nome),
+    "cnpj": eq(Escritorio.cnpj),
+}
+ESCRITORIO_SORTS = {"nome": Escritorio.nome}
 
-@router.get("/", response_model=List[EscritorioRead], summary="Listar Escritórios")
-def list_escritorios(authorization: str | None = Header(default=None), db: Session = Depends(get_db)) -> List[EscritorioRead]:
-    ctx = _resolve_token(authorization, db)
-    if ctx and ctx.get("escritorio_id"):
-        row = db.get(Escritorio, ctx["escritorio_id"])  # type: ignore
-        return [row] if row else []
-    return db.query(Escritorio).all()
 
+@router.get("/", response_model=List[EscritorioRead], summary="Listar Escritórios", dependencies=[Depends(conditional("Escritorios"))])
+async def list_escritorios(
+    request: Request,
+    response: Response,
+    filtros: Annotated[EscritorioFiltro, Depends(query_filters(EscritorioFiltro))],
+    page: PageParams = Depends(page_params),
+    ctx: Optional[AuthContext] = Depends(auth_context),
+    db: AsyncSession = Depends(get_async_db),
+) -> List[EscritorioRead]:
+    escritorio_id = ctx.escritorio_id if ctx else None
 
-@router.post("/", response_model=EscritorioRead, summary="Criar Escritório")
-def create_escritorio(payload: EscritorioCreate, db: Session = Depends(get_db)) -> EscritorioRead:
+    async def load():
+        stmt = apply_filters(select(Escritorio), ESCRITORIO_FILTERS, filtros.model_dump())
+        if escritorio_id:
+            stmt = stmt.where(Escritorio.id == escritorio_id)
+        return await paginate(db, stmt, Escritorio.id, page, response, ESCRITORIO_SORTS)
+
+    # O escopo do usuário entra na chave: cada escritório tem a sua listagem
+    items = await cached_page("Escritorios", list_key(request.url.query, escritorio_id), response, EscritorioRead, load)
+    return json_list(EscritorioRead, items, response)
+
+
+@router.get("/{row_id}", response_model=EscritorioRead, summary="Obter Escritório", dependencies=[Depends(conditional("Escritorios"))])
+async def get_escritorio(
+    row_id: int,
+    ctx: Optional[AuthContext] = Depends(auth_context),
+    db: AsyncSession = Depends(get_async_db),
+) -> EscritorioRead:
+    if ctx and ctx.escritorio_id and ctx.escritorio_id != row_id:
+        raise HTTPException(status_code=404, detail="Escritório não encontrado")
+
+    async def load():
+        row = await db.get(Escritorio, row_id)
+        if not row:
+            raise HTTPException(status_code=404, detail="Escritório não encontrado")
+        return row
+
+    return await cached_get("Escritorios", row_id, EscritorioRead, load)  # type: ignore
+
+
+@router.post("/", response_model=EscritorioRead, summary="Criar Escritório", dependencies=[Depends(require("ESCRITORIOS_WRITE"))])
+async def create_escritorio(payload: EscritorioCreate, db: AsyncSession = Depends(get_async_db)) -> EscritorioRead:
     data = upper_except_email(payload.model_dump())
-    row = Escritorio(**data)
-    db.add(row)
-    db.commit()
-    db.refresh(row)
-    db.add(Auditoria(entidade="Escritorios", entidade_id=row.id, acao="create", quem="SYSTEM", diff=build_diff(None, data)))
-    db.commit()
+    uow = UnitOfWork(db, "Escritorios")
+    row = await uow.create(Escritorio(**data), data)
+    await uow.commit()
     return row
 
 
-@router.put("/{row_id}", response_model=EscritorioRead, summary="Atualizar Escritório")
-def update_escritorio(row_id: int, payload: EscritorioUpdate, db: Session = Depends(get_db)) -> EscritorioRead:
-    row = db.get(Escritorio, row_id)
+@router.put("/{row_id}", response_model=EscritorioRead, summary="Atualizar Escritório", dependencies=[Depends(require("ESCRITORIOS_WRITE"))])
+async def update_escritorio(row_id: int, payload: EscritorioUpdate, db: AsyncSession = Depends(get_async_db)) -> EscritorioRead:
+    row = await db.get(Escritorio, row_id)
     if not row:
         raise HTTPException(status_code=404, detail="Escritório não encontrado")
     before = {"nome": row.nome, "cnpj": row.cnpj, "email": row.email, "telefone": row.telefone}
     data = upper_except_email(payload.model_dump(exclude_unset=True))
     for k, v in data.items():
         setattr(row, k, v)
-    db.commit()
-    db.refresh(row)
-    db.add(Auditoria(entidade="Escritorios", entidade_id=row.id, acao="update", quem="SYSTEM", diff=build_diff(before, data)))
-    db.commit()
+    uow = UnitOfWork(db, "Escritorios")
+    uow.update(row, before, data)
+    await uow.commit()
     return row
 
 
-@router.delete("/{row_id}", summary="Remover Escritório")
-def delete_escritorio(row_id: int, db: Session = Depends(get_db)) -> Dict[str, str]:
-    row = db.get(Escritorio, row_id)
+@router.delete("/{row_id}", summary="Remover Escritório", dependencies=[Depends(require("ESCRITORIOS_WRITE"))])
+async def delete_escritorio(row_id: int, db: AsyncSession = Depends(get_async_db)) -> Dict[str, str]:
+    row = await db.get(Escritorio, row_id)
     if not row:
         raise HTTPException(status_code=404, detail="Escritório não encontrado")
     before = {"nome": row.nome, "cnpj": row.cnpj, "email": row.email, "telefone": row.telefone}
-    db.delete(row)
-    db.commit()
-    db.add(Auditoria(entidade="Escritorios", entidade_id=row_id, acao="delete", quem="SYSTEM", diff=build_diff(before, None)))
-    db.commit()
+    uow = UnitOfWork(db, "Escritorios")
+    await uow.delete(row, before)
+    await uow.commit()
     return {"status": "deleted"}
\ No newline at end of file
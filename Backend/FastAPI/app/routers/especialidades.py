@@ -1,57 +1,85 @@
-from fastapi import APIRouter, HTTPException, Depends
-from typing import List, Dict
-from sqlalchemy.orm import Session
-from ..database import get_db
+from fastapi import APIRouter, HTTPException, Depends, Request, Response
+from typing import Annotated, List, Dict
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..database import get_async_db
+from ..versions import conditional
+from ..cache import cached_get, cached_page, list_key
+from ..serialization import json_list
 from ..models.especialidade import Especialidade
-from ..schemas.especialidade import EspecialidadeCreate, EspecialidadeRead, EspecialidadeUpdate
-from ..models.auditoria import Auditoria
-from .utils import upper_except_email, build_diff
+from ..schemas.especialidade import EspecialidadeCreate, EspecialidadeRead, EspecialidadeUpdate, EspecialidadeFiltro
+from .utils import upper_except_email
+from .uow import UnitOfWork
+from ..permissions import require
+from .pagination import PageParams, page_params, query_filters, paginate, apply_filters, contains
 
 
 router = APIRouter()
 
+ESPECIALIDADE_FILTERS = {
+    "nome": contains(Especialidade.nome),
+}
+ESPECIALIDADE_SORTS = {"nome": Especialidade.nome}
 
-@router.get("/", response_model=List[EspecialidadeRead], summary="Listar Especialidades")
-def list_especialidades(db: Session = Depends(get_db)) -> List[EspecialidadeRead]:
-    return db.query(Especialidade).all()
 
+@router.get("/", response_model=List[EspecialidadeRead], summary="Listar Especialidades", dependencies=[Depends(conditional("Especialidades"))])
+async def list_especialidades(
+    request: Request,
+    response: Response,
+    filtros: Annotated[EspecialidadeFiltro, Depends(query_filters(EspecialidadeFiltro))],
+    page: PageParams = Depends(page_params),
+    db: AsyncSession = Depends(get_async_db),
+) -> List[EspecialidadeRead]:
+    async def load():
+        stmt = apply_filters(select(Especialidade), ESPECIALIDADE_FILTERS, filtros.model_dump())
+        return await paginate(db, stmt, Especialidade.id, page, response, ESPECIALIDADE_SORTS)
 
-@router.post("/", response_model=EspecialidadeRead, summary="Criar Especialidade")
-def create_especialidade(payload: EspecialidadeCreate, db: Session = Depends(get_db)) -> EspecialidadeRead:
+    items = await cached_page("Especialidades", list_key(request.url.query), response, EspecialidadeRead, load)
+    return json_list(EspecialidadeRead, items, response)
+
+
+@router.get("/{row_id}", response_model=EspecialidadeRead, summary="Obter Especialidade", dependencies=[Depends(conditional("Especialidades"))])
+async def get_especialidade(row_id: int, db: AsyncSession = Depends(get_async_db)) -> EspecialidadeRead:
+    async def load():
+        row = await db.get(Especialidade, row_id)
+        if not row:
+            raise HTTPException(status_code=404, detail="Especialidade não encontrada")
+        return row
+
+    return await cached_get("Especialidades", row_id, EspecialidadeRead, load)  # type: ignore
+
+
+@router.post("/", response_model=EspecialidadeRead, summary="Criar Especialidade", dependencies=[Depends(require("ESPECIALIDADES_WRITE"))])
+async def create_especialidade(payload: EspecialidadeCreate, db: AsyncSession = Depends(get_async_db)) -> EspecialidadeRead:
     data = upper_except_email(payload.model_dump())
-    row = Especialidade(**data)
-    db.add(row)
-    db.commit()
-    db.refresh(row)
-    db.add(Auditoria(entidade="Especialidades", entidade_id=row.id, acao="create", quem="SYSTEM", diff=build_diff(None, data)))
-    db.commit()
+    uow = UnitOfWork(db, "Especialidades")
+    row = await uow.create(Especialidade(**data), data)
+    await uow.commit()
     return row
 
 
-@router.put("/{row_id}", response_model=EspecialidadeRead, summary="Atualizar Especialidade")
-def update_especialidade(row_id: int, payload: EspecialidadeUpdate, db: Session = Depends(get_db)) -> EspecialidadeRead:
-    row = db.get(Especialidade, row_id)
+@router.put("/{row_id}", response_model=EspecialidadeRead, summary="Atualizar Especialidade", dependencies=[Depends(require("ESPECIALIDADES_WRITE"))])
+async def update_especialidade(row_id: int, payload: EspecialidadeUpdate, db: AsyncSession = Depends(get_async_db)) -> EspecialidadeRead:
+    row = await db.get(Especialidade, row_id)
     if not row:
         raise HTTPException(status_code=404, detail="Especialidade não encontrada")
     before = {"nome": row.nome, "descricao": row.descricao}
     data = upper_except_email(payload.model_dump(exclude_unset=True))
     for k, v in data.items():
         setattr(row, k, v)
-    db.commit()
-    db.refresh(row)
-    db.add(Auditoria(entidade="Especialidades", entidade_id=row.id, acao="update", quem="SYSTEM", diff=build_diff(before, data)))
-    db.commit()
+    uow = UnitOfWork(db, "Especialidades")
+    uow.update(row, before, data)
+    await uow.commit()
     return row
 
 
-@router.delete("/{row_id}", summary="Remover Especialidade")
-def delete_especialidade(row_id: int, db: Session = Depends(get_db)) -> Dict[str, str]:
-    row = db.get(Especialidade, row_id)
+@router.delete("/{row_id}", summary="Remover Especialidade", dependencies=[Depends(require("ESPECIALIDADES_WRITE"))])
+async def delete_especialidade(row_id: int, db: AsyncSession = Depends(get_async_db)) -> Dict[str, str]:
+    row = await db.get(Especialidade, row_id)
     if not row:
         raise HTTPException(status_code=404, detail="Especialidade não encontrada")
     before = {"nome": row.nome, "descricao": row.descricao}
-    db.delete(row)
-    db.commit()
-    db.add(Auditoria(entidade="Especialidades", entidade_id=row_id, acao="delete", quem="SYSTEM", diff=build_diff(before, None)))
-    db.commit()
+    uow = UnitOfWork(db, "Especialidades")
+    await uow.delete(row, before)
+    await uow.commit()
     return {"status": "deleted"}
\ No newline at end of file
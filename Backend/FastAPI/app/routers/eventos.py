@@ -0,0 +1,119 @@
+import asyncio
+from typing import Any, AsyncIterator, Dict, Optional, Set
+
+import orjson
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+
+from ..changefeed import CHANGE_FEED, CHANGE_FEED_HEARTBEAT, Subscription, change_feed
+from ..database import AsyncSessionLocal
+from ..security import EVENTOS_TICKET_TTL, AuthContext, issue_token
+from .auth import _resolve_token, auth_context
+
+
+router = APIRouter()
+
+
+async def _contexto(authorization: Optional[str], ticket: Optional[str]) -> AuthContext:
+    # EventSource e WebSocket do navegador não enviam cabeçalhos: na query vai um ticket
+    # de POST /eventos/ticket, nunca o token de acesso (a URL acaba em logs)
+    uso = None
+    if not authorization and ticket:
+        authorization, uso = f"Bearer {ticket}", "eventos"
+    if not authorization:
+        # Sem credencial não há escritório para filtrar: o feed nunca é anônimo
+        raise HTTPException(status_code=401, detail="Não autenticado")
+    # Sessão só para resolver o token: a conexão não fica presa enquanto o stream está aberto
+    async with AsyncSessionLocal() as db:
+        ctx = await _resolve_token(authorization, db, uso)
+    if ctx is None:
+        raise HTTPException(status_code=401, detail="Token inválido ou expirado")
+    return ctx
+
+
+def _entidades(entidades: Optional[str]) -> Optional[Set[str]]:
+    nomes = {e.strip() for e in (entidades or "").split(",") if e.strip()}
+    return nomes or None
+
+
+async def _next(sub: Subscription) -> Dict[str, Any]:
+    try:
+        return await asyncio.wait_for(sub.queue.get(), CHANGE_FEED_HEARTBEAT)
+    except asyncio.TimeoutError:
+        return {"tipo": "ping"}
+
+
+async def _sse(escritorio_id: Optional[int], entidades: Optional[Set[str]]) -> AsyncIterator[bytes]:
+    with change_feed.subscribe(escritorio_id, entidades) as sub:
+        # Intervalo de reconexão do EventSource
+        yield b"retry: 3000\n\n"
+        while True:
+            evento = await _next(sub)
+            if evento["tipo"] == "ping":
+                # Comentário SSE: mantém proxies e o navegador com a conexão aberta
+                yield b": ping\n\n"
+            else:
+                yield b"event: " + evento["tipo"].encode() + b"\ndata: " + orjson.dumps(evento) + b"\n\n"
+
+
+@router.post("/ticket", summary="Ticket de curta duração para abrir o feed")
+async def ticket_eventos(response: Response, ctx: Optional[AuthContext] = Depends(auth_context)) -> Dict[str, Any]:
+    """Emite um ticket para `?ticket=` em /eventos/stream e /eventos/ws, válido por EVENTOS_TICKET_TTL s.
+
+    Só serve para abrir o feed (não é aceito como Bearer nas demais rotas). O
+    cliente pede um novo a cada (re)conexão que o servidor recusar com 401.
+    """
+    if not ctx:
+        raise HTTPException(status_code=401, detail="Não autenticado")
+    response.headers["Cache-Control"] = "no-store"
+    ticket = issue_token(ctx.user_id, ctx.escritorio_id, ctx.role, ctx.permissoes, EVENTOS_TICKET_TTL, "eventos")
+    return {"ticket": ticket, "expiraEm": EVENTOS_TICKET_TTL}
+
+
+@router.get("/stream", summary="Feed de alterações (Server-Sent Events)")
+async def stream_eventos(
+    entidades: Optional[str] = Query(None, description="Entidades de interesse, separadas por vírgula (padrão: todas)"),
+    ticket: Optional[str] = Query(None, description="Ticket de POST /eventos/ticket, para clientes que não enviam Authorization"),
+    authorization: Optional[str] = Header(default=None),
+) -> StreamingResponse:
+    if not CHANGE_FEED:
+        raise HTTPException(status_code=503, detail="Feed de alterações desativado")
+    ctx = await _contexto(authorization, ticket)
+    return StreamingResponse(
+        _sse(ctx.escritorio_id, _entidades(entidades)),
+        media_type="text/event-stream",
+        # X-Accel-Buffering: o NGINX repassa cada evento sem acumular
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/ws")
+async def ws_eventos(
+    websocket: WebSocket,
+    entidades: Optional[str] = Query(None),
+    ticket: Optional[str] = Query(None),
+) -> None:
+    if not CHANGE_FEED:
+        await websocket.close(code=1013)
+        return
+    try:
+        ctx = await _contexto(websocket.headers.get("authorization"), ticket)
+    except HTTPException:
+        await websocket.close(code=1008)
+        return
+    await websocket.accept()
+
+    async def enviar(sub: Subscription) -> None:
+        while True:
+            await websocket.send_text(orjson.dumps(await _next(sub)).decode())
+
+    with change_feed.subscribe(ctx.escritorio_id, _entidades(entidades)) as sub:
+        sender = asyncio.create_task(enviar(sub))
+        try:
+            # O cliente não envia nada; receber serve para notar o fechamento
+            while (await websocket.receive())["type"] != "websocket.disconnect":
+                pass
+        except WebSocketDisconnect:
+            pass
+        finally:
+            sender.cancel()
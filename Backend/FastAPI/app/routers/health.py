@@ -1,8 +1,30 @@
 from fastapi import APIRouter
+from ..audit import audit_writer
+from ..cache import cache
+from ..changefeed import change_feed
+from ..serialization import encoding_metrics
+from ..pool import pool_metrics
+from ..replicas import replica_status
+from ..singleflight import single_flight_metrics
 
 router = APIRouter()
 
 
 @router.get("/", summary="Verificar saúde")
 def health_check():
-    return {"status": "ok"}
\ No newline at end of file
+    return {"status": "ok"}
+
+
+@router.get("/metrics", summary="Métricas internas")
+def health_metrics():
+    # Espera de checkout/timeouts altos com checked_out no limite indicam banco saturado;
+    # latência alta com pool folgado aponta para a própria aplicação
+    return {
+        "audit": audit_writer.metrics(),
+        "db_pool": {name: metrics.snapshot() for name, metrics in pool_metrics.items()},
+        "replicas": replica_status(),
+        "cache": cache.metrics(),
+        "encoding": encoding_metrics.snapshot(),
+        "single_flight": single_flight_metrics.snapshot(),
+        "change_feed": change_feed.metrics(),
+    }
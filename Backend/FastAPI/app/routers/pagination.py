@@ -0,0 +1,176 @@
+from fastapi import HTTPException, Query, Response
+from typing import Any, Callable, Dict, List, Optional, Sequence, Type, TypeVar
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+import base64
+import inspect
+import json
+from pydantic import BaseModel
+from sqlalchemy import Select, and_, func, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 500
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+Filter = Callable[[Any], Any]
+M = TypeVar("M", bound=BaseModel)
+
+
+@dataclass
+class PageParams:
+    limit: int
+    cursor: Optional[str]
+    sort: Optional[str]
+
+
+def page_params(
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT, description="Quantidade máxima de registros por página"),
+    cursor: Optional[str] = Query(None, description=f"Cursor da próxima página (cabeçalho {NEXT_CURSOR_HEADER})"),
+    sort: Optional[str] = Query(None, description="Campo de ordenação; prefixo '-' para decrescente"),
+) -> PageParams:
+    return PageParams(limit=limit, cursor=cursor, sort=sort)
+
+
+def query_filters(model: Type[M]) -> Callable[..., M]:
+    """Dependência com cada campo de `model` como parâmetro de query próprio.
+
+    `Annotated[Modelo, Query()]` ao lado de outros parâmetros de query (page_params)
+    aparece no OpenAPI como um único objeto `filtros`, que /docs e clientes gerados
+    não conseguem enviar; assim cada filtro é documentado separadamente.
+    """
+    params = [
+        inspect.Parameter(
+            name,
+            inspect.Parameter.KEYWORD_ONLY,
+            default=Query(field.default, description=field.description),
+            annotation=field.annotation,
+        )
+        for name, field in model.model_fields.items()
+    ]
+
+    def dependency(**values: Any) -> M:
+        return model(**values)
+
+    dependency.__signature__ = inspect.Signature(params, return_annotation=model)  # type: ignore[attr-defined]
+    return dependency
+
+
+# Construtores de filtros whitelisted: nome do parâmetro -> cláusula SQL
+def eq(col: Any) -> Filter:
+    return lambda v: col == v
+
+
+def ieq(col: Any) -> Filter:
+    # Filtros passam por UppercaseModel; o valor gravado pode estar em qualquer caixa (ex.: username)
+    return lambda v: func.lower(col) == str(v).lower()
+
+
+def gte(col: Any) -> Filter:
+    return lambda v: col >= v
+
+
+def lte(col: Any) -> Filter:
+    return lambda v: col <= v
+
+
+def contains(col: Any) -> Filter:
+    return lambda v: col.ilike(f"%{v}%")
+
+
+def apply_filters(stmt: Select, filters: Dict[str, Filter], values: Dict[str, Any]) -> Select:
+    for name, value in values.items():
+        if value is None:
+            continue
+        if name not in filters:
+            raise HTTPException(status_code=400, detail=f"Filtro não suportado: {name}")
+        stmt = stmt.where(filters[name](value))
+    return stmt
+
+
+def _json_value(v: Any) -> Any:
+    if isinstance(v, (date, datetime)):
+        return v.isoformat()
+    if isinstance(v, Decimal):
+        return str(v)
+    return v
+
+
+def _python_value(col: Any, v: Any) -> Any:
+    if v is None:
+        return None
+    try:
+        py_type = col.type.python_type
+    except NotImplementedError:
+        return v
+    if py_type is datetime:
+        return datetime.fromisoformat(v)
+    if py_type is date:
+        return date.fromisoformat(v)
+    if py_type is Decimal:
+        return Decimal(v)
+    return v
+
+
+def encode_cursor(sort: str, value: Any, row_id: int) -> str:
+    raw = json.dumps([sort, _json_value(value), row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> List[Any]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        sort, value, row_id = json.loads(raw)
+        return [sort, value, int(row_id)]
+    except Exception:
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+
+
+async def paginate(
+    db: AsyncSession,
+    stmt: Select,
+    pk: Any,
+    page: PageParams,
+    response: Response,
+    sort_fields: Dict[str, Any],
+    default_sort: str = "id",
+) -> Sequence[Any]:
+    """Pagina `stmt` por keyset em (campo de ordenação, id).
+
+    O cursor da próxima página é enviado no cabeçalho X-Next-Cursor (ausente na
+    última página). Campos anuláveis são ordenados com NULLs por último.
+    """
+    sort = page.sort or default_sort
+    desc = sort.startswith("-")
+    key = sort.lstrip("-")
+    if key != "id" and key not in sort_fields:
+        raise HTTPException(status_code=400, detail=f"Ordenação não suportada: {key}")
+    col = pk if key == "id" else sort_fields[key]
+
+    if page.cursor:
+        cur_sort, value, last_id = decode_cursor(page.cursor)
+        if cur_sort != sort:
+            raise HTTPException(status_code=400, detail="Cursor não corresponde à ordenação")
+        after_id = pk < last_id if desc else pk > last_id
+        if col is pk:
+            stmt = stmt.where(after_id)
+        elif value is None:
+            stmt = stmt.where(col.is_(None), after_id)
+        else:
+            value = _python_value(col, value)
+            after_value = col < value if desc else col > value
+            stmt = stmt.where(or_(after_value, and_(col == value, after_id), col.is_(None)))
+
+    if col is pk:
+        stmt = stmt.order_by(pk.desc() if desc else pk.asc())
+    else:
+        stmt = stmt.order_by((col.desc() if desc else col.asc()).nulls_last(), pk.desc() if desc else pk.asc())
+
+    rows = (await db.scalars(stmt.limit(page.limit + 1))).all()
+    if len(rows) > page.limit:
+        rows = rows[:page.limit]
+        last = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(sort, getattr(last, col.key), last.id)
+    return rows
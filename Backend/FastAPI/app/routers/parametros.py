@@ -1,66 +1,94 @@
-from fastapi import APIRouter, HTTPException, Depends
-from typing import List, Dict
-from sqlalchemy.orm import Session
-from ..database import get_db
+from fastapi import APIRouter, HTTPException, Depends, Request, Response
+from typing import Annotated, List, Dict
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..database import get_async_db
+from ..versions import conditional
+from ..cache import cached_get, cached_page, list_key
+from ..serialization import json_list
 from ..models.parametro import Parametro
-from ..schemas.parametro import ParametroCreate, ParametroRead, ParametroUpdate
-from ..models.auditoria import Auditoria
-from .utils import upper_except_email, build_diff
+from ..schemas.parametro import ParametroCreate, ParametroRead, ParametroUpdate, ParametroFiltro
+from .utils import upper_except_email
+from .uow import UnitOfWork
+from ..permissions import require
+from .pagination import PageParams, page_params, query_filters, paginate, apply_filters, eq
 
 
 router = APIRouter()
 
+PARAMETRO_FILTERS = {
+    "chave": eq(Parametro.chave),
+    "chave_prefixo": lambda v: Parametro.chave.startswith(v, autoescape=True),
+}
+PARAMETRO_SORTS = {"chave": Parametro.chave}
 
-@router.get("/", response_model=List[ParametroRead], summary="Listar Parâmetros")
-def list_parametros(db: Session = Depends(get_db)) -> List[ParametroRead]:
-    return db.query(Parametro).all()
 
+@router.get("/", response_model=List[ParametroRead], summary="Listar Parâmetros", dependencies=[Depends(conditional("Parametros"))])
+async def list_parametros(
+    request: Request,
+    response: Response,
+    filtros: Annotated[ParametroFiltro, Depends(query_filters(ParametroFiltro))],
+    page: PageParams = Depends(page_params),
+    db: AsyncSession = Depends(get_async_db),
+) -> List[ParametroRead]:
+    async def load():
+        stmt = apply_filters(select(Parametro), PARAMETRO_FILTERS, filtros.model_dump())
+        return await paginate(db, stmt, Parametro.id, page, response, PARAMETRO_SORTS)
 
-@router.post("/", response_model=ParametroRead, summary="Criar/Atualizar Parâmetro por chave")
-def upsert_parametro(payload: ParametroCreate, db: Session = Depends(get_db)) -> ParametroRead:
+    items = await cached_page("Parametros", list_key(request.url.query), response, ParametroRead, load)
+    return json_list(ParametroRead, items, response)
+
+
+@router.get("/{row_id}", response_model=ParametroRead, summary="Obter Parâmetro", dependencies=[Depends(conditional("Parametros"))])
+async def get_parametro(row_id: int, db: AsyncSession = Depends(get_async_db)) -> ParametroRead:
+    async def load():
+        row = await db.get(Parametro, row_id)
+        if not row:
+            raise HTTPException(status_code=404, detail="Parâmetro não encontrado")
+        return row
+
+    return await cached_get("Parametros", row_id, ParametroRead, load)  # type: ignore
+
+
+@router.post("/", response_model=ParametroRead, summary="Criar/Atualizar Parâmetro por chave", dependencies=[Depends(require("PARAMETROS_WRITE"))])
+async def upsert_parametro(payload: ParametroCreate, db: AsyncSession = Depends(get_async_db)) -> ParametroRead:
     data = upper_except_email(payload.model_dump())
-    row = db.query(Parametro).filter(Parametro.chave == data["chave"]).first()
+    row = await db.scalar(select(Parametro).where(Parametro.chave == data["chave"]))
     if row:
         before = {"chave": row.chave, "valor": row.valor}
         row.valor = data.get("valor")
-        db.commit()
-        db.refresh(row)
-        db.add(Auditoria(entidade="Parametros", entidade_id=row.id, acao="update", quem="SYSTEM", diff=build_diff(before, data)))
-        db.commit()
+        uow = UnitOfWork(db, "Parametros")
+        uow.update(row, before, data)
+        await uow.commit()
         return row
-    row = Parametro(**data)
-    db.add(row)
-    db.commit()
-    db.refresh(row)
-    db.add(Auditoria(entidade="Parametros", entidade_id=row.id, acao="create", quem="SYSTEM", diff=build_diff(None, data)))
-    db.commit()
+    uow = UnitOfWork(db, "Parametros")
+    row = await uow.create(Parametro(**data), data)
+    await uow.commit()
     return row
 
 
-@router.put("/{row_id}", response_model=ParametroRead, summary="Atualizar Parâmetro")
-def update_parametro(row_id: int, payload: ParametroUpdate, db: Session = Depends(get_db)) -> ParametroRead:
-    row = db.get(Parametro, row_id)
+@router.put("/{row_id}", response_model=ParametroRead, summary="Atualizar Parâmetro", dependencies=[Depends(require("PARAMETROS_WRITE"))])
+async def update_parametro(row_id: int, payload: ParametroUpdate, db: AsyncSession = Depends(get_async_db)) -> ParametroRead:
+    row = await db.get(Parametro, row_id)
     if not row:
         raise HTTPException(status_code=404, detail="Parâmetro não encontrado")
     before = {"chave": row.chave, "valor": row.valor}
     data = upper_except_email(payload.model_dump(exclude_unset=True))
     for k, v in data.items():
         setattr(row, k, v)
-    db.commit()
-    db.refresh(row)
-    db.add(Auditoria(entidade="Parametros", entidade_id=row.id, acao="update", quem="SYSTEM", diff=build_diff(before, data)))
-    db.commit()
+    uow = UnitOfWork(db, "Parametros")
+    uow.update(row, before, data)
+    await uow.commit()
     return row
 
 
-@router.delete("/{row_id}", summary="Remover Parâmetro")
-def delete_parametro(row_id: int, db: Session = Depends(get_db)) -> Dict[str, str]:
-    row = db.get(Parametro, row_id)
+@router.delete("/{row_id}", summary="Remover Parâmetro", dependencies=[Depends(require("PARAMETROS_WRITE"))])
+async def delete_parametro(row_id: int, db: AsyncSession = Depends(get_async_db)) -> Dict[str, str]:
+    row = await db.get(Parametro, row_id)
     if not row:
         raise HTTPException(status_code=404, detail="Parâmetro não encontrado")
     before = {"chave": row.chave, "valor": row.valor}
-    db.delete(row)
-    db.commit()
-    db.add(Auditoria(entidade="Parametros", entidade_id=row_id, acao="delete", quem="SYSTEM", diff=build_diff(before, None)))
-    db.commit()
+    uow = UnitOfWork(db, "Parametros")
+    await uow.delete(row, before)
+    await uow.commit()
     return {"status": "deleted"}
\ No newline at end of file
@@ -1,57 +1,85 @@
-from fastapi import APIRouter, HTTPException, Depends
-from typing import List, Dict
-from sqlalchemy.orm import Session
-from ..database import get_db
+from fastapi import APIRouter, HTTPException, Depends, Request, Response
+from typing import Annotated, List, Dict
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..database import get_async_db
+from ..versions import conditional
+from ..cache import cached_get, cached_page, list_key
+from ..serialization import json_list
 from ..models.perfil import Perfil
-from ..schemas.perfil import PerfilCreate, PerfilRead, PerfilUpdate
-from ..models.auditoria import Auditoria
-from .utils import upper_except_email, build_diff
+from ..schemas.perfil import PerfilCreate, PerfilRead, PerfilUpdate, PerfilFiltro
+from .utils import upper_except_email
+from .uow import UnitOfWork
+from ..permissions import require
+from .pagination import PageParams, page_params, query_filters, paginate, apply_filters, contains
 
 
 router = APIRouter()
 
+PERFIL_FILTERS = {
+    "nome": contains(Perfil.nome),
+}
+PERFIL_SORTS = {"nome": Perfil.nome}
 
-@router.get("/", response_model=List[PerfilRead], summary="Listar Perfis")
-def list_perfis(db: Session = Depends(get_db)) -> List[PerfilRead]:
-    return db.query(Perfil).all()
 
+@router.get("/", response_model=List[PerfilRead], summary="Listar Perfis", dependencies=[Depends(conditional("Perfil"))])
+async def list_perfis(
+    request: Request,
+    response: Response,
+    filtros: Annotated[PerfilFiltro, Depends(query_filters(PerfilFiltro))],
+    page: PageParams = Depends(page_params),
+    db: AsyncSession = Depends(get_async_db),
+) -> List[PerfilRead]:
+    async def load():
+        stmt = apply_filters(select(Perfil), PERFIL_FILTERS, filtros.model_dump())
+        return await paginate(db, stmt, Perfil.id, page, response, PERFIL_SORTS)
 
-@router.post("/", response_model=PerfilRead, summary="Criar Perfil")
-def create_perfil(payload: PerfilCreate, db: Session = Depends(get_db)) -> PerfilRead:
+    items = await cached_page("Perfil", list_key(request.url.query), response, PerfilRead, load)
+    return json_list(PerfilRead, items, response)
+
+
+@router.get("/{row_id}", response_model=PerfilRead, summary="Obter Perfil", dependencies=[Depends(conditional("Perfil"))])
+async def get_perfil(row_id: int, db: AsyncSession = Depends(get_async_db)) -> PerfilRead:
+    async def load():
+        row = await db.get(Perfil, row_id)
+        if not row:
+            raise HTTPException(status_code=404, detail="Perfil não encontrado")
+        return row
+
+    return await cached_get("Perfil", row_id, PerfilRead, load)  # type: ignore
+
+
+@router.post("/", response_model=PerfilRead, summary="Criar Perfil", dependencies=[Depends(require("PERFIL_WRITE"))])
+async def create_perfil(payload: PerfilCreate, db: AsyncSession = Depends(get_async_db)) -> PerfilRead:
     data = upper_except_email(payload.model_dump())
-    row = Perfil(**data)
-    db.add(row)
-    db.commit()
-    db.refresh(row)
-    db.add(Auditoria(entidade="Perfil", entidade_id=row.id, acao="create", quem="SYSTEM", diff=build_diff(None, data)))
-    db.commit()
+    uow = UnitOfWork(db, "Perfil")
+    row = await uow.create(Perfil(**data), data)
+    await uow.commit()
     return row
 
 
-@router.put("/{row_id}", response_model=PerfilRead, summary="Atualizar Perfil")
-def update_perfil(row_id: int, payload: PerfilUpdate, db: Session = Depends(get_db)) -> PerfilRead:
-    row = db.get(Perfil, row_id)
+@router.put("/{row_id}", response_model=PerfilRead, summary="Atualizar Perfil", dependencies=[Depends(require("PERFIL_WRITE"))])
+async def update_perfil(row_id: int, payload: PerfilUpdate, db: AsyncSession = Depends(get_async_db)) -> PerfilRead:
+    row = await db.get(Perfil, row_id)
     if not row:
         raise HTTPException(status_code=404, detail="Perfil não encontrado")
-    before = {"nome": row.nome, "descricao": row.descricao}
+    before = {"nome": row.nome, "descricao": row.descricao, "permissoes": row.permissoes}
     data = upper_except_email(payload.model_dump(exclude_unset=True))
     for k, v in data.items():
         setattr(row, k, v)
-    db.commit()
-    db.refresh(row)
-    db.add(Auditoria(entidade="Perfil", entidade_id=row.id, acao="update", quem="SYSTEM", diff=build_diff(before, data)))
-    db.commit()
+    uow = UnitOfWork(db, "Perfil")
+    uow.update(row, before, data)
+    await uow.commit()
     return row
 
 
-@router.delete("/{row_id}", summary="Remover Perfil")
-def delete_perfil(row_id: int, db: Session = Depends(get_db)) -> Dict[str, str]:
-    row = db.get(Perfil, row_id)
+@router.delete("/{row_id}", summary="Remover Perfil", dependencies=[Depends(require("PERFIL_WRITE"))])
+async def delete_perfil(row_id: int, db: AsyncSession = Depends(get_async_db)) -> Dict[str, str]:
+    row = await db.get(Perfil, row_id)
     if not row:
         raise HTTPException(status_code=404, detail="Perfil não encontrado")
-    before = {"nome": row.nome, "descricao": row.descricao}
-    db.delete(row)
-    db.commit()
-    db.add(Auditoria(entidade="Perfil", entidade_id=row_id, acao="delete", quem="SYSTEM", diff=build_diff(before, None)))
-    db.commit()
+    before = {"nome": row.nome, "descricao": row.descricao, "permissoes": row.permissoes}
+    uow = UnitOfWork(db, "Perfil")
+    await uow.delete(row, before)
+    await uow.commit()
     return {"status": "deleted"}
\ No newline at end of file
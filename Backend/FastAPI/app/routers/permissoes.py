@@ -1,57 +1,85 @@
-from fastapi import APIRouter, HTTPException, Depends
-from typing import List, Dict
-from sqlalchemy.orm import Session
-from ..database import get_db
+from fastapi import APIRouter, HTTPException, Depends, Request, Response
+from typing import Annotated, List, Dict
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..database import get_async_db
+from ..versions import conditional
+from ..cache import cached_get, cached_page, list_key
+from ..serialization import json_list
 from ..models.permissao import Permissao
-from ..schemas.permissao import PermissaoCreate, PermissaoRead, PermissaoUpdate
-from ..models.auditoria import Auditoria
-from .utils import upper_except_email, build_diff
+from ..schemas.permissao import PermissaoCreate, PermissaoRead, PermissaoUpdate, PermissaoFiltro
+from .utils import upper_except_email
+from .uow import UnitOfWork
+from ..permissions import require
+from .pagination import PageParams, page_params, query_filters, paginate, apply_filters, contains
 
 
 router = APIRouter()
 
+PERMISSAO_FILTERS = {
+    "nome": contains(Permissao.nome),
+}
+PERMISSAO_SORTS = {"nome": Permissao.nome}
 
-@router.get("/", response_model=List[PermissaoRead], summary="Listar Permissões")
-def list_permissoes(db: Session = Depends(get_db)) -> List[PermissaoRead]:
-    return db.query(Permissao).all()
 
+@router.get("/", response_model=List[PermissaoRead], summary="Listar Permissões", dependencies=[Depends(conditional("Permissoes"))])
+async def list_permissoes(
+    request: Request,
+    response: Response,
+    filtros: Annotated[PermissaoFiltro, Depends(query_filters(PermissaoFiltro))],
+    page: PageParams = Depends(page_params),
+    db: AsyncSession = Depends(get_async_db),
+) -> List[PermissaoRead]:
+    async def load():
+        stmt = apply_filters(select(Permissao), PERMISSAO_FILTERS, filtros.model_dump())
+        return await paginate(db, stmt, Permissao.id, page, response, PERMISSAO_SORTS)
 
-@router.post("/", response_model=PermissaoRead, summary="Criar Permissão")
-def create_permissao(payload: PermissaoCreate, db: Session = Depends(get_db)) -> PermissaoRead:
+    items = await cached_page("Permissoes", list_key(request.url.query), response, PermissaoRead, load)
+    return json_list(PermissaoRead, items, response)
+
+
+@router.get("/{row_id}", response_model=PermissaoRead, summary="Obter Permissão", dependencies=[Depends(conditional("Permissoes"))])
+async def get_permissao(row_id: int, db: AsyncSession = Depends(get_async_db)) -> PermissaoRead:
+    async def load():
+        row = await db.get(Permissao, row_id)
+        if not row:
+            raise HTTPException(status_code=404, detail="Permissão não encontrada")
+        return row
+
+    return await cached_get("Permissoes", row_id, PermissaoRead, load)  # type: ignore
+
+
+@router.post("/", response_model=PermissaoRead, summary="Criar Permissão", dependencies=[Depends(require("PERMISSOES_WRITE"))])
+async def create_permissao(payload: PermissaoCreate, db: AsyncSession = Depends(get_async_db)) -> PermissaoRead:
     data = upper_except_email(payload.model_dump())
-    row = Permissao(**data)
-    db.add(row)
-    db.commit()
-    db.refresh(row)
-    db.add(Auditoria(entidade="Permissoes", entidade_id=row.id, acao="create", quem="SYSTEM", diff=build_diff(None, data)))
-    db.commit()
+    uow = UnitOfWork(db, "Permissoes")
+    row = await uow.create(Permissao(**data), data)
+    await uow.commit()
     return row
 
 
-@router.put("/{row_id}", response_model=PermissaoRead, summary="Atualizar Permissão")
-def update_permissao(row_id: int, payload: PermissaoUpdate, db: Session = Depends(get_db)) -> PermissaoRead:
-    row = db.get(Permissao, row_id)
+@router.put("/{row_id}", response_model=PermissaoRead, summary="Atualizar Permissão", dependencies=[Depends(require("PERMISSOES_WRITE"))])
+async def update_permissao(row_id: int, payload: PermissaoUpdate, db: AsyncSession = Depends(get_async_db)) -> PermissaoRead:
+    row = await db.get(Permissao, row_id)
     if not row:
         raise HTTPException(status_code=404, detail="Permissão não encontrada")
     before = {"nome": row.nome, "descricao": row.descricao}
     data = upper_except_email(payload.model_dump(exclude_unset=True))
     for k, v in data.items():
         setattr(row, k, v)
-    db.commit()
-    db.refresh(row)
-    db.add(Auditoria(entidade="Permissoes", entidade_id=row.id, acao="update", quem="SYSTEM", diff=build_diff(before, data)))
-    db.commit()
+    uow = UnitOfWork(db, "Permissoes")
+    uow.update(row, before, data)
+    await uow.commit()
     return row
 
 
-@router.delete("/{row_id}", summary="Remover Permissão")
-def delete_permissao(row_id: int, db: Session = Depends(get_db)) -> Dict[str, str]:
-    row = db.get(Permissao, row_id)
+@router.delete("/{row_id}", summary="Remover Permissão", dependencies=[Depends(require("PERMISSOES_WRITE"))])
+async def delete_permissao(row_id: int, db: AsyncSession = Depends(get_async_db)) -> Dict[str, str]:
+    row = await db.get(Permissao, row_id)
     if not row:
         raise HTTPException(status_code=404, detail="Permissão não encontrada")
     before = {"nome": row.nome, "descricao": row.descricao}
-    db.delete(row)
-    db.commit()
-    db.add(Auditoria(entidade="Permissoes", entidade_id=row_id, acao="delete", quem="SYSTEM", diff=build_diff(before, None)))
-    db.commit()
+    uow = UnitOfWork(db, "Permissoes")
+    await uow.delete(row, before)
+    await uow.commit()
     return {"status": "deleted"}
\ No newline at end of file
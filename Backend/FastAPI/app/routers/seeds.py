@@ -1,7 +1,11 @@
 from fastapi import APIRouter, Depends
+from anyio import from_thread
 from sqlalchemy.orm import Session
 from typing import Dict, List
 from ..database import get_db
+from ..cache import cache
+from ..versions import bump_statement
+from ..changefeed import notify_statement
 from ..models.especialidade import Especialidade
 from ..models.escritorio import Escritorio
 from ..models.advogado import Advogado
@@ -307,6 +311,13 @@ def seed_demo(db: Session = Depends(get_db)) -> Dict[str, object]:
         {"nome": "PERFIL_WRITE", "descricao": "CRIAR/EDITAR PERFIS"},
         {"nome": "PERMISSOES_READ", "descricao": "LISTAR PERMISSÕES"},
         {"nome": "PERMISSOES_WRITE", "descricao": "CRIAR/EDITAR PERMISSÕES"},
+        {"nome": "ESCRITORIOS_WRITE", "descricao": "CRIAR/EDITAR ESCRITÓRIOS"},
+        {"nome": "ADVOGADOS_WRITE", "descricao": "CRIAR/EDITAR ADVOGADOS"},
+        {"nome": "CLIENTES_WRITE", "descricao": "CRIAR/EDITAR CLIENTES"},
+        {"nome": "CAUSAS_READ", "descricao": "EXPORTAR CAUSAS E PROCESSOS"},
+        {"nome": "CAUSAS_WRITE", "descricao": "CRIAR/EDITAR CAUSAS E PROCESSOS"},
+        {"nome": "ESPECIALIDADES_WRITE", "descricao": "CRIAR/EDITAR ESPECIALIDADES"},
+        {"nome": "PARAMETROS_WRITE", "descricao": "CRIAR/EDITAR PARÂMETROS"},
     ]
     for pm in permissoes_data:
         row = _get_or_create_permissao(db, pm)
@@ -332,4 +343,9 @@ def seed_demo(db: Session = Depends(get_db)) -> Dict[str, object]:
             db.add(UsuarioEscritorio(usuario_id=u.id, escritorio_id=eid))
             db.commit()
 
+    # O seed grava fora da UnitOfWork: avança as versões (ETags) e derruba o cache
+    db.execute(bump_statement(["Especialidades", "Escritorios", "Advogados", "Clientes", "CausasProcessos", "Perfil", "Permissoes", "Usuarios"]))
+    db.execute(notify_statement([{"tipo": "resync", "escritorios": []}]))
+    db.commit()
+    from_thread.run(cache.invalidate_all)
     return {"status": "OK", "created": created}
\ No newline at end of file
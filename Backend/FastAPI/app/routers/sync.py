@@ -0,0 +1,180 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Any, Callable, Dict, List, Optional, Sequence
+from dataclasses import dataclass, field
+import base64
+import json
+import time
+from sqlalchemy import ColumnElement, Select, exists, func, or_, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from ..database import get_async_db
+from ..serialization import json_response
+from ..models.advogado import Advogado
+from ..models.advogado_escritorio import AdvogadoEscritorio
+from ..models.causas_processos import CausaProcesso
+from ..models.cliente import Cliente
+from ..models.sync_remocao import SyncRemocao
+from ..partitions import SYNC_RETENTION_DAYS
+from ..schemas.causas_processos import CausaProcessoRead
+from ..schemas.cliente import ClienteRead
+from .advogados import _advogado_out
+from .auth import auth_context
+from ..security import AuthContext
+
+
+router = APIRouter()
+
+SYNC_LIMIT = 1000
+SYNC_MAX_LIMIT = 5000
+# Cursor mais velho que a retenção dos tombstones perderia remoções: 410 e sincronização do zero.
+# A folga cobre transações longas, cujo removido_em (início da transação) antecede o cursor
+SYNC_CURSOR_MAX_AGE = SYNC_RETENTION_DAYS * 86400 - 3600
+
+
+@dataclass
+class SyncEntidade:
+    entidade: str
+    model: Any
+    saida: Callable[[Any], Dict[str, Any]]
+    opcoes: Sequence[Any] = field(default_factory=tuple)
+    # Filtro das linhas do escritório do usuário; None: visível a todos
+    escopo: Optional[Callable[[int], ColumnElement[bool]]] = None
+
+
+ENTIDADES = [
+    # Clientes não têm escritório (nem coluna nem vínculo): a cópia local é a mesma para todos
+    SyncEntidade("Clientes", Cliente, lambda r: ClienteRead.model_validate(r).model_dump(mode="json")),
+    SyncEntidade(
+        "Advogados", Advogado, _advogado_out, (selectinload(Advogado.escritorios),),
+        escopo=lambda e: Advogado.escritorio_links.any(AdvogadoEscritorio.escritorio_id == e),
+    ),
+    SyncEntidade(
+        "CausasProcessos", CausaProcesso, lambda r: CausaProcessoRead.model_validate(r).model_dump(mode="json"),
+        escopo=lambda e: CausaProcesso.escritorio_id == e,
+    ),
+]
+SYNC_ENTIDADES = {e.entidade: e for e in ENTIDADES}
+
+
+def _encode(estado: Dict[str, Any]) -> str:
+    raw = json.dumps(estado, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode(cursor: str) -> Dict[str, Any]:
+    try:
+        estado = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        x, emitido = int(estado["x"]), float(estado.get("t", 0))
+    except Exception:
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+    if x and time.time() - emitido > SYNC_CURSOR_MAX_AGE:
+        raise HTTPException(status_code=410, detail="Cursor expirado: sincronize do zero (sem since)")
+    return estado
+
+
+def _selecionadas(entidades: Optional[str]) -> List[SyncEntidade]:
+    nomes = [e.strip() for e in (entidades or "").split(",") if e.strip()]
+    desconhecidas = [n for n in nomes if n not in SYNC_ENTIDADES]
+    if desconhecidas:
+        raise HTTPException(status_code=400, detail=f"Entidade não sincronizável: {', '.join(desconhecidas)}")
+    # Ordem fixa: o cursor de página aponta para a posição nesta lista
+    return [e for e in ENTIDADES if not nomes or e.entidade in nomes]
+
+
+def _escritorio(ctx: Optional[AuthContext]) -> Optional[int]:
+    return ctx.escritorio_id if ctx and ctx.escritorio_id else None
+
+
+def _removidos(spec: SyncEntidade, x: int, snapshot: str, ultimo: int, ctx: Optional[AuthContext]) -> Select:
+    m = spec.model
+    r = SyncRemocao
+    atual = select(m.id).where(m.id == r.entidade_id)
+    stmt = select(r.id, r.entidade_id).where(
+        r.entidade == spec.entidade, r.versao >= x, func.sync_visivel(r.versao, snapshot), r.id > ultimo,
+    )
+    escritorio_id = _escritorio(ctx) if spec.escopo else None
+    if escritorio_id:
+        # Sem escritório registrado (ex.: advogado excluído) a remoção vale para todos
+        stmt = stmt.where(or_(r.escritorio_id == escritorio_id, r.escritorio_id.is_(None)))
+        atual = atual.where(spec.escopo(escritorio_id))
+    # Removida e depois devolvida ao escopo (ex.: causa que voltou ao escritório) continua na cópia local
+    return stmt.where(~exists(atual)).order_by(r.id)
+
+
+def _alterados(spec: SyncEntidade, x: int, snapshot: str, ultimo: int, ctx: Optional[AuthContext]) -> Select:
+    m = spec.model
+    stmt = select(m).options(*spec.opcoes).where(m.versao >= x, func.sync_visivel(m.versao, snapshot), m.id > ultimo)
+    escritorio_id = _escritorio(ctx) if spec.escopo else None
+    if escritorio_id:
+        stmt = stmt.where(spec.escopo(escritorio_id))
+    return stmt.order_by(m.id)
+
+
+@router.get("/", response_model=None, summary="Sincronização incremental (alterados e removidos desde o cursor)")
+async def sync(
+    since: Optional[str] = Query(None, description="Cursor devolvido pela chamada anterior; vazio baixa tudo"),
+    entidades: Optional[str] = Query(None, description="Clientes, Advogados e/ou CausasProcessos, separadas por vírgula (padrão: todas)"),
+    limite: int = Query(SYNC_LIMIT, ge=1, le=SYNC_MAX_LIMIT, description="Máximo de registros (alterados + removidos) por página"),
+    ctx: Optional[AuthContext] = Depends(auth_context),
+    # Primário: as páginas de uma rodada usam o mesmo snapshot, que uma réplica atrasada não enxergaria inteiro
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Devolve, por entidade, os registros gravados e os ids removidos desde `since`.
+
+    Cada rodada fixa um snapshot (pg_current_snapshot) na primeira página e
+    percorre cada entidade em duas fases por id: removidos (tombstones) e depois
+    alterados. Com `completo` falso há mais páginas: repetir com o cursor
+    devolvido. O cursor final marca o xmin do snapshot; transações que ainda não
+    tinham terminado entram na rodada seguinte, então um registro pode vir
+    repetido, mas nenhum se perde. Aplicar os removidos antes dos alterados.
+    Advogados e causas vêm restritos ao escritório do usuário; clientes, que
+    não têm escritório, vêm todos. Um cursor mais velho que a retenção dos
+    tombstones (SYNC_RETENTION_DAYS) volta 410: sincronizar do zero.
+    """
+    selecionadas = _selecionadas(entidades)
+    estado = _decode(since) if since else {"x": 0}
+    if "s" not in estado:
+        snapshot, xmin = (await db.execute(
+            text("SELECT pg_current_snapshot()::text, pg_snapshot_xmin(pg_current_snapshot())::text::bigint")
+        )).one()
+        # "r": início da rodada, que vira a idade do cursor final
+        estado = {
+            "x": int(estado["x"]), "t": estado.get("t", 0), "s": snapshot, "m": xmin, "r": int(time.time()),
+            "e": selecionadas[0].entidade, "f": "d", "i": 0,
+        }
+    nomes = [e.entidade for e in selecionadas]
+    if estado["e"] not in nomes or estado["f"] not in ("d", "u"):
+        raise HTTPException(status_code=400, detail="Cursor não corresponde às entidades pedidas")
+
+    x, snapshot = int(estado["x"]), estado["s"]
+    saida = {e.entidade: {"alterados": [], "removidos": []} for e in selecionadas}
+    restante = limite
+    pos, fase, ultimo = nomes.index(estado["e"]), estado["f"], int(estado["i"])
+    while pos < len(selecionadas) and restante > 0:
+        spec = selecionadas[pos]
+        rows: Sequence[Any] = []
+        if fase == "d":
+            # Primeira rodada baixa tudo: não há cópia local de onde remover
+            if x:
+                rows = (await db.execute(_removidos(spec, x, snapshot, ultimo, ctx).limit(restante + 1))).all()
+            saida[spec.entidade]["removidos"] += [r.entidade_id for r in rows[:restante]]
+        else:
+            rows = (await db.scalars(_alterados(spec, x, snapshot, ultimo, ctx).limit(restante + 1))).all()
+            saida[spec.entidade]["alterados"] += [spec.saida(r) for r in rows[:restante]]
+        if len(rows) > restante:
+            ultimo = rows[restante - 1].id
+            restante = 0
+            break
+        restante -= len(rows)
+        if fase == "d":
+            fase = "u"
+        else:
+            pos, fase = pos + 1, "d"
+        ultimo = 0
+
+    completo = pos >= len(selecionadas)
+    if completo:
+        cursor = _encode({"x": estado["m"], "t": estado["r"]})
+    else:
+        cursor = _encode({**estado, "e": selecionadas[pos].entidade, "f": fase, "i": ultimo})
+    return json_response({"entidades": saida, "cursor": cursor, "completo": completo})
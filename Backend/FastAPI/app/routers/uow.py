@@ -0,0 +1,95 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional, TypeVar
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..audit import audit_writer
+from ..cache import cache
+from ..changefeed import change_event, notify_statement
+from ..models.auditoria import Auditoria
+from ..models.outbox import Outbox
+from ..permissions import invalidate_permissions
+from ..security import invalidate_auth
+from ..versions import bump_statement
+from .utils import build_diff
+
+
+T = TypeVar("T")
+
+
+class UnitOfWork:
+    """Agrupa a escrita da entidade, seus vínculos e a auditoria em um único commit.
+
+    O flush antecipa o id das linhas novas; o commit grava tudo de uma vez, de
+    modo que uma falha não deixa entidade sem o respectivo registro de auditoria.
+    Com o AuditWriter ativo, a auditoria é enfileirada após o commit e gravada
+    em lote pela task de fundo. Os eventos do outbox e a versão das entidades
+    (ETags) são sempre gravados na transação, para o relay publicar e os
+    clientes revalidarem somente alterações confirmadas. O NOTIFY do feed de
+    alterações também sai na transação: o Postgres só o entrega após o commit.
+    """
+
+    def __init__(self, db: AsyncSession, entidade: str, quem: str = "SYSTEM"):
+        self.db = db
+        self.entidade = entidade
+        self.quem = quem
+        self._auditoria: List[Dict[str, Any]] = []
+        self._outbox: List[Outbox] = []
+        self._eventos: List[Dict[str, Any]] = []
+
+    async def create(self, row: T, data: Dict[str, Any]) -> T:
+        self.db.add(row)
+        await self.db.flush()
+        self.record(row.id, "create", None, data)  # type: ignore[attr-defined]
+        return row
+
+    def update(self, row: Any, before: Dict[str, Any], data: Dict[str, Any]) -> None:
+        if build_diff(before, data):
+            self.record(row.id, "update", before, data)
+
+    async def delete(self, row: Any, before: Dict[str, Any]) -> None:
+        await self.db.delete(row)
+        self.record(row.id, "delete", before, None)
+
+    def record(
+        self,
+        entidade_id: int,
+        acao: str,
+        before: Optional[Dict[str, Any]],
+        after: Optional[Dict[str, Any]],
+        entidade: Optional[str] = None,
+    ) -> None:
+        alteracoes = build_diff(before, after)
+        self._auditoria.append({
+            "entidade": entidade or self.entidade,
+            "entidade_id": entidade_id,
+            "acao": acao,
+            "quem": self.quem,
+            "quando": datetime.utcnow(),
+            "alteracoes": alteracoes,
+        })
+        self._outbox.append(Outbox(entidade=entidade or self.entidade, entidade_id=entidade_id, acao=acao, alteracoes=alteracoes))
+        self._eventos.append(change_event(entidade or self.entidade, entidade_id, acao, before, after))
+
+    async def commit(self) -> None:
+        background = audit_writer.running
+        self.db.add_all(self._outbox)
+        if not background:
+            self.db.add_all([Auditoria(**a) for a in self._auditoria])
+        try:
+            if self._eventos:
+                await self.db.execute(notify_statement(self._eventos))
+            if self._auditoria:
+                # Por último: a linha de versão fica travada só até o commit
+                await self.db.execute(bump_statement(a["entidade"] for a in self._auditoria))
+            await self.db.commit()
+        except Exception:
+            await self.db.rollback()
+            raise
+        for a in self._auditoria:
+            invalidate_auth(a["entidade"], a["entidade_id"])
+            invalidate_permissions(a["entidade"])
+            await cache.invalidate(a["entidade"], a["entidade_id"])
+        if background:
+            await audit_writer.enqueue(self._auditoria)
+        self._auditoria = []
+        self._outbox = []
+        self._eventos = []
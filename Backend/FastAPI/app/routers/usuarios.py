@@ -1,30 +1,45 @@
-from fastapi import APIRouter, HTTPException, Depends
-from typing import List, Dict
-from sqlalchemy.orm import Session
-from ..database import get_db
+from fastapi import APIRouter, HTTPException, Depends, Response
+from typing import Annotated, List, Dict
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from ..database import get_async_db
+from ..replicas import get_read_db
+from ..serialization import json_list
+from ..versions import conditional
 from ..models.usuario import Usuario
-from ..models.advogado_escritorio import AdvogadoEscritorio
-from ..models.escritorio import Escritorio
-from ..schemas.usuario import UsuarioCreate, UsuarioRead, UsuarioUpdate
-from ..models.auditoria import Auditoria
-from .utils import upper_except_email, build_diff
+from ..models.advogado import Advogado
+from ..models.usuario_escritorio import UsuarioEscritorio
+from ..schemas.usuario import UsuarioCreate, UsuarioRead, UsuarioUpdate, UsuarioFiltro
+from .utils import upper_except_email
+from .uow import UnitOfWork
+from ..permissions import require
+from .pagination import PageParams, page_params, query_filters, paginate, apply_filters, eq, ieq
 
 
 router = APIRouter()
 
+USUARIO_FILTERS = {
+    "username": ieq(Usuario.username),
+    "role": eq(Usuario.role),
+    "advogado_id": eq(Usuario.advogado_id),
+    "escritorio_id": lambda v: Usuario.escritorio_links.any(UsuarioEscritorio.escritorio_id == v),
+}
+USUARIO_SORTS = {"username": Usuario.username, "nome": Usuario.nome}
 
-@router.get("/", response_model=List[UsuarioRead], summary="Listar Usuários")
-def list_usuarios(db: Session = Depends(get_db)) -> List[UsuarioRead]:
-    rows = db.query(Usuario).all()
+
+@router.get("/", response_model=List[UsuarioRead], summary="Listar Usuários", dependencies=[Depends(conditional("Usuarios", "Advogados", "Escritorios"))])
+async def list_usuarios(
+    response: Response,
+    filtros: Annotated[UsuarioFiltro, Depends(query_filters(UsuarioFiltro))],
+    page: PageParams = Depends(page_params),
+    db: AsyncSession = Depends(get_read_db),
+) -> List[UsuarioRead]:
+    stmt = apply_filters(select(Usuario).options(selectinload(Usuario.advogado).selectinload(Advogado.escritorios)), USUARIO_FILTERS, filtros.model_dump())
+    rows = await paginate(db, stmt, Usuario.id, page, response, USUARIO_SORTS)
     result: List[UsuarioRead] = []  # type: ignore
     for r in rows:
-        nomes = None
-        if r.advogado_id:
-            links = db.query(AdvogadoEscritorio).filter(AdvogadoEscritorio.advogado_id == r.advogado_id).all()
-            ids = [lk.escritorio_id for lk in links]
-            if ids:
-                offices = db.query(Escritorio).filter(Escritorio.id.in_(ids)).all()
-                nomes = ", ".join([o.nome for o in offices]) if offices else None
+        offices = r.advogado.escritorios if r.advogado else []
         result.append({
             "id": r.id,
             "username": r.username,
@@ -33,15 +48,16 @@ def list_usuarios(db: Session = Depends(get_db)) -> List[UsuarioRead]:
             "role": r.role,
             "permissoes": r.permissoes,
             "advogado_id": r.advogado_id,
-            "escritorios": nomes,
+            "escritorios": ", ".join([o.nome for o in offices]) if offices else None,
         })  # type: ignore
-    return result
+    return json_list(UsuarioRead, result, response)  # type: ignore
 
 
-@router.post("/", response_model=UsuarioRead, summary="Criar Usuário")
-def create_usuario(payload: UsuarioCreate, db: Session = Depends(get_db)) -> UsuarioRead:
+@router.post("/", response_model=UsuarioRead, summary="Criar Usuário", dependencies=[Depends(require("USUARIOS_WRITE"))])
+async def create_usuario(payload: UsuarioCreate, db: AsyncSession = Depends(get_async_db)) -> UsuarioRead:
     data = upper_except_email(payload.model_dump())
-    row = Usuario(
+    uow = UnitOfWork(db, "Usuarios")
+    row = await uow.create(Usuario(
         username=data.get("username"),
         nome=data.get("nome"),
         email=data.get("email"),
@@ -49,18 +65,14 @@ def create_usuario(payload: UsuarioCreate, db: Session = Depends(get_db)) -> Usu
         permissoes=data.get("permissoes"),
         senha_hash=data.get("senha"),
         advogado_id=data.get("advogado_id"),
-    )
-    db.add(row)
-    db.commit()
-    db.refresh(row)
-    db.add(Auditoria(entidade="Usuarios", entidade_id=row.id, acao="create", quem="SYSTEM", diff=build_diff(None, data)))
-    db.commit()
+    ), data)
+    await uow.commit()
     return row
 
 
-@router.put("/{row_id}", response_model=UsuarioRead, summary="Atualizar Usuário")
-def update_usuario(row_id: int, payload: UsuarioUpdate, db: Session = Depends(get_db)) -> UsuarioRead:
-    row = db.get(Usuario, row_id)
+@router.put("/{row_id}", response_model=UsuarioRead, summary="Atualizar Usuário", dependencies=[Depends(require("USUARIOS_WRITE"))])
+async def update_usuario(row_id: int, payload: UsuarioUpdate, db: AsyncSession = Depends(get_async_db)) -> UsuarioRead:
+    row = await db.get(Usuario, row_id)
     if not row:
         raise HTTPException(status_code=404, detail="Usuário não encontrado")
     before = {
@@ -75,16 +87,15 @@ def update_usuario(row_id: int, payload: UsuarioUpdate, db: Session = Depends(ge
         row.senha_hash = data.pop("senha")
     for k, v in data.items():
         setattr(row, k, v)
-    db.commit()
-    db.refresh(row)
-    db.add(Auditoria(entidade="Usuarios", entidade_id=row.id, acao="update", quem="SYSTEM", diff=build_diff(before, data)))
-    db.commit()
+    uow = UnitOfWork(db, "Usuarios")
+    uow.update(row, before, data)
+    await uow.commit()
     return row
 
 
-@router.delete("/{row_id}", summary="Remover Usuário")
-def delete_usuario(row_id: int, db: Session = Depends(get_db)) -> Dict[str, str]:
-    row = db.get(Usuario, row_id)
+@router.delete("/{row_id}", summary="Remover Usuário", dependencies=[Depends(require("USUARIOS_WRITE"))])
+async def delete_usuario(row_id: int, db: AsyncSession = Depends(get_async_db)) -> Dict[str, str]:
+    row = await db.get(Usuario, row_id)
     if not row:
         raise HTTPException(status_code=404, detail="Usuário não encontrado")
     before = {
@@ -94,8 +105,7 @@ def delete_usuario(row_id: int, db: Session = Depends(get_db)) -> Dict[str, str]
         "role": row.role,
         "permissoes": row.permissoes,
     }
-    db.delete(row)
-    db.commit()
-    db.add(Auditoria(entidade="Usuarios", entidade_id=row_id, acao="delete", quem="SYSTEM", diff=build_diff(before, None)))
-    db.commit()
+    uow = UnitOfWork(db, "Usuarios")
+    await uow.delete(row, before)
+    await uow.commit()
     return {"status": "deleted"}
\ No newline at end of file
@@ -1,16 +1,51 @@
 from typing import Dict, Any
-import json
+from datetime import date, datetime
+from decimal import Decimal
+from ..schemas.common import PRESERVE_CASE
+
+
+# Campos cujo valor nunca vai para auditoria nem outbox: só se registra que mudaram
+CAMPOS_SENSIVEIS = frozenset({"senha", "senha_hash"})
+MASCARA = "***"
 
 
 def upper_except_email(data: Dict[str, Any]) -> Dict[str, Any]:
     out: Dict[str, Any] = {}
     for k, v in data.items():
-        if isinstance(v, str) and k.lower() != 'email':
+        if isinstance(v, str) and k.lower() not in PRESERVE_CASE:
             out[k] = v.upper()
         else:
             out[k] = v
     return out
 
 
-def build_diff(before: Dict[str, Any] | None, after: Dict[str, Any] | None) -> str:
-    return json.dumps({"before": before or {}, "after": after or {}}, ensure_ascii=False)
\ No newline at end of file
+def mask_sensitive(data: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: (MASCARA if k in CAMPOS_SENSIVEIS and v is not None else v) for k, v in data.items()}
+
+
+def json_safe(v: Any) -> Any:
+    if isinstance(v, (date, datetime)):
+        return v.isoformat()
+    if isinstance(v, Decimal):
+        return float(v)
+    if isinstance(v, (list, tuple, set)):
+        return [json_safe(x) for x in v]
+    if isinstance(v, dict):
+        return {k: json_safe(x) for k, x in v.items()}
+    return v
+
+
+def build_diff(before: Dict[str, Any] | None, after: Dict[str, Any] | None) -> Dict[str, Dict[str, Any]]:
+    """Alterações campo a campo: {campo: {"antes": ..., "depois": ...}}.
+
+    Em update, `after` traz só os campos enviados; campos sem mudança ficam de fora.
+    Em create/delete, campos nulos são omitidos. Valores de CAMPOS_SENSIVEIS
+    viram MASCARA: a troca de senha fica registrada, a senha não.
+    """
+    before = {k: json_safe(v) for k, v in mask_sensitive(before or {}).items()}
+    after = {k: json_safe(v) for k, v in mask_sensitive(after or {}).items()}
+    if not before:
+        return {k: {"antes": None, "depois": v} for k, v in after.items() if v is not None}
+    if not after:
+        return {k: {"antes": v, "depois": None} for k, v in before.items() if v is not None}
+    return {k: {"antes": before.get(k), "depois": v} for k, v in after.items() if before.get(k) != v}
@@ -29,4 +29,11 @@ class AdvogadoUpdate(UppercaseModel):
     email: Optional[str] = None
     telefone: Optional[str] = None
     especialidade_id: Optional[int] = None
-    escritorios_ids: Optional[List[int]] = None
\ No newline at end of file
+    escritorios_ids: Optional[List[int]] = None
+
+
+class AdvogadoFiltro(UppercaseModel):
+    nome: Optional[str] = None
+    oab: Optional[str] = None
+    especialidade_id: Optional[int] = None
+    escritorio_id: Optional[int] = None
\ No newline at end of file
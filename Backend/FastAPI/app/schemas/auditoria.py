@@ -1,5 +1,5 @@
 from pydantic import BaseModel, ConfigDict
-from typing import Optional
+from typing import Any, Dict, Optional
 from datetime import datetime
 
 
@@ -9,9 +9,19 @@ class AuditoriaCreate(BaseModel):
     acao: str
     quem: str
     quando: Optional[datetime] = None
+    alteracoes: Optional[Dict[str, Any]] = None
     diff: Optional[str] = None
 
 
 class AuditoriaRead(AuditoriaCreate):
     id: int
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+class AuditoriaFiltro(BaseModel):
+    entidade: Optional[str] = None
+    entidade_id: Optional[int] = None
+    acao: Optional[str] = None
+    quem: Optional[str] = None
+    campo: Optional[str] = None
+    quando_de: Optional[datetime] = None
+    quando_ate: Optional[datetime] = None
@@ -0,0 +1,14 @@
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
+from ..batch import BATCH_MAX_REQUISICOES
+
+
+# Caminhos e cabeçalhos passam como vieram: nada de UppercaseModel aqui
+class BatchItem(BaseModel):
+    id: Optional[str] = None
+    path: str
+    headers: Dict[str, str] = {}
+
+
+class BatchRequest(BaseModel):
+    requisicoes: List[BatchItem] = Field(min_length=1, max_length=BATCH_MAX_REQUISICOES)
\ No newline at end of file
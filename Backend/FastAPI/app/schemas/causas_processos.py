@@ -1,6 +1,6 @@
 from pydantic import BaseModel, ConfigDict
 from datetime import date
-from typing import Optional
+from typing import List, Literal, Optional
 from .common import UppercaseModel
 
 
@@ -34,4 +34,39 @@ class CausaProcessoUpdate(UppercaseModel):
     escritorio_id: Optional[int] = None
     especialidade_id: Optional[int] = None
     dataDistribuicao: Optional[str | date] = None
-    valor: Optional[float] = None
\ No newline at end of file
+    valor: Optional[float] = None
+
+
+class CausaProcessoFiltro(UppercaseModel):
+    status: Optional[str] = None
+    cliente_id: Optional[int] = None
+    advogado_id: Optional[int] = None
+    escritorio_id: Optional[int] = None
+    especialidade_id: Optional[int] = None
+    dataDistribuicao_de: Optional[date] = None
+    dataDistribuicao_ate: Optional[date] = None
+
+
+class CausaProcessoLoteFiltro(CausaProcessoFiltro):
+    ids: Optional[List[int]] = None
+
+
+class CausaProcessoLoteUpdate(UppercaseModel):
+    filtro: CausaProcessoLoteFiltro
+    patch: CausaProcessoUpdate
+    dry_run: bool = False
+
+
+class CausaProcessoLoteDelete(UppercaseModel):
+    filtro: CausaProcessoLoteFiltro
+    dry_run: bool = False
+
+
+class CausaResumoFiltro(UppercaseModel):
+    agrupar: List[Literal["escritorio_id", "status", "especialidade_id", "advogado_id", "mes"]] = []
+    escritorio_id: Optional[int] = None
+    status: Optional[str] = None
+    especialidade_id: Optional[int] = None
+    advogado_id: Optional[int] = None
+    mes_de: Optional[date] = None
+    mes_ate: Optional[date] = None
\ No newline at end of file
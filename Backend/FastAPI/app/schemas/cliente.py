@@ -23,4 +23,10 @@ class ClienteUpdate(UppercaseModel):
     nome: Optional[str] = None
     cpf_cnpj: Optional[str] = None
     email: Optional[str] = None
-    telefone: Optional[str] = None
\ No newline at end of file
+    telefone: Optional[str] = None
+
+
+class ClienteFiltro(UppercaseModel):
+    nome: Optional[str] = None
+    cpf_cnpj: Optional[str] = None
+    email: Optional[str] = None
\ No newline at end of file
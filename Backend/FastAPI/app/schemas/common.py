@@ -2,10 +2,14 @@ from pydantic import BaseModel, field_validator
 from typing import Any
 
 
+# Campos gravados como enviados: e-mail e permissões (JSON com true/false)
+PRESERVE_CASE = {'email', 'permissoes'}
+
+
 class UppercaseModel(BaseModel):
     @field_validator('*', mode='before')
     @classmethod
     def uppercase_strings(cls, v: Any, info):
-        if isinstance(v, str) and info.field_name.lower() != 'email':
+        if isinstance(v, str) and info.field_name.lower() not in PRESERVE_CASE:
             return v.upper()
         return v
\ No newline at end of file
@@ -23,4 +23,9 @@ class EscritorioUpdate(UppercaseModel):
     nome: Optional[str] = None
     cnpj: Optional[str] = None
     email: Optional[str] = None
-    telefone: Optional[str] = None
\ No newline at end of file
+    telefone: Optional[str] = None
+
+
+class EscritorioFiltro(UppercaseModel):
+    nome: Optional[str] = None
+    cnpj: Optional[str] = None
\ No newline at end of file
@@ -19,4 +19,8 @@ class EspecialidadeRead(EspecialidadeBase):
 
 class EspecialidadeUpdate(UppercaseModel):
     nome: Optional[str] = None
-    descricao: Optional[str] = None
\ No newline at end of file
+    descricao: Optional[str] = None
+
+
+class EspecialidadeFiltro(UppercaseModel):
+    nome: Optional[str] = None
\ No newline at end of file
@@ -19,4 +19,9 @@ class ParametroRead(ParametroBase):
 
 class ParametroUpdate(UppercaseModel):
     chave: Optional[str] = None
-    valor: Optional[str] = None
\ No newline at end of file
+    valor: Optional[str] = None
+
+
+class ParametroFiltro(UppercaseModel):
+    chave: Optional[str] = None
+    chave_prefixo: Optional[str] = None
\ No newline at end of file
@@ -6,6 +6,7 @@ from .common import UppercaseModel
 class PerfilBase(UppercaseModel):
     nome: str
     descricao: Optional[str] = None
+    permissoes: Optional[str] = None
 
 
 class PerfilCreate(PerfilBase):
@@ -19,4 +20,9 @@ class PerfilRead(PerfilBase):
 
 class PerfilUpdate(UppercaseModel):
     nome: Optional[str] = None
-    descricao: Optional[str] = None
\ No newline at end of file
+    descricao: Optional[str] = None
+    permissoes: Optional[str] = None
+
+
+class PerfilFiltro(UppercaseModel):
+    nome: Optional[str] = None
\ No newline at end of file
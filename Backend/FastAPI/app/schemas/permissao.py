@@ -19,4 +19,8 @@ class PermissaoRead(PermissaoBase):
 
 class PermissaoUpdate(UppercaseModel):
     nome: Optional[str] = None
-    descricao: Optional[str] = None
\ No newline at end of file
+    descricao: Optional[str] = None
+
+
+class PermissaoFiltro(UppercaseModel):
+    nome: Optional[str] = None
\ No newline at end of file
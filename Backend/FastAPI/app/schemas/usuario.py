@@ -29,4 +29,11 @@ class UsuarioUpdate(UppercaseModel):
     role: Optional[str] = None
     permissoes: Optional[str] = None
     senha: Optional[str] = None
-    advogado_id: Optional[int] = None
\ No newline at end of file
+    advogado_id: Optional[int] = None
+
+
+class UsuarioFiltro(UppercaseModel):
+    username: Optional[str] = None
+    role: Optional[str] = None
+    advogado_id: Optional[int] = None
+    escritorio_id: Optional[int] = None
\ No newline at end of file
@@ -0,0 +1,157 @@
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+AUTH_SECRET = os.getenv("AUTH_SECRET") or ""
+if not AUTH_SECRET:
+    # Sem segredo compartilhado, tokens só valem no processo que os emitiu
+    logger.warning("AUTH_SECRET não definido; usando segredo aleatório por processo")
+    AUTH_SECRET = secrets.token_hex(32)
+
+AUTH_TOKEN_TTL = int(os.getenv("AUTH_TOKEN_TTL", str(12 * 3600)))
+# Ticket do feed de alterações (?ticket= no EventSource/WebSocket): vale só para /eventos e expira logo,
+# então a URL que fica em logs de proxy não serve como credencial
+EVENTOS_TICKET_TTL = int(os.getenv("EVENTOS_TICKET_TTL", "60"))
+AUTH_CACHE_TTL = float(os.getenv("AUTH_CACHE_TTL", "60"))
+AUTH_CACHE_SIZE = int(os.getenv("AUTH_CACHE_SIZE", "10000"))
+# Tokens de desenvolvimento (dev-token, dev-<uid>@<esc>) ficam desligados por padrão
+AUTH_DEV_TOKENS = os.getenv("AUTH_DEV_TOKENS", "0").strip().lower() in ("1", "true", "yes", "on")
+# Chave do scope ASGI com o contexto já resolvido, repassado às sub-requisições de /batch
+SHARED_AUTH = "cjf.shared_auth"
+
+
+@dataclass(frozen=True)
+class AuthContext:
+    user_id: int
+    escritorio_id: Optional[int]
+    role: Optional[str]
+    username: str
+    nome: str
+    email: Optional[str] = None
+    permissoes: Optional[str] = None
+    perms_digest: str = ""
+    escritorio_nome: Optional[str] = None
+    advogado_nome: Optional[str] = None
+    advogado_oab: Optional[str] = None
+
+
+DEV_CONTEXT = AuthContext(user_id=0, escritorio_id=None, role="DEV", username="dev", nome="DESENVOLVIMENTO")
+
+
+def perms_digest(permissoes: Optional[str]) -> str:
+    return hashlib.sha256((permissoes or "").encode()).hexdigest()[:16]
+
+
+def _b64(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _unb64(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _sign(body: str) -> str:
+    return _b64(hmac.new(AUTH_SECRET.encode(), body.encode(), hashlib.sha256).digest())
+
+
+def issue_token(
+    user_id: int,
+    escritorio_id: Optional[int],
+    role: Optional[str],
+    permissoes: Optional[str],
+    ttl: int = AUTH_TOKEN_TTL,
+    uso: Optional[str] = None,
+) -> str:
+    payload: Dict[str, Any] = {
+        "u": user_id,
+        "e": escritorio_id,
+        "r": role,
+        "p": perms_digest(permissoes),
+        "exp": int(time.time()) + ttl,
+    }
+    if uso:
+        payload["k"] = uso
+    body = _b64(json.dumps(payload, separators=(",", ":")).encode())
+    return f"{body}.{_sign(body)}"
+
+
+def verify_token(token: str, uso: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """Retorna o payload se assinatura, validade e uso (None = token de acesso) conferem; None caso contrário."""
+    body, _, sig = token.partition(".")
+    if not sig or not hmac.compare_digest(sig, _sign(body)):
+        return None
+    try:
+        payload = json.loads(_unb64(body))
+    except ValueError:
+        return None
+    if not isinstance(payload, dict) or payload.get("exp", 0) < time.time() or payload.get("k") != uso:
+        return None
+    return payload
+
+
+class AuthCache:
+    """Cache LRU com TTL de contextos resolvidos, chaveado por (usuário, escritório)."""
+
+    def __init__(self, maxsize: int = AUTH_CACHE_SIZE, ttl: float = AUTH_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Tuple[int, Optional[int]], Tuple[float, AuthContext]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple[int, Optional[int]]) -> Optional[AuthContext]:
+        with self._lock:
+            hit = self._data.get(key)
+            if not hit:
+                return None
+            expires, ctx = hit
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return ctx
+
+    def put(self, key: Tuple[int, Optional[int]], ctx: AuthContext) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, ctx)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate_user(self, user_id: int) -> None:
+        with self._lock:
+            for key in [k for k in self._data if k[0] == user_id]:
+                del self._data[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+auth_cache = AuthCache()
+
+# Entidades cuja alteração muda contextos de vários usuários (vínculos, nomes exibidos)
+_CLEAR_ALL_ON = {"Advogados", "Escritorios", "AdvogadoEscritorios", "UsuarioEscritorios"}
+
+
+def invalidate_auth(entidade: str, entidade_id: Optional[int]) -> None:
+    """Descarta contextos afetados pela alteração.
+
+    Chamada no commit (worker que escreveu) e, via feed de alterações, nos
+    demais workers; com CHANGE_FEED=0 eles só notam após AUTH_CACHE_TTL.
+    """
+    if entidade == "Usuarios" and entidade_id is not None:
+        auth_cache.invalidate_user(entidade_id)
+    elif entidade == "Usuarios" or entidade in _CLEAR_ALL_ON:
+        auth_cache.clear()
@@ -0,0 +1,102 @@
+import threading
+import time
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Type
+
+import orjson
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, TypeAdapter
+
+
+class EncodingMetrics:
+    """Tempo de serialização JSON e bytes economizados pela compressão."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.encoded = 0
+        self.encode_total = 0.0
+        self.encode_max = 0.0
+        self.encoded_bytes = 0
+        self.compressed: Dict[str, int] = {}
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def record_encode(self, seconds: float, size: int) -> None:
+        with self._lock:
+            self.encoded += 1
+            self.encode_total += seconds
+            self.encode_max = max(self.encode_max, seconds)
+            self.encoded_bytes += size
+
+    def record_compression(self, encoding: str, size_in: int, size_out: int) -> None:
+        with self._lock:
+            self.compressed[encoding] = self.compressed.get(encoding, 0) + 1
+            self.bytes_in += size_in
+            self.bytes_out += size_out
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "encoded": self.encoded,
+            "encode_avg_ms": round(self.encode_total / self.encoded * 1000, 3) if self.encoded else None,
+            "encode_max_ms": round(self.encode_max * 1000, 3),
+            "encoded_bytes": self.encoded_bytes,
+            "compressed": dict(self.compressed),
+            "compressed_bytes_in": self.bytes_in,
+            "compressed_bytes_out": self.bytes_out,
+            "bytes_saved": self.bytes_in - self.bytes_out,
+        }
+
+
+encoding_metrics = EncodingMetrics()
+
+
+def _default(obj: Any) -> Any:
+    # orjson já cobre datetime/date/UUID/dataclass; o resto segue o json_safe dos routers
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    raise TypeError(f"Tipo não serializável em JSON: {type(obj).__name__}")
+
+
+class ORJSONResponse(JSONResponse):
+    """Resposta JSON padrão da API, serializada com orjson."""
+
+    def render(self, content: Any) -> bytes:
+        start = time.perf_counter()
+        body = orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+        encoding_metrics.record_encode(time.perf_counter() - start, len(body))
+        return body
+
+
+def _with_headers(out: Response, response: Optional[Response], elapsed: float) -> Response:
+    out.headers["Server-Timing"] = f"encode;dur={elapsed * 1000:.2f}"
+    if response is not None:
+        # Retornando um Response, o FastAPI não copia os cabeçalhos do parâmetro `response` (cursor, ETag)
+        out.raw_headers.extend(h for h in response.raw_headers if h[0] not in (b"content-length", b"content-type"))
+    return out
+
+
+@lru_cache(maxsize=None)
+def _list_adapter(schema: Type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(List[schema])  # type: ignore[valid-type]
+
+
+def json_list(schema: Type[BaseModel], rows: Sequence[Any], response: Optional[Response] = None) -> Response:
+    """Caminho rápido para listagens: valida as linhas ORM (ou dicts) de uma vez
+    via TypeAdapter e gera os bytes JSON direto no pydantic-core."""
+    adapter = _list_adapter(schema)
+    start = time.perf_counter()
+    body = adapter.dump_json(adapter.validate_python(rows, from_attributes=True))
+    elapsed = time.perf_counter() - start
+    encoding_metrics.record_encode(elapsed, len(body))
+    return _with_headers(Response(body, media_type="application/json"), response, elapsed)
+
+
+def json_response(content: Any, response: Optional[Response] = None) -> Response:
+    """Conteúdo já em tipos JSON (dicts montados à mão), sem passar pelo jsonable_encoder."""
+    start = time.perf_counter()
+    out = ORJSONResponse(content)
+    return _with_headers(out, response, time.perf_counter() - start)
@@ -0,0 +1,83 @@
+"""Entrypoint de produção: python -m app.server
+
+Sobe N workers do uvicorn (SERVER_WORKERS, padrão = núcleos), com uvloop e
+httptools quando instalados, reciclagem de workers após um número de
+requisições e drenagem das conexões no SIGTERM. DB_MAX_CONNECTIONS é dividido
+entre os workers e, dentro de cada um, entre todos os pools que ele abre
+(engine síncrono, assíncrono e um por réplica), descontada a conexão do LISTEN.
+"""
+import importlib.util
+import inspect
+import math
+import os
+import secrets
+
+import uvicorn
+
+
+def _int_env(name: str, default: int) -> int:
+    raw = os.getenv(name)
+    return int(raw) if raw and raw.strip() else default
+
+
+def _has(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+def _flag_env(name: str, default: str) -> bool:
+    return os.getenv(name, default).strip().lower() not in ("0", "false", "no", "off")
+
+
+def pool_sizes(workers: int, max_connections: int, pools: int = 1, reserved: int = 0) -> tuple[int, int]:
+    """Divide o orçamento de conexões entre os workers e os `pools` de cada um: ~2/3 fixas, resto em overflow.
+
+    `reserved` são conexões por worker fora dos pools (o LISTEN do change feed).
+    """
+    per_worker = max_connections // max(1, workers) - reserved
+    per_pool = max(2, per_worker // max(1, pools))
+    pool_size = max(1, math.ceil(per_pool * 2 / 3))
+    return pool_size, max(0, per_pool - pool_size)
+
+
+def main() -> None:
+    workers = _int_env("SERVER_WORKERS", _int_env("WEB_CONCURRENCY", os.cpu_count() or 1))
+
+    # Definido antes de criar os workers: cada processo herda o ambiente ao importar app.database.
+    # DB_POOL_SIZE/DB_MAX_OVERFLOW valem para cada pool: engine, async_engine e cada réplica
+    replicas = [u for u in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if u.strip()]
+    listen = 1 if _flag_env("CHANGE_FEED", "1") else 0
+    pool_size, max_overflow = pool_sizes(workers, _int_env("DB_MAX_CONNECTIONS", 90), 2 + len(replicas), listen)
+    os.environ.setdefault("DB_POOL_SIZE", str(pool_size))
+    os.environ.setdefault("DB_MAX_OVERFLOW", str(max_overflow))
+    # Sem AUTH_SECRET, um segredo gerado aqui vale para todos os workers (até o próximo restart);
+    # gerado em cada worker, o token emitido por um seria recusado pelos outros
+    if not os.getenv("AUTH_SECRET"):
+        os.environ["AUTH_SECRET"] = secrets.token_hex(32)
+
+    options = dict(
+        host=os.getenv("HOST", "0.0.0.0"),
+        port=_int_env("PORT", 8000),
+        workers=workers,
+        loop=os.getenv("SERVER_LOOP") or ("uvloop" if _has("uvloop") else "asyncio"),
+        http=os.getenv("SERVER_HTTP") or ("httptools" if _has("httptools") else "h11"),
+        # Recicla o worker após N requisições (0 desliga); o jitter evita reinícios simultâneos.
+        # Com 1 worker não há supervisor para recriar o processo, então fica desligado.
+        limit_max_requests=(_int_env("SERVER_MAX_REQUESTS", 50000) or None) if workers > 1 else None,
+        # SIGTERM: para de aceitar conexões e espera as requisições em andamento por até N s
+        timeout_graceful_shutdown=_int_env("SERVER_GRACEFUL_TIMEOUT", 30),
+        timeout_keep_alive=_int_env("SERVER_KEEP_ALIVE", 5),
+        backlog=_int_env("SERVER_BACKLOG", 2048),
+        proxy_headers=True,
+        # Só o proxy na frente (nginx) pode definir X-Forwarded-For, usado em replicas._client_key;
+        # atrás de outro proxy, informe o endereço dele em FORWARDED_ALLOW_IPS
+        forwarded_allow_ips=os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1"),
+        access_log=os.getenv("SERVER_ACCESS_LOG", "0") == "1",
+    )
+    jitter = _int_env("SERVER_MAX_REQUESTS_JITTER", 5000)
+    if jitter and "limit_max_requests_jitter" in inspect.signature(uvicorn.Config).parameters:
+        options["limit_max_requests_jitter"] = jitter
+    uvicorn.run("app.main:app", **options)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+import asyncio
+import hashlib
+import os
+import threading
+import weakref
+from typing import Any, Dict, List, Optional, Tuple
+
+from starlette.datastructures import Headers
+from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .replicas import _pinned, is_write, replicas
+from .security import verify_token
+
+
+# SINGLE_FLIGHT=0 desliga; a lista de rotas aceita caminhos exatos (com ou sem a barra final)
+SINGLE_FLIGHT = os.getenv("SINGLE_FLIGHT", "1").strip().lower() not in ("0", "false", "no", "off")
+SINGLE_FLIGHT_ROUTES = [
+    r.strip()
+    for r in os.getenv(
+        "SINGLE_FLIGHT_ROUTES",
+        "/causas-processos/sum,/causas-processos/resumo,/escritorios/,/especialidades/,/parametros/,/perfil/,/permissoes/",
+    ).split(",")
+    if r.strip()
+]
+# Rotas afetadas por uma alteração na entidade (nome da UnitOfWork/feed de alterações)
+SINGLE_FLIGHT_ENTIDADES = {
+    "CausasProcessos": "/causas-processos",
+    "Escritorios": "/escritorios",
+    "Especialidades": "/especialidades",
+    "Parametros": "/parametros",
+    "Perfil": "/perfil",
+    "Permissoes": "/permissoes",
+    "Advogados": "/advogados",
+    "Clientes": "/clientes",
+    "Usuarios": "/usuarios",
+}
+# Rotas cuja resposta inclui outra entidade (as mesmas declaradas em conditional()):
+# uma escrita sob a chave também descarta as execuções destas
+SINGLE_FLIGHT_DEPENDENTES = {
+    "/escritorios": ("/advogados", "/usuarios"),
+    "/advogados": ("/usuarios",),
+}
+# Respostas maiores que isso não são compartilhadas (a líder já respondeu; as seguidoras executam sozinhas)
+SINGLE_FLIGHT_MAX_BODY = int(os.getenv("SINGLE_FLIGHT_MAX_BODY", str(4 * 1024 * 1024)))
+
+Key = Tuple[str, str, str, str]
+
+# Só a seguidora com o mesmo token recebe os validadores da líder: o ETag inclui o Authorization
+_VALIDADORES = (b"etag", b"last-modified")
+
+
+class SingleFlightMetrics:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.routes: Dict[str, Dict[str, int]] = {}
+        self.in_flight = 0
+
+    def record(self, route: str, event: str) -> None:
+        with self._lock:
+            counters = self.routes.setdefault(route, {"executadas": 0, "agrupadas": 0, "fallbacks": 0})
+            counters[event] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            routes = {r: dict(c) for r, c in self.routes.items()}
+        return {
+            "enabled": SINGLE_FLIGHT,
+            "in_flight": self.in_flight,
+            "executadas": sum(c["executadas"] for c in routes.values()),
+            "agrupadas": sum(c["agrupadas"] for c in routes.values()),
+            "routes": routes,
+        }
+
+
+single_flight_metrics = SingleFlightMetrics()
+_middlewares: "weakref.WeakSet[SingleFlightMiddleware]" = weakref.WeakSet()
+
+
+def _normalize(path: str) -> str:
+    return path.rstrip("/") or "/"
+
+
+def tenant_scope(headers: Headers) -> Optional[str]:
+    """Escopo de dados do chamador: escritório + perfil + permissões do token assinado.
+
+    Usuários do mesmo escritório com as mesmas permissões veem a mesma resposta
+    nas rotas configuradas. None (sem agrupamento) para token inválido.
+    """
+    auth = headers.get("authorization")
+    if not auth:
+        return "-"
+    if not auth.lower().startswith("bearer "):
+        return None
+    token = auth.split(" ", 1)[1].strip()
+    payload = verify_token(token)
+    if payload is None:
+        # Tokens de desenvolvimento não são assinados: agrupa só o mesmo token
+        return "t:" + hashlib.sha256(token.encode()).hexdigest()[:24] if token.startswith("dev-") else None
+    return f"e:{payload.get('e')}|r:{payload.get('r')}|p:{payload.get('p')}"
+
+
+class _Flight:
+    def __init__(self, authorization: Optional[str]) -> None:
+        self.authorization = authorization
+        self.done = asyncio.Event()
+        self.start: Optional[Message] = None
+        self.body: Optional[bytes] = None
+
+
+class SingleFlightMiddleware:
+    """Requisições GET idênticas e simultâneas (rota, query, If-None-Match, escopo e
+    fixação no primário) compartilham uma única execução: a primeira vai ao banco, as demais aguardam e
+    recebem a mesma resposta serializada.
+
+    Uma escrita bem-sucedida descarta as execuções em andamento das rotas que ela
+    afeta (a própria e SINGLE_FLIGHT_DEPENDENTES), para leituras posteriores não
+    se juntarem a uma iniciada antes do commit; POSTs só de leitura (/batch,
+    ticket, login) não descartam nada. Nos
+    demais workers, o evento do feed de alterações descarta as das rotas da
+    entidade (drop_flights), com o atraso de entrega do NOTIFY.
+    """
+
+    def __init__(self, app: ASGIApp, routes: List[str] = SINGLE_FLIGHT_ROUTES, enabled: bool = SINGLE_FLIGHT):
+        self.app = app
+        self.routes = {_normalize(r) for r in routes}
+        self.enabled = enabled
+        self._flights: Dict[Key, _Flight] = {}
+        _middlewares.add(self)
+
+    def _drop(self, key: Key) -> None:
+        del self._flights[key]
+        single_flight_metrics.in_flight = len(self._flights)
+
+    def drop_routes(self, prefix: Optional[str]) -> None:
+        """Descarta as execuções em andamento das rotas sob `prefix` (None: todas)."""
+        for key in [k for k in self._flights if prefix is None or k[1] == prefix or k[1].startswith(prefix + "/")]:
+            self._drop(key)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.enabled:
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        if scope["method"] != "GET":
+            await self._write(scope, receive, send, headers)
+            return
+        route = _normalize(scope["path"])
+        tenant = tenant_scope(headers) if route in self.routes else None
+        if tenant is None:
+            await self.app(scope, receive, send)
+            return
+        # Cliente fixado no primário (read-your-writes) não se junta a quem lê da réplica
+        if replicas and _pinned(Request(scope)):
+            tenant += "|primario"
+        query = "&".join(sorted(scope.get("query_string", b"").decode("latin-1").split("&")))
+        key: Key = (tenant, route, query, headers.get("if-none-match", ""))
+
+        flight = self._flights.get(key)
+        if flight is not None:
+            await flight.done.wait()
+            mesmo_token = flight.authorization == headers.get("authorization")
+            # 304 vale para o ETag da líder; outro token compara com o próprio ETag
+            if flight.start is not None and flight.body is not None and (mesmo_token or flight.start["status"] != 304):
+                single_flight_metrics.record(route, "agrupadas")
+                start = flight.start
+                if not mesmo_token:
+                    start = {**start, "headers": [h for h in start["headers"] if h[0].lower() not in _VALIDADORES]}
+                await send(start)
+                await send({"type": "http.response.body", "body": flight.body})
+                return
+            # A líder falhou ou a resposta não coube no limite: executa por conta própria
+            single_flight_metrics.record(route, "fallbacks")
+            await self.app(scope, receive, send)
+            return
+
+        flight = self._flights[key] = _Flight(headers.get("authorization"))
+        single_flight_metrics.in_flight = len(self._flights)
+        single_flight_metrics.record(route, "executadas")
+        chunks: List[bytes] = []
+        size = 0
+        complete = False
+
+        async def capture(message: Message) -> None:
+            nonlocal size, complete
+            if message["type"] == "http.response.start":
+                flight.start = {**message, "headers": [h for h in message["headers"] if h[0] != b"set-cookie"]}
+            elif message["type"] == "http.response.body" and size <= SINGLE_FLIGHT_MAX_BODY:
+                body = message.get("body", b"")
+                size += len(body)
+                chunks.append(body)
+                complete = not message.get("more_body", False)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, capture)
+        finally:
+            # Erro 5xx não é compartilhado: as seguidoras tentam de novo
+            if complete and size <= SINGLE_FLIGHT_MAX_BODY and flight.start is not None and flight.start["status"] < 500:
+                flight.body = b"".join(chunks)
+            if self._flights.get(key) is flight:
+                self._drop(key)
+            flight.done.set()
+
+    async def _write(self, scope: Scope, receive: Receive, send: Send, headers: Headers) -> None:
+        if not is_write(scope["method"], scope["path"]):
+            await self.app(scope, receive, send)
+            return
+        prefix = "/" + scope["path"].strip("/").split("/", 1)[0]
+        # Rota fora do mapa (seeds, por exemplo) pode ter gravado qualquer entidade: descarta todas
+        prefixes: List[Optional[str]] = [None]
+        if prefix in SINGLE_FLIGHT_ENTIDADES.values():
+            prefixes = [prefix, *SINGLE_FLIGHT_DEPENDENTES.get(prefix, ())]
+
+        async def forward(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                for p in prefixes:
+                    self.drop_routes(p)
+            await send(message)
+
+        await self.app(scope, receive, forward)
+
+
+def drop_flights(evento: Dict[str, Any]) -> None:
+    """Descarta execuções em andamento afetadas por um evento do feed de alterações.
+
+    Entidade sem rota conhecida e "resync" descartam todas.
+    """
+    prefix = SINGLE_FLIGHT_ENTIDADES.get(evento.get("entidade", "")) if evento.get("tipo") == "mudanca" else None
+    prefixes = [prefix, *SINGLE_FLIGHT_DEPENDENTES.get(prefix, ())] if prefix else [None]
+    for middleware in list(_middlewares):
+        for p in prefixes:
+            middleware.drop_routes(p)
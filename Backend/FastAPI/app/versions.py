@@ -0,0 +1,62 @@
+import hashlib
+import json
+from email.utils import format_datetime
+from datetime import timezone
+from typing import Any, Callable, Iterable
+
+from fastapi import Depends, HTTPException, Request, Response
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .models.tabela_versao import TabelaVersao
+from .replicas import get_read_db
+
+
+def bump_statement(tabelas: Iterable[str]) -> Any:
+    """Incrementa a versão das entidades; ordenado para escritores concorrentes travarem na mesma ordem."""
+    rows = [{"tabela": t, "versao": 1} for t in sorted(set(tabelas))]
+    stmt = insert(TabelaVersao).values(rows)
+    return stmt.on_conflict_do_update(
+        index_elements=[TabelaVersao.tabela],
+        set_={"versao": TabelaVersao.versao + 1, "atualizado_em": func.timezone("utc", func.now())},
+    )
+
+
+def conditional(*tabelas: str) -> Callable[..., Any]:
+    """Dependência de GET: ETag/Last-Modified a partir das versões das entidades lidas.
+
+    Responde 304 a um If-None-Match igual sem consultar as linhas. O ETag
+    combina as versões com caminho, query e Authorization, já que o escopo
+    do usuário muda o conteúdo.
+    """
+
+    async def dependency(request: Request, response: Response, db: AsyncSession = Depends(get_read_db)) -> None:
+        # Lidas antes das linhas: uma escrita no meio gera no máximo um refetch, nunca um ETag novo com dados velhos
+        found = (await db.execute(
+            select(TabelaVersao.tabela, TabelaVersao.versao, TabelaVersao.atualizado_em).where(TabelaVersao.tabela.in_(tabelas))
+        )).all()
+        versions = {t: 0 for t in tabelas}
+        last_modified = None
+        for tabela, versao, atualizado_em in found:
+            versions[tabela] = versao
+            last_modified = max(last_modified, atualizado_em) if last_modified else atualizado_em
+        raw = json.dumps([
+            [versions[t] for t in tabelas],
+            request.url.path,
+            sorted(request.query_params.multi_items()),
+            request.headers.get("authorization"),
+        ])
+        headers = {
+            "ETag": f'W/"{hashlib.sha256(raw.encode()).hexdigest()[:24]}"',
+            "Cache-Control": "private, no-cache",
+            "Vary": "Authorization",
+        }
+        if last_modified:
+            headers["Last-Modified"] = format_datetime(last_modified.replace(tzinfo=timezone.utc), usegmt=True)
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and (if_none_match.strip() == "*" or headers["ETag"] in [t.strip() for t in if_none_match.split(",")]):
+            raise HTTPException(status_code=304, headers=headers)
+        response.headers.update(headers)
+
+    return dependency
@@ -0,0 +1,130 @@
+"""Benchmark de throughput do app.server com 1..N workers.
+
+Uso (a partir de Backend/FastAPI, com o banco do .env acessível):
+
+    python scripts/bench_workers.py --max-workers 4 --path /health/ --path /especialidades/
+
+Para cada quantidade de workers sobe `python -m app.server` em uma porta local,
+aguarda o /health responder, dispara requisições GET keep-alive com C conexões
+concorrentes durante D segundos e imprime req/s, latência p50/p99 e o ganho
+em relação a 1 worker. Usa só a biblioteca padrão.
+"""
+import argparse
+import asyncio
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import time
+from typing import List, Tuple
+
+
+async def _get(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, path: str, headers: str) -> int:
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\n{headers}\r\n".encode())
+    await writer.drain()
+    head = await reader.readuntil(b"\r\n\r\n")
+    status = int(head.split(b" ", 2)[1])
+    length = 0
+    chunked = False
+    for line in head.split(b"\r\n")[1:]:
+        name, _, value = line.partition(b":")
+        if name.lower() == b"content-length":
+            length = int(value)
+        elif name.lower() == b"transfer-encoding" and b"chunked" in value.lower():
+            chunked = True
+    if chunked:
+        while True:
+            size = int((await reader.readuntil(b"\r\n")).strip(), 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    elif length:
+        await reader.readexactly(length)
+    return status
+
+
+async def _client(port: int, paths: List[str], headers: str, deadline: float, latencies: List[float], errors: List[int]) -> None:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    i = 0
+    try:
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                status = await _get(reader, writer, paths[i % len(paths)], headers)
+            except (asyncio.IncompleteReadError, ConnectionError):
+                # Worker reciclado/fechou a conexão: reabre e segue
+                errors.append(0)
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+                continue
+            latencies.append(time.perf_counter() - start)
+            if status >= 400:
+                errors.append(status)
+            i += 1
+    finally:
+        writer.close()
+
+
+async def _load(port: int, paths: List[str], headers: str, concurrency: int, duration: float) -> Tuple[int, List[float], List[int]]:
+    latencies: List[float] = []
+    errors: List[int] = []
+    deadline = time.perf_counter() + duration
+    await asyncio.gather(*[_client(port, paths, headers, deadline, latencies, errors) for _ in range(concurrency)])
+    return len(latencies), latencies, errors
+
+
+async def _wait_ready(port: int, timeout: float = 60) -> None:
+    limit = time.perf_counter() + timeout
+    while time.perf_counter() < limit:
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            status = await _get(reader, writer, "/health/", "")
+            writer.close()
+            if status == 200:
+                return
+        except (OSError, asyncio.IncompleteReadError):
+            pass
+        await asyncio.sleep(0.5)
+    raise RuntimeError("Servidor não respondeu a tempo")
+
+
+def run(workers: int, args: argparse.Namespace) -> Tuple[float, float, float, int]:
+    env = dict(os.environ, SERVER_WORKERS=str(workers), PORT=str(args.port), HOST="127.0.0.1")
+    proc = subprocess.Popen([sys.executable, "-m", "app.server"], env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        asyncio.run(_wait_ready(args.port))
+        headers = f"Authorization: Bearer {args.token}\r\n" if args.token else ""
+        asyncio.run(_load(args.port, args.path, headers, args.concurrency, args.warmup))
+        total, latencies, errors = asyncio.run(_load(args.port, args.path, headers, args.concurrency, args.duration))
+    finally:
+        proc.send_signal(signal.SIGTERM)
+        proc.wait(timeout=60)
+    latencies.sort()
+    p50 = statistics.median(latencies) * 1000 if latencies else 0.0
+    p99 = latencies[int(len(latencies) * 0.99) - 1] * 1000 if latencies else 0.0
+    return total / args.duration, p50, p99, len(errors)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--warmup", type=float, default=2.0)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--path", action="append", help="Rota a exercitar (repetível); padrão /health/")
+    parser.add_argument("--token", help="Bearer token para rotas autenticadas")
+    args = parser.parse_args()
+    args.path = args.path or ["/health/"]
+
+    counts = sorted({1, *[n for n in (2, 4, 8, 16, 32) if n < args.max_workers], args.max_workers})
+    print(f"{'workers':>7} {'req/s':>10} {'p50 ms':>8} {'p99 ms':>8} {'erros':>6} {'ganho':>6}")
+    base = None
+    for n in counts:
+        rps, p50, p99, errors = run(n, args)
+        base = base or rps
+        print(f"{n:>7} {rps:>10.0f} {p50:>8.1f} {p99:>8.1f} {errors:>6} {rps / base:>5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
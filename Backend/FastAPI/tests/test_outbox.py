@@ -0,0 +1,71 @@
+import json
+from datetime import datetime
+
+import pytest
+from sqlalchemy import delete, func, select
+
+from app.database import AsyncSessionLocal
+from app.models.outbox import Outbox
+from app.outbox import InMemoryBroker, OutboxRelay, to_message
+
+
+def _evento(**kw) -> Outbox:
+    dados = dict(entidade="Usuarios", entidade_id=7, acao="update",
+                 alteracoes={"nome": {"old": "A", "new": "B"}, "senha_hash": {"old": "x", "new": "y"}})
+    dados.update(kw)
+    return Outbox(**dados)
+
+
+def test_to_message_sem_campos_sensiveis():
+    row = _evento(id=42, criado_em=datetime(2024, 5, 1, 12, 30))
+    msg = to_message(row)
+    assert msg.message_id == "outbox-42"
+    assert msg.routing_key == "usuarios.update"
+    body = json.loads(msg.body)
+    assert body["entidade_id"] == 7
+    assert body["quando"] == "2024-05-01T12:30:00"
+    assert "senha_hash" not in body["alteracoes"]
+    assert body["alteracoes"]["nome"] == {"old": "A", "new": "B"}
+
+
+async def _preparar(n: int) -> None:
+    async with AsyncSessionLocal() as db, db.begin():
+        await db.execute(delete(Outbox))
+        db.add_all([_evento(entidade_id=i) for i in range(n)])
+
+
+async def _pendentes() -> int:
+    async with AsyncSessionLocal() as db:
+        return await db.scalar(select(func.count()).select_from(Outbox))
+
+
+def test_relay_publica_e_remove(rodar):
+    broker = InMemoryBroker()
+    relay = OutboxRelay(broker, batch_size=2)
+
+    async def cenario():
+        await _preparar(3)
+        assert await relay.relay_once() == 2
+        assert await relay.relay_once() == 1
+        assert await relay.relay_once() == 0
+        return await _pendentes()
+
+    assert rodar(cenario()) == 0
+    assert [json.loads(m.body)["entidade_id"] for m in broker.published] == [0, 1, 2]
+    assert len({m.message_id for m in broker.published}) == 3
+
+
+def test_relay_mantem_linhas_quando_broker_rejeita(rodar):
+    broker = InMemoryBroker(fail_next=1)
+    relay = OutboxRelay(broker)
+
+    async def cenario():
+        await _preparar(2)
+        with pytest.raises(RuntimeError):
+            await relay.relay_once()
+        antes = await _pendentes()
+        publicadas = await relay.relay_once()
+        return antes, publicadas, await _pendentes()
+
+    assert rodar(cenario()) == (2, 2, 0)
+    assert len(broker.published) == 2
@@ -0,0 +1,65 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import delete, select
+from starlette.responses import Response
+
+from app.database import AsyncSessionLocal
+from app.models.causas_processos import CausaProcesso
+from app.routers.pagination import (
+    NEXT_CURSOR_HEADER, PageParams, _python_value, decode_cursor, encode_cursor, paginate,
+)
+
+
+@pytest.mark.parametrize("valor, coluna, esperado", [
+    (3, CausaProcesso.id, 3),
+    ("ABC", CausaProcesso.numero, "ABC"),
+    (date(2024, 2, 29), CausaProcesso.dataDistribuicao, date(2024, 2, 29)),
+    (Decimal("1234.50"), CausaProcesso.valor, Decimal("1234.50")),
+    (None, CausaProcesso.valor, None),
+])
+def test_cursor_ida_e_volta(valor, coluna, esperado):
+    cursor = encode_cursor("-campo", valor, 99)
+    assert "=" not in cursor
+    sort, bruto, row_id = decode_cursor(cursor)
+    assert (sort, row_id) == ("-campo", 99)
+    assert _python_value(coluna, bruto) == esperado
+
+
+@pytest.mark.parametrize("cursor", ["", "nao-e-cursor", encode_cursor("id", 1, 1)[:-3]])
+def test_cursor_invalido(cursor):
+    with pytest.raises(HTTPException) as erro:
+        decode_cursor(cursor)
+    assert erro.value.status_code == 400
+
+
+VALORES = [Decimal("10.00"), Decimal("10.00"), None, Decimal("5.00"), Decimal("10.00"), None, Decimal("7.50")]
+
+
+@pytest.mark.parametrize("sort", ["valor", "-valor", "id", "-id"])
+def test_paginate_percorre_tudo_sem_repetir(rodar, sort):
+    async def cenario():
+        async with AsyncSessionLocal() as db, db.begin():
+            await db.execute(delete(CausaProcesso).where(CausaProcesso.numero.like("PAG-%")))
+            db.add_all([CausaProcesso(numero=f"PAG-{i}", valor=v) for i, v in enumerate(VALORES)])
+
+        vistos, cursor = [], None
+        async with AsyncSessionLocal() as db:
+            while True:
+                response = Response()
+                stmt = select(CausaProcesso).where(CausaProcesso.numero.like("PAG-%"))
+                page = PageParams(limit=2, cursor=cursor, sort=sort)
+                vistos += await paginate(db, stmt, CausaProcesso.id, page, response, {"valor": CausaProcesso.valor})
+                cursor = response.headers.get(NEXT_CURSOR_HEADER)
+                if not cursor:
+                    return vistos
+
+    vistos = rodar(cenario())
+    ids = [c.id for c in vistos]
+    assert len(ids) == len(VALORES) == len(set(ids))
+    if sort.lstrip("-") == "valor":
+        valores = [c.valor for c in vistos if c.valor is not None]
+        assert valores == sorted(valores, reverse=sort.startswith("-"))
+        assert all(c.valor is None for c in vistos[len(valores):])
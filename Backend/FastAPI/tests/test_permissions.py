@@ -0,0 +1,38 @@
+from app.permissions import parse_permissoes
+from app.routers.utils import upper_except_email
+from app.schemas.perfil import PerfilCreate, PerfilUpdate
+from app.schemas.usuario import UsuarioCreate, UsuarioUpdate
+
+
+def test_lista_separada_por_virgula_ou_espaco():
+    assert parse_permissoes("clientes_write, causas_write;perfil_read  usuarios_read") == {
+        "CLIENTES_WRITE", "CAUSAS_WRITE", "PERFIL_READ", "USUARIOS_READ",
+    }
+
+
+def test_vazio():
+    assert parse_permissoes(None) == set()
+    assert parse_permissoes("   ") == set()
+
+
+def test_json_lista():
+    assert parse_permissoes('["clientes_write", "causas_write"]') == {"CLIENTES_WRITE", "CAUSAS_WRITE"}
+
+
+def test_json_dict_so_as_verdadeiras():
+    assert parse_permissoes('{"clientes_write": true, "causas_write": false}') == {"CLIENTES_WRITE"}
+
+
+def test_json_em_caixa_alta_gravado_antes_da_correcao():
+    assert parse_permissoes('{"CLIENTES_WRITE": TRUE, "CAUSAS_WRITE": FALSE, "X": NULL}') == {"CLIENTES_WRITE"}
+
+
+def test_permissoes_nao_passam_para_caixa_alta():
+    raw = '{"clientes_write": true, "causas_write": false}'
+    for model in (PerfilCreate(nome="p", permissoes=raw), PerfilUpdate(permissoes=raw)):
+        assert model.permissoes == raw
+    for model in (UsuarioCreate(username="u", nome="n", permissoes=raw), UsuarioUpdate(permissoes=raw)):
+        assert model.permissoes == raw
+    data = upper_except_email(PerfilCreate(nome="p", permissoes=raw).model_dump())
+    assert data["nome"] == "P"
+    assert parse_permissoes(data["permissoes"]) == {"CLIENTES_WRITE"}
@@ -11,11 +11,12 @@ import {
   listarEscritorios,
   listarAdvogados,
   listarClientes,
-  listarCausasProcessos,
+  resumoCausasProcessos,
+  assinarMudancas,
   type Escritorio,
   type Advogado,
   type Cliente,
-  type CausaProcesso,
+  type ResumoCausas,
 } from '../services/api'
 import { getMessageApi } from '../utils/ui'
 
@@ -30,7 +31,7 @@ export default function Dashboard() {
   const [escritorios, setEscritorios] = useState<Escritorio[]>([])
   const [advogados, setAdvogados] = useState<Advogado[]>([])
   const [clientes, setClientes] = useState<Cliente[]>([])
-  const [processos, setProcessos] = useState<CausaProcesso[]>([])
+  const [resumo, setResumo] = useState<ResumoCausas | null>(null)
   async function handleSeed() {
     setSeeding(true)
     try {
@@ -41,12 +42,12 @@ export default function Dashboard() {
         listarEscritorios().catch(() => []),
         listarAdvogados().catch(() => []),
         listarClientes().catch(() => []),
-        listarCausasProcessos().catch(() => []),
+        resumoCausasProcessos(['status']).catch(() => null),
       ])
       setEscritorios(es as Escritorio[])
       setAdvogados(ad as Advogado[])
       setClientes(cl as Cliente[])
-      setProcessos(pr as CausaProcesso[])
+      setResumo(pr)
     } catch (e: any) {
       { const api = getMessageApi(); (api ? api : staticMessage).error(`Falha ao criar dados: ${e?.message || e}`) }
     } finally {
@@ -67,9 +68,10 @@ export default function Dashboard() {
       .finally(() => setLoading(false))
   }, [parametros])
 
-  // Atualização periódica de cadastros (contagens) a cada 60s
+  // Cadastros (contagens) recarregados quando o servidor avisa de alterações
   useEffect(() => {
     let cancelled = false
+    let pendente: ReturnType<typeof setTimeout> | undefined
     const fetchCadastros = async () => {
       setLoadingCadastros(true)
       try {
@@ -77,21 +79,25 @@ export default function Dashboard() {
           listarEscritorios().catch(() => []),
           listarAdvogados().catch(() => []),
           listarClientes().catch(() => []),
-          listarCausasProcessos().catch(() => []),
+          resumoCausasProcessos(['status']).catch(() => null),
         ])
         if (!cancelled) {
           setEscritorios(es as Escritorio[])
           setAdvogados(ad as Advogado[])
           setClientes(cl as Cliente[])
-          setProcessos(pr as CausaProcesso[])
+          setResumo(pr)
         }
       } finally {
         setLoadingCadastros(false)
       }
     }
     fetchCadastros()
-    const id = setInterval(fetchCadastros, 60000)
-    return () => { cancelled = true; clearInterval(id) }
+    // Rajadas de eventos (importação, edição em lote) viram um único recarregamento
+    const encerrar = assinarMudancas(() => {
+      clearTimeout(pendente)
+      pendente = setTimeout(fetchCadastros, 500)
+    }, ['Escritorios', 'Advogados', 'Clientes', 'CausasProcessos'])
+    return () => { cancelled = true; clearTimeout(pendente); encerrar() }
   }, [])
 
   const chartOptions = useMemo(() => {
@@ -134,28 +140,21 @@ export default function Dashboard() {
   function escritoriosCount(arr: Escritorio[]) { return Array.isArray(arr) ? arr.length : 0 }
   const countAdvogados = Array.isArray(advogados) ? advogados.length : 0
   const countClientes = Array.isArray(clientes) ? clientes.length : 0
-  const countProcessos = Array.isArray(processos) ? processos.length : 0
+  const countProcessos = resumo?.total.quantidade ?? 0
 
-  // Soma de valores de causas (se o campo existir)
-  const { somaValoresCausas, temCampoValor } = useMemo(() => {
-    let sum = 0
-    let hasField = false
-    for (const p of processos) {
-      const v: any = (p as any).valor ?? (p as any).valor_causa ?? (p as any).valorCausa ?? (p as any).valorDaCausa
-      if (typeof v === 'number' && isFinite(v)) { sum += v; hasField = true }
-    }
-    return { somaValoresCausas: sum, temCampoValor: hasField }
-  }, [processos])
+  // Soma de valores de causas, agregada no servidor
+  const somaValoresCausas = resumo?.total.valor_total ?? 0
+  const temCampoValor = resumo !== null
 
   // Distribuição por status dos processos
   const statusCounts = useMemo(() => {
     const m = new Map<string, number>()
-    for (const p of processos) {
-      const st = (p as any).status ?? '—'
-      m.set(st, (m.get(st) ?? 0) + 1)
+    for (const g of resumo?.grupos ?? []) {
+      const st = (g.status as string | null) ?? '—'
+      m.set(st, (m.get(st) ?? 0) + g.quantidade)
     }
     return m
-  }, [processos])
+  }, [resumo])
   const statusPieData = useMemo(() => Array.from(statusCounts.entries()).map(([name, value]) => ({ name, value })), [statusCounts])
 
   const countsChartOption = useMemo(() => ({
@@ -247,7 +246,7 @@ export default function Dashboard() {
               <Card>
                 <Statistic title="Total (R$)" prefix="R$" precision={2} value={temCampoValor ? somaValoresCausas : 0} />
                 {!temCampoValor && (
-                  <Typography.Text type="secondary">Campo de valor não disponível nos processos. Podemos estender o backend para incluir este dado.</Typography.Text>
+                  <Typography.Text type="secondary">Resumo de valores indisponível no momento.</Typography.Text>
                 )}
               </Card>
             </Col>
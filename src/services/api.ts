@@ -15,7 +15,7 @@ export function getToken() {
   return token
 }
 
-async function request(path: string, init: RequestInit = {}) {
+async function requestWithHeaders(path: string, init: RequestInit = {}) {
   const headers: Record<string, string> = {
     'Content-Type': 'application/json',
     ...(init.headers as Record<string, string>),
@@ -51,7 +51,8 @@ async function request(path: string, init: RequestInit = {}) {
       if (import.meta.env.DEV) console.error('[API]', path, err)
       throw err
     }
-    return ct.includes('application/json') ? resp.json() : resp.text()
+    const data = ct.includes('application/json') ? await resp.json() : await resp.text()
+    return { data, headers: resp.headers }
   } catch (e: any) {
     if (import.meta.env.DEV) console.error('[API fetch]', path, e)
     const err = normalizeError(null, e?.message || null, null)
@@ -59,26 +60,83 @@ async function request(path: string, init: RequestInit = {}) {
   }
 }
 
-// Auth
-export async function login(payload: { username: string; password: string; escritorio_id?: number }) {
-  try {
-    const data = await request('/auth/login', {
-      method: 'POST',
-      body: JSON.stringify(payload),
-    })
-    const t = (data as any).access_token || (data as any).token || null
-    if (t) setToken(t)
-    return data
-  } catch (e) {
-    // fallback de desenvolvimento: permite navegação local quando backend não está disponível
-    if (import.meta.env.DEV) {
-      setToken('dev-token')
-      return { access_token: 'dev-token', dev: true }
+async function request(path: string, init: RequestInit = {}) {
+  return (await requestWithHeaders(path, init)).data
+}
+
+// GETs de lista disparados no mesmo ciclo (ex.: os useAsyncData de uma tela) vão juntos em um POST /batch
+const BATCH_MAX = 20
+type Pendente = { path: string; resolve: (r: { data: any; headers: Headers }) => void; reject: (e: any) => void }
+let fila: Pendente[] = []
+
+function getEmLote(path: string) {
+  return new Promise<{ data: any; headers: Headers }>((resolve, reject) => {
+    fila.push({ path, resolve, reject })
+    if (fila.length === 1) setTimeout(despacharLote, 0)
+  })
+}
+
+async function despacharLote() {
+  const lote = fila
+  fila = []
+  for (let i = 0; i < lote.length; i += BATCH_MAX) {
+    const parte = lote.slice(i, i + BATCH_MAX)
+    if (parte.length === 1) {
+      requestWithHeaders(parte[0].path, { method: 'GET' }).then(parte[0].resolve, parte[0].reject)
+      continue
     }
-    throw e
+    let respostas: any[]
+    try {
+      respostas = (await request('/batch/', {
+        method: 'POST',
+        body: JSON.stringify({ requisicoes: parte.map((p) => ({ path: p.path })) }),
+      })).respostas
+    } catch {
+      // API sem /batch ou lote recusado: cada GET segue sozinho
+      parte.forEach((p) => requestWithHeaders(p.path, { method: 'GET' }).then(p.resolve, p.reject))
+      continue
+    }
+    parte.forEach((p, j) => {
+      const r = respostas[j]
+      if (r.status >= 200 && r.status < 300) {
+        p.resolve({ data: r.corpo, headers: new Headers(r.headers) })
+      } else {
+        const detail = (r.corpo && r.corpo.detail) || ''
+        const err = new Error(`API ${r.status}: ${detail || 'Falha ao comunicar com o servidor'}`)
+        ;(err as any).status = r.status
+        ;(err as any).detail = detail
+        p.reject(err)
+      }
+    })
   }
 }
 
+// Listas paginadas por cursor: segue o cabeçalho X-Next-Cursor até a última página
+async function requestAll(path: string, pageSize = 500) {
+  const out: any[] = []
+  let cursor: string | null = null
+  do {
+    const sep = path.includes('?') ? '&' : '?'
+    const qs = `limit=${pageSize}` + (cursor ? `&cursor=${encodeURIComponent(cursor)}` : '')
+    const { data, headers } = await getEmLote(`${path}${sep}${qs}`)
+    if (Array.isArray(data)) out.push(...data)
+    cursor = headers.get('X-Next-Cursor')
+  } while (cursor)
+  return out
+}
+
+// Auth
+// Sem fallback para 'dev-token': o backend só o aceita com AUTH_DEV_TOKENS=1
+export async function login(payload: { username: string; password: string; escritorio_id?: number }) {
+  const data = await request('/auth/login', {
+    method: 'POST',
+    body: JSON.stringify(payload),
+  })
+  const t = (data as any).access_token || (data as any).token || null
+  if (t) setToken(t)
+  return data
+}
+
 export async function logout() {
   setToken(null)
 }
@@ -87,7 +145,7 @@ export async function logout() {
 export type Escritorio = { id: number; nome: string; cnpj?: string; email?: string; telefone?: string }
 
 export async function listarEscritorios() {
-  return request('/escritorios', { method: 'GET' }) as Promise<Escritorio[]>
+  return requestAll('/escritorios/') as Promise<Escritorio[]>
 }
 export async function criarEscritorio(payload: Omit<Escritorio, 'id'>) {
   return request('/escritorios', { method: 'POST', body: JSON.stringify(payload) }) as Promise<Escritorio>
@@ -104,13 +162,13 @@ export async function salvarParametros(payload: any) {
   return request('/parametros', { method: 'POST', body: JSON.stringify(payload) })
 }
 export async function obterParametros() {
-  return request('/parametros', { method: 'GET' })
+  return requestAll('/parametros/')
 }
 
 // Tipos e CRUD de Especialidades
 export type Especialidade = { id: number; nome: string; descricao?: string }
 export async function listarEspecialidades() {
-  return request('/especialidades', { method: 'GET' }) as Promise<Especialidade[]>
+  return requestAll('/especialidades/') as Promise<Especialidade[]>
 }
 export async function criarEspecialidade(payload: Omit<Especialidade, 'id'>) {
   return request('/especialidades', { method: 'POST', body: JSON.stringify(payload) }) as Promise<Especialidade>
@@ -125,7 +183,7 @@ export async function excluirEspecialidade(id: number) {
 // Tipos e CRUD de Advogados
 export type Advogado = { id: number; nome: string; oab?: string; email?: string; telefone?: string; especialidade_id?: number; escritorios_ids?: number[]; escritorios?: Escritorio[] }
 export async function listarAdvogados() {
-  return request('/advogados', { method: 'GET' }) as Promise<Advogado[]>
+  return requestAll('/advogados/') as Promise<Advogado[]>
 }
 export async function listarEscritoriosPorAdvogado(id: number) {
   return request(`/advogados/${id}/escritorios`, { method: 'GET' }) as Promise<Escritorio[]>
@@ -143,7 +201,7 @@ export async function excluirAdvogado(id: number) {
 // Tipos e CRUD de Clientes
 export type Cliente = { id: number; nome: string; cpf_cnpj?: string; email?: string; telefone?: string }
 export async function listarClientes() {
-  return request('/clientes', { method: 'GET' }) as Promise<Cliente[]>
+  return requestAll('/clientes/') as Promise<Cliente[]>
 }
 export async function criarCliente(payload: Omit<Cliente, 'id'>) {
   return request('/clientes', { method: 'POST', body: JSON.stringify(payload) }) as Promise<Cliente>
@@ -169,13 +227,21 @@ export type CausaProcesso = {
   dataDistribuicao?: string
 }
 export async function listarCausasProcessos() {
-  const res = await request('/causas-processos', { method: 'GET' }) as any
+  const res = await requestAll('/causas-processos/')
   const arr = Array.isArray(res) ? res : []
   return arr.map((r: any) => ({
     ...r,
     dataDistribuicao: r.dataDistribuicao ?? r.data_distribuicao ?? r.dataDistribuicao,
   })) as CausaProcesso[]
 }
+// Resumo agregado no servidor (quantidade e soma de valores por grupo)
+export type ResumoDimensao = 'escritorio_id' | 'status' | 'especialidade_id' | 'advogado_id' | 'mes'
+export type ResumoCausasGrupo = Partial<Record<ResumoDimensao, string | number | null>> & { quantidade: number; valor_total: number }
+export type ResumoCausas = { total: { quantidade: number; valor_total: number }; grupos: ResumoCausasGrupo[] }
+export async function resumoCausasProcessos(agrupar: ResumoDimensao[] = []) {
+  const qs = agrupar.map(a => `agrupar=${encodeURIComponent(a)}`).join('&')
+  return request(`/causas-processos/resumo${qs ? `?${qs}` : ''}`) as Promise<ResumoCausas>
+}
 export async function criarCausaProcesso(payload: Omit<CausaProcesso, 'id'>) {
   const res = await request('/causas-processos', { method: 'POST', body: JSON.stringify(payload) }) as any
   return { ...res, dataDistribuicao: res.dataDistribuicao ?? res.data_distribuicao } as CausaProcesso
@@ -191,7 +257,7 @@ export async function excluirCausaProcesso(id: number) {
 // Tipos e CRUD de Usuários
 export type Usuario = { id: number; username: string; nome: string; email?: string; role?: string; permissoes?: string; advogado_id?: number; escritórios?: string; escritorios?: string }
 export async function listarUsuarios() {
-  return request('/usuarios', { method: 'GET' }) as Promise<Usuario[]>
+  return requestAll('/usuarios/') as Promise<Usuario[]>
 }
 export async function criarUsuario(payload: { username: string; nome: string; email?: string; role?: string; permissoes?: string; senha?: string }) {
   return request('/usuarios', { method: 'POST', body: JSON.stringify(payload) }) as Promise<Usuario>
@@ -206,7 +272,7 @@ export async function excluirUsuario(id: number) {
 // Tipos e CRUD de Perfil
 export type Perfil = { id: number; nome: string; descricao?: string }
 export async function listarPerfis() {
-  return request('/perfil', { method: 'GET' }) as Promise<Perfil[]>
+  return requestAll('/perfil/') as Promise<Perfil[]>
 }
 export async function criarPerfil(payload: Omit<Perfil, 'id'>) {
   return request('/perfil', { method: 'POST', body: JSON.stringify(payload) }) as Promise<Perfil>
@@ -221,7 +287,7 @@ export async function excluirPerfil(id: number) {
 // Tipos e CRUD de Permissões
 export type Permissao = { id: number; nome: string; descricao?: string }
 export async function listarPermissoes() {
-  return request('/permissoes', { method: 'GET' }) as Promise<Permissao[]>
+  return requestAll('/permissoes/') as Promise<Permissao[]>
 }
 export async function criarPermissao(payload: Omit<Permissao, 'id'>) {
   return request('/permissoes', { method: 'POST', body: JSON.stringify(payload) }) as Promise<Permissao>
@@ -234,7 +300,7 @@ export async function excluirPermissao(id: number) {
 }
 
 // Auditoria
-export type Auditoria = { id: number; entidade: string; entidade_id?: number; acao: string; quem?: string; quando: string; diff?: string }
+export type Auditoria = { id: number; entidade: string; entidade_id?: number; acao: string; quem?: string; quando: string; diff?: string; alteracoes?: Record<string, { antes: unknown; depois: unknown }> }
 export async function listarAuditoria() {
   return request('/auditoria', { method: 'GET' }) as Promise<Auditoria[]>
 }
@@ -263,4 +329,79 @@ export async function me() {
 // Seeds (criação de dados de demonstração)
 export async function seedDemo() {
   return request('/seeds', { method: 'POST' }) as Promise<{ status: string; created: { especialidades: number; escritorios: number; advogados: number; causas_processos: number } }>
+}
+
+// Feed de alterações em tempo real (SSE): substitui o polling periódico
+export type EventoMudanca =
+  | { tipo: 'mudanca'; entidade: string; id: number | null; acao: 'create' | 'update' | 'delete' | 'bulk'; total?: number }
+  | { tipo: 'resync' }
+
+// Espera máxima entre tentativas de reabrir o feed (dobra a cada falha)
+const RECONEXAO_MAX_MS = 60000
+
+// Chama onEvento a cada alteração confirmada; 'resync' indica eventos perdidos (recarregar tudo).
+// Devolve a função que encerra a assinatura.
+export function assinarMudancas(onEvento: (e: EventoMudanca) => void, entidades: string[] = []) {
+  let source: EventSource | null = null
+  let timer: ReturnType<typeof setTimeout> | undefined
+  let encerrado = false
+  let caiu = false
+  let espera = 1000
+  const handler = (ev: MessageEvent) => {
+    try {
+      onEvento(JSON.parse(ev.data) as EventoMudanca)
+    } catch {
+      // evento malformado; ignora
+    }
+  }
+  const reabrir = (polling: boolean) => {
+    if (encerrado) return
+    caiu = true
+    // Sem feed, cada tentativa também recarrega os dados (polling até o feed voltar)
+    if (polling) onEvento({ tipo: 'resync' })
+    timer = setTimeout(abrir, espera)
+    espera = Math.min(espera * 2, RECONEXAO_MAX_MS)
+  }
+  const abrir = async () => {
+    const params = new URLSearchParams()
+    if (entidades.length) params.set('entidades', entidades.join(','))
+    // Sem login o servidor recusa o feed: tenta de novo mais tarde
+    if (!token) {
+      reabrir(false)
+      return
+    }
+    // O token de acesso não vai na URL (acaba em logs): vai um ticket curto, pedido a cada abertura
+    try {
+      const { ticket } = (await request('/eventos/ticket', { method: 'POST' })) as { ticket: string }
+      params.set('ticket', ticket)
+    } catch {
+      reabrir(true)
+      return
+    }
+    if (encerrado) return
+    const atual = new EventSource(`${API_URL}/eventos/stream?${params}`)
+    source = atual
+    atual.addEventListener('mudanca', handler as EventListener)
+    atual.addEventListener('resync', handler as EventListener)
+    // O EventSource reconecta sozinho com a mesma URL; o que mudou enquanto esteve fora é desconhecido
+    atual.onerror = () => {
+      caiu = true
+      // CLOSED: desistiu de vez (ex.: 401 com o ticket já vencido); reabre com um ticket novo
+      if (atual.readyState === EventSource.CLOSED) {
+        atual.close()
+        reabrir(false)
+      }
+    }
+    atual.onopen = () => {
+      if (caiu) onEvento({ tipo: 'resync' })
+      caiu = false
+      espera = 1000
+    }
+  }
+  abrir()
+  return () => {
+    encerrado = true
+    clearTimeout(timer)
+    source?.close()
+  }
 }
\ No newline at end of file